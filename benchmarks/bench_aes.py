@@ -0,0 +1,99 @@
+"""
+Сравнение скорости шифрования AES: пошаговое преобразование состояния
+(sub_bytes, shift_rows, mix_columns, add_round_key) с расширением ключа на
+каждый блок и табличный шифр AES с расписанием ключей, вычисленным один
+раз. Также измеряются скорость режима CTR и накладные расходы шифрования
+данных при сжатии (Compressor(encrypt_payload=True)).
+
+Запуск: python -m benchmarks.bench_aes [размер_в_KiB]
+"""
+import os
+import sys
+import tempfile
+
+from benchmarks.bench_decode import make_data, measure
+from encryption.coding import (AESCTR, Nr, add_round_key, bytes_to_matrix,
+                               expand_key, get_cipher, matrix_to_bytes,
+                               mix_columns, shift_rows, sub_bytes)
+from huffman_method import Compressor, Decompressor
+
+
+def step_encrypt(block: bytes, key: bytes) -> bytes:
+    """
+    Шифрует блок пошаговыми функциями модуля encryption.coding.
+
+    :param block: Блок из 16 байт.
+    :param key: Ключ шифрования.
+    :return: Зашифрованный блок.
+    """
+    state = bytes_to_matrix(block)
+    round_keys = expand_key(key)
+    state = add_round_key(state, round_keys[0])
+    for i in range(1, Nr):
+        state = mix_columns(shift_rows(sub_bytes(state)))
+        state = add_round_key(state, round_keys[i])
+    state = shift_rows(sub_bytes(state))
+    return matrix_to_bytes(add_round_key(state, round_keys[Nr]))
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 64 * 1024
+    size -= size % 16
+    data = os.urandom(size)
+    key = os.urandom(16)
+    results = {}
+
+    def step():
+        results['step'] = b''.join(step_encrypt(data[i:i + 16], key)
+                                   for i in range(0, size, 16))
+
+    def table():
+        results['table'] = get_cipher(key).encrypt(data)
+
+    def table_decrypt():
+        results['decrypted'] = get_cipher(key).decrypt(results['table'])
+
+    print(f'Данные: {size} байт')
+    slow = measure('Пошаговый AES', size, step)
+    fast = measure('Табличный AES', size, table)
+    measure('Табличный AES, расшифрование', size, table_decrypt)
+    assert results['step'] == results['table']
+    assert results['decrypted'] == data
+    print(f'Ускорение: {fast / slow:.1f}x')
+
+    measure('AES-CTR', size, lambda: AESCTR(key, bytes(8)).crypt(data))
+    compression_overhead(key)
+
+
+def compression_overhead(key: bytes) -> None:
+    """
+    Сжимает и распаковывает защищенный файл с шифрованием только дерева
+    и с шифрованием всей секции данных и печатает скорость обоих режимов.
+
+    :param key: Ключ шифрования.
+    """
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    data = make_data(size)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.bin')
+        with open(path, 'wb') as file:
+            file.write(data)
+
+        for name, encrypt_payload in (('дерево', False),
+                                      ('CTR', True)):
+            out = os.path.join(tmp, name)
+            compressor = Compressor(encrypt_payload=encrypt_payload)
+            compressor.progress_bar.update = lambda *args: None
+            measure(f'Сжатие, шифрование: {name}', size,
+                    lambda: compressor.compress(path, out, {path: key}))
+
+            decompressor = Decompressor()
+            decompressor.progress_bar.visible = False
+            decompressor.authentication = lambda *args: (True, key)
+            archive = os.path.join(out, 'data.bin.huff')
+            measure(f'Проверка, шифрование: {name}', size,
+                    lambda: decompressor.test(archive))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Сравнение скорости подсчета частот: Counter.update по блокам размера
+Compressor.block_size и HuffmanTree.add_block по блокам размера
+COUNT_BLOCK_SIZE (векторный подсчет, если установлен NumPy).
+
+Запуск: python -m benchmarks.bench_count [размер_в_KiB]
+"""
+import sys
+from collections import Counter
+
+from benchmarks.bench_decode import make_data, measure
+from huffman_method import COUNT_BLOCK_SIZE, HuffmanTree
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 4096 * 1024
+    data = make_data(size)
+    results = {}
+
+    def counter_count():
+        frequency = Counter()
+        for i in range(0, size, 256):
+            frequency.update(data[i:i + 256])
+        results['counter'] = frequency
+
+    def tree_count():
+        tree = HuffmanTree()
+        for i in range(0, size, COUNT_BLOCK_SIZE):
+            tree.add_block(data[i:i + COUNT_BLOCK_SIZE])
+        results['tree'] = tree.frequency
+
+    print(f'Данные: {len(data)} байт')
+    slow = measure('Counter.update', len(data), counter_count)
+    fast = measure('HuffmanTree.add_block', len(data), tree_count)
+    assert list(results['tree'].items()) == list(results['counter'].items())
+    print(f'Ускорение: {fast / slow:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Сравнение скорости декодирования: посимвольный обход дерева
+HuffmanTree.decode, табличный декодер TableDecoder и, если установлен
+NumPy, векторный NumpyDecoder.
+
+Запуск: python -m benchmarks.bench_decode [размер_в_KiB]
+"""
+import random
+import sys
+import time
+
+from typing import Callable, Tuple
+
+from huffman_method import (BitEncoder, Decompressor, HuffmanTree,
+                            TableDecoder, NUMPY_AVAILABLE)
+
+
+def make_data(size: int) -> bytes:
+    """
+    Генерирует псевдотекстовые данные заданного размера.
+
+    :param size: Размер данных в байтах.
+    :return: Сгенерированные данные.
+    """
+    random.seed(0)
+    words = [''.join(random.choices('etaoinshrdlucmfwypvbgkjqxz',
+                                    k=random.randint(2, 9)))
+             for _ in range(500)]
+    text = ' '.join(random.choices(words, k=size // 4))
+    return text.encode()[:size]
+
+
+def encode(tree: HuffmanTree, data: bytes) -> Tuple[bytes, int]:
+    """
+    Кодирует данные в тот же поток байтов, что пишет Compressor.
+
+    :param tree: Дерево Хаффмана.
+    :param data: Данные для кодирования.
+    :return: Кортеж из сжатых байтов и количества бит дополнения.
+    """
+    encoder = BitEncoder.from_tree(tree)
+    encoded = encoder.encode(data) + encoder.flush()
+    return encoded[:-1], encoded[-1]
+
+
+def measure(name: str, size: int, func: Callable[[], None]) -> float:
+    """
+    Замеряет время выполнения функции и печатает пропускную способность.
+
+    :param name: Название замера.
+    :param size: Объем обработанных данных в байтах.
+    :param func: Замеряемая функция.
+    :return: Пропускная способность в MB/s.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    speed = size / elapsed / 1e6
+    print(f'{name:<28} {elapsed:8.3f} s {speed:8.2f} MB/s')
+    return speed
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    data = make_data(size)
+    tree = HuffmanTree()
+    tree.add_block(data)
+    tree.build_tree()
+    encoded, padding = encode(tree, data)
+
+    def tree_decode():
+        bits = Decompressor._bytes_to_bits(encoded)
+        decoded, _ = tree.decode(bits, padding)
+        assert decoded == data
+
+    def table_decode():
+        decoder = TableDecoder.from_tree(tree)
+        decoded = b''.join(decoder.decode(encoded[i:i + 65536])
+                           for i in range(0, len(encoded), 65536))
+        decoded += decoder.decode(b'', padding)
+        assert decoded == data
+
+    def numpy_decode():
+        from huffman_method import NumpyDecoder
+        decoder = NumpyDecoder(tree.get_codes())
+        decoded = b''.join(decoder.decode(encoded[i:i + 65536])
+                           for i in range(0, len(encoded), 65536))
+        decoded += decoder.decode(b'', padding)
+        assert decoded == data
+
+    print(f'Данные: {len(data)} байт, сжато: {len(encoded)} байт')
+    slow = measure('HuffmanTree.decode', len(data), tree_decode)
+    fast = measure('TableDecoder', len(data), table_decode)
+    print(f'Ускорение: {fast / slow:.1f}x')
+    if NUMPY_AVAILABLE:
+        vector = measure('NumpyDecoder', len(data), numpy_decode)
+        print(f'Ускорение NumPy: {vector / slow:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
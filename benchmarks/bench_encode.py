@@ -0,0 +1,74 @@
+"""
+Сравнение скорости кодирования: строковый буфер из '0'/'1' (прежний
+способ упаковки кодов), целочисленный упаковщик BitEncoder и, если
+установлен NumPy, векторный NumpyEncoder.
+
+Запуск: python -m benchmarks.bench_encode [размер_в_KiB]
+"""
+import sys
+from typing import Tuple
+
+from benchmarks.bench_decode import make_data, measure
+from huffman_method import BitEncoder, HuffmanTree, NUMPY_AVAILABLE
+
+
+def pack_bits(bits: str) -> Tuple[str, bytes]:
+    """
+    Упаковывает строку из '0'/'1' в байты по восемь бит.
+
+    :param bits: Строка с битами.
+    :return: Кортеж с оставшимися битами и байтами.
+    """
+    bytes_list = []
+    while len(bits) >= 8:
+        bytes_list.append(int(bits[:8], 2))
+        bits = bits[8:]
+    return bits, bytes(bytes_list)
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    block_size = 65536
+    data = make_data(size)
+    tree = HuffmanTree()
+    tree.add_block(data)
+    tree.build_tree()
+    blocks = [data[i:i + block_size] for i in range(0, size, block_size)]
+    results = {}
+
+    def string_encode():
+        codes = tree.get_codes()
+        buffer = ''
+        encoded = []
+        for block in blocks:
+            buffer += ''.join([codes[obj] for obj in block])
+            buffer, compressed_block = pack_bits(buffer)
+            encoded.append(compressed_block)
+        count = -len(buffer) % 8
+        _, byte = pack_bits(buffer + '0' * count)
+        results['string'] = b''.join(encoded) + byte + bytes([count])
+
+    def integer_encode():
+        encoder = BitEncoder.from_tree(tree)
+        encoded = [encoder.encode(block) for block in blocks]
+        results['integer'] = b''.join(encoded) + encoder.flush()
+
+    def numpy_encode():
+        from huffman_method import NumpyEncoder
+        encoder = NumpyEncoder(tree.get_codes())
+        encoded = [encoder.encode(block) for block in blocks]
+        results['numpy'] = b''.join(encoded) + encoder.flush()
+
+    print(f'Данные: {len(data)} байт, блок: {block_size} байт')
+    slow = measure('Строковый буфер', len(data), string_encode)
+    fast = measure('BitEncoder', len(data), integer_encode)
+    assert results['string'] == results['integer']
+    print(f'Ускорение: {fast / slow:.1f}x')
+    if NUMPY_AVAILABLE:
+        vector = measure('NumpyEncoder', len(data), numpy_encode)
+        assert results['numpy'] == results['integer']
+        print(f'Ускорение NumPy: {vector / slow:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
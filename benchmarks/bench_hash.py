@@ -0,0 +1,35 @@
+"""
+Сравнение скорости контрольных сумм файлов архива: MD5 на чистом Python
+(совместим с архивами версии 2), CRC32 и BLAKE2b из стандартной
+библиотеки. Данные хешируются порциями, как при сжатии и распаковке.
+
+Запуск: python -m benchmarks.bench_hash [размер_в_KiB]
+"""
+import sys
+
+from benchmarks.bench_decode import make_data, measure
+from huffman_method import CHECKSUMS, create_hasher
+
+CHUNK_SIZE: int = 1 << 16
+"""
+Размер порции данных, передаваемой хешу за один вызов.
+"""
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 1024 * 1024
+    data = make_data(size)
+    print(f'Данные: {size} байт')
+    for name, checksum in CHECKSUMS.items():
+        hasher = create_hasher(checksum)
+
+        def run():
+            for i in range(0, size, CHUNK_SIZE):
+                hasher.hash(data[i:i + CHUNK_SIZE])
+            hasher.get_hash()
+
+        measure(name, size, run)
+
+
+if __name__ == '__main__':
+    main()
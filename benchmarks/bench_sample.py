@@ -0,0 +1,62 @@
+"""
+Сравнение сжатия с подсчетом частот по всему файлу и по выборке
+(Compressor(sample_size=...)). Для каждого режима печатаются рядом объем
+прочитанных данных, время и степень сжатия.
+
+Выборка экономит только чтение файла при подсчете частот (ввод-вывод):
+время сжатия определяет кодирование, которое в обоих режимах читает
+файл целиком, поэтому ускорения ждать не следует. Выборка оправдана,
+когда файл читается с медленного носителя, а степень сжатия обычно
+теряет 1-2 %.
+
+Запуск: python -m benchmarks.bench_sample [размер_в_KiB] [выборка_в_KiB]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_decode import make_data
+from huffman_method import Compressor
+
+
+def main() -> None:
+    size = int(sys.argv[1]) * 1024 if len(sys.argv) > 1 else 4096 * 1024
+    sample = int(sys.argv[2]) * 1024 if len(sys.argv) > 2 else size // 16
+    data = make_data(size)
+    modes = [('полный подсчет', Compressor()),
+             ('выборка', Compressor(sample_size=sample))]
+
+    print(f'Данные: {size} байт, выборка: {sample} байт')
+    print(f'{"режим":<16} {"прочитано, байт":>16} {"время, s":>9} '
+          f'{"архив, байт":>12} {"сжатие":>8}')
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'data.bin')
+        with open(path, 'wb') as file:
+            file.write(data)
+
+        for index, (name, compressor) in enumerate(modes):
+            compressor.progress_bar.update = lambda *args: None
+            counted = size
+            if compressor.sample_size is not None and size > sample:
+                counted = sum(length for _, length in
+                              compressor._sample_ranges(size))
+            start = time.perf_counter()
+            archive = compressor.compress(path,
+                                          os.path.join(tmp, str(index)))[1]
+            elapsed = time.perf_counter() - start
+            results.append((counted + size, elapsed, archive))
+            print(f'{name:<16} {counted + size:>16} {elapsed:>9.3f} '
+                  f'{archive:>12} {archive / size:>8.4f}')
+
+    (full_read, full_time, full_size), (read, elapsed, archive) = results
+    print(f'Чтение: {read / full_read * 100:.1f} % от полного, '
+          f'время: {elapsed / full_time * 100:.1f} % от полного, '
+          f'архив: {(archive - full_size) / full_size * 100:+.2f} %')
+    print('Выигрыш выборки - только объем чтения (ввод-вывод), '
+          'а не время сжатия.')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,10 @@
-from typing import List
+from functools import lru_cache
+from typing import List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 """
  Алгоритм взят с wikipedia.org/wiki/AES_(стандарт_шифрования)
@@ -284,51 +290,396 @@ def gmul(a: int, b: int) -> int:
     return p
 
 
+AES_CACHE_SIZE: int = 64
+"""
+Количество ключей, для которых расписание раундовых ключей AES хранится
+в кэше процесса.
+"""
+
+VECTOR_MIN_SIZE: int = 1 << 10
+"""
+Минимальный размер буфера (в байтах), который AES.encrypt шифрует
+векторными операциями NumPy, если он установлен.
+"""
+
+CTR_NONCE_SIZE: int = 8
+"""
+Размер nonce режима CTR. Блок счетчика состоит из nonce и номера блока
+ключевого потока (8 байт, big-endian).
+"""
+
+KEYSTREAM_SIZE: int = 1 << 12
+"""
+Минимальный объем ключевого потока (в байтах), который AESCTR вычисляет
+за одно обращение к шифру, чтобы короткие последовательные записи не
+шифровали счетчик заново.
+"""
+
+
+def _make_tables(box: List[int],
+                 factors: Tuple[int, int, int, int]) -> List[List[int]]:
+    """
+    Строит четыре таблицы раунда AES (T-таблицы): для каждого байта
+    x - столбец из произведений box[x] на factors, упакованный в 32-битное
+    слово (строка 0 в старшем байте), и три его циклических сдвига.
+
+    :param box: Таблица замены (S_BOX или INV_S_BOX).
+    :param factors: Множители столбца матрицы MixColumns или обратной
+          к ней.
+    :return: Таблицы для строк состояния 0-3.
+    """
+    first = []
+    for x in range(256):
+        word = 0
+        for factor in factors:
+            word = (word << 8) | gmul(factor, box[x])
+        first.append(word)
+    tables = [first]
+    for _ in range(3):
+        tables.append([((word >> 8) | (word << 24)) & 0xFFFFFFFF
+                       for word in tables[-1]])
+    return tables
+
+
+ENC_TABLES: List[List[int]] = _make_tables(S_BOX, (2, 1, 1, 3))
+"""
+Таблицы раунда шифрования: SubBytes и MixColumns за одно обращение
+к таблице на байт.
+"""
+
+DEC_TABLES: List[List[int]] = _make_tables(INV_S_BOX, (14, 9, 13, 11))
+"""
+Таблицы раунда расшифрования: обратные SubBytes и MixColumns.
+"""
+
+if np is not None:
+    _VECTOR_TABLES = [np.array(table, dtype=np.uint32)
+                      for table in ENC_TABLES]
+    _VECTOR_BOX = np.array(S_BOX, dtype=np.uint32)
+
+
+def _columns(block: bytes) -> List[int]:
+    """
+    Упаковывает блок в четыре 32-битных слова столбцов состояния.
+
+    Состояние заполняется так же, как bytes_to_matrix: байт 4i+j попадает
+    в строку i и столбец j, поэтому столбец j состоит из байтов j, 4+j,
+    8+j и 12+j.
+
+    :param block: Блок из 16 байт.
+    :return: Слова столбцов.
+    """
+    return [(block[j] << 24) | (block[4 + j] << 16) |
+            (block[8 + j] << 8) | block[12 + j] for j in range(4)]
+
+
+def _columns_to_bytes(columns: List[int]) -> bytes:
+    """
+    Преобразует слова столбцов состояния обратно в блок (см. _columns).
+
+    :param columns: Слова столбцов.
+    :return: Блок из 16 байт.
+    """
+    return bytes((columns[j] >> (24 - 8 * i)) & 0xFF
+                 for i in range(4) for j in range(4))
+
+
+def _inv_mix_word(word: int) -> int:
+    """
+    Применяет обратное преобразование MixColumns к слову столбца.
+
+    :param word: Слово столбца.
+    :return: Преобразованное слово.
+    """
+    t0, t1, t2, t3 = DEC_TABLES
+    return (t0[S_BOX[word >> 24]] ^ t1[S_BOX[(word >> 16) & 0xFF]] ^
+            t2[S_BOX[(word >> 8) & 0xFF]] ^ t3[S_BOX[word & 0xFF]])
+
+
+class AES:
+    """
+    Шифр AES с заранее вычисленным расписанием раундовых ключей.
+
+    Раунд выполняется по T-таблицам: SubBytes, ShiftRows и MixColumns
+    сводятся к четырем обращениям к таблицам на столбец. Результат
+    совпадает с пошаговым преобразованием функций sub_bytes, shift_rows,
+    mix_columns и add_round_key, поэтому архивы, зашифрованные раньше,
+    читаются без изменений. Расписание для ключа вычисляется один раз
+    (см. get_cipher) и используется для всех блоков.
+    """
+
+    def __init__(self, key: bytes) -> None:
+        """
+        Вычисляет раундовые ключи шифрования и расшифрования.
+
+        :param key: Ключ шифрования (16 байт).
+        :raises ValueError: Если длина ключа не 16 байт.
+        """
+        if len(key) != 16:
+            raise ValueError(f'Недопустимая длина ключа AES [{len(key)}]')
+        self._enc_keys: List[List[int]] = []
+        for round_key in expand_key(key):
+            self._enc_keys.append(_columns(matrix_to_bytes(round_key)))
+        self._dec_keys: List[List[int]] = [self._enc_keys[Nr]]
+        for i in range(Nr - 1, 0, -1):
+            self._dec_keys.append([_inv_mix_word(word)
+                                   for word in self._enc_keys[i]])
+        self._dec_keys.append(self._enc_keys[0])
+
+    def encrypt_block(self, block: bytes) -> bytes:
+        """
+        Шифрует один блок.
+
+        :param block: Блок из 16 байт.
+        :return: Зашифрованный блок.
+        """
+        t0, t1, t2, t3 = ENC_TABLES
+        keys = self._enc_keys
+        k = keys[0]
+        c0, c1, c2, c3 = _columns(block)
+        c0 ^= k[0]
+        c1 ^= k[1]
+        c2 ^= k[2]
+        c3 ^= k[3]
+        for k in keys[1:Nr]:
+            c0, c1, c2, c3 = (
+                t0[c0 >> 24] ^ t1[(c1 >> 16) & 0xFF] ^
+                t2[(c2 >> 8) & 0xFF] ^ t3[c3 & 0xFF] ^ k[0],
+                t0[c1 >> 24] ^ t1[(c2 >> 16) & 0xFF] ^
+                t2[(c3 >> 8) & 0xFF] ^ t3[c0 & 0xFF] ^ k[1],
+                t0[c2 >> 24] ^ t1[(c3 >> 16) & 0xFF] ^
+                t2[(c0 >> 8) & 0xFF] ^ t3[c1 & 0xFF] ^ k[2],
+                t0[c3 >> 24] ^ t1[(c0 >> 16) & 0xFF] ^
+                t2[(c1 >> 8) & 0xFF] ^ t3[c2 & 0xFF] ^ k[3])
+        return self._last_round((c0, c1, c2, c3), keys[Nr], S_BOX, 1)
+
+    def decrypt_block(self, block: bytes) -> bytes:
+        """
+        Расшифровывает один блок.
+
+        :param block: Блок из 16 байт.
+        :return: Расшифрованный блок.
+        """
+        t0, t1, t2, t3 = DEC_TABLES
+        keys = self._dec_keys
+        k = keys[0]
+        c0, c1, c2, c3 = _columns(block)
+        c0 ^= k[0]
+        c1 ^= k[1]
+        c2 ^= k[2]
+        c3 ^= k[3]
+        for k in keys[1:Nr]:
+            c0, c1, c2, c3 = (
+                t0[c0 >> 24] ^ t1[(c3 >> 16) & 0xFF] ^
+                t2[(c2 >> 8) & 0xFF] ^ t3[c1 & 0xFF] ^ k[0],
+                t0[c1 >> 24] ^ t1[(c0 >> 16) & 0xFF] ^
+                t2[(c3 >> 8) & 0xFF] ^ t3[c2 & 0xFF] ^ k[1],
+                t0[c2 >> 24] ^ t1[(c1 >> 16) & 0xFF] ^
+                t2[(c0 >> 8) & 0xFF] ^ t3[c3 & 0xFF] ^ k[2],
+                t0[c3 >> 24] ^ t1[(c2 >> 16) & 0xFF] ^
+                t2[(c1 >> 8) & 0xFF] ^ t3[c0 & 0xFF] ^ k[3])
+        return self._last_round((c0, c1, c2, c3), keys[Nr], INV_S_BOX, 3)
+
+    @staticmethod
+    def _last_round(columns: Tuple[int, int, int, int],
+                    key: List[int],
+                    box: List[int],
+                    step: int) -> bytes:
+        """
+        Выполняет последний раунд без MixColumns: замену байтов, сдвиг
+        строк и добавление ключа.
+
+        :param columns: Слова столбцов состояния.
+        :param key: Слова столбцов раундового ключа.
+        :param box: Таблица замены.
+        :param step: Сдвиг столбца на строку: 1 для ShiftRows, 3 для
+              обратного ShiftRows.
+        :return: Блок из 16 байт.
+        """
+        out = []
+        for j in range(4):
+            out.append(
+                (box[columns[j] >> 24] << 24 |
+                 box[(columns[(j + step) % 4] >> 16) & 0xFF] << 16 |
+                 box[(columns[(j + 2 * step) % 4] >> 8) & 0xFF] << 8 |
+                 box[columns[(j + 3 * step) % 4] & 0xFF]) ^ key[j])
+        return _columns_to_bytes(out)
+
+    def encrypt(self, data: bytes) -> bytes:
+        """
+        Шифрует буфер, длина которого кратна 16, поблочно. Если установлен
+        NumPy, буфер от VECTOR_MIN_SIZE байт шифруется векторными
+        операциями: раунд выполняется сразу для всех блоков.
+
+        :param data: Данные для шифрования.
+        :return: Зашифрованные данные.
+        :raises ValueError: Если длина данных не кратна 16.
+        """
+        if len(data) % 16:
+            raise ValueError(f'Длина данных не кратна блоку AES '
+                             f'[{len(data)}]')
+        if np is not None and len(data) >= VECTOR_MIN_SIZE:
+            return self._encrypt_vector(data)
+        encrypt_block = self.encrypt_block
+        return b''.join(encrypt_block(data[i:i + 16])
+                        for i in range(0, len(data), 16))
+
+    def _encrypt_vector(self, data: bytes) -> bytes:
+        """
+        Шифрует буфер векторными операциями NumPy по тем же T-таблицам,
+        что и encrypt_block.
+
+        :param data: Данные, длина которых кратна 16.
+        :return: Зашифрованные данные.
+        """
+        t0, t1, t2, t3 = _VECTOR_TABLES
+        state = np.frombuffer(data, dtype=np.uint8).reshape(-1, 4, 4)
+        state = state.astype(np.uint32)
+        columns = [(state[:, 0, j] << 24) | (state[:, 1, j] << 16) |
+                   (state[:, 2, j] << 8) | state[:, 3, j] for j in range(4)]
+        keys = self._enc_keys
+        c0, c1, c2, c3 = [column ^ np.uint32(key)
+                          for column, key in zip(columns, keys[0])]
+        for k in keys[1:Nr]:
+            c0, c1, c2, c3 = (
+                t0[c0 >> 24] ^ t1[(c1 >> 16) & 0xFF] ^
+                t2[(c2 >> 8) & 0xFF] ^ t3[c3 & 0xFF] ^ np.uint32(k[0]),
+                t0[c1 >> 24] ^ t1[(c2 >> 16) & 0xFF] ^
+                t2[(c3 >> 8) & 0xFF] ^ t3[c0 & 0xFF] ^ np.uint32(k[1]),
+                t0[c2 >> 24] ^ t1[(c3 >> 16) & 0xFF] ^
+                t2[(c0 >> 8) & 0xFF] ^ t3[c1 & 0xFF] ^ np.uint32(k[2]),
+                t0[c3 >> 24] ^ t1[(c0 >> 16) & 0xFF] ^
+                t2[(c1 >> 8) & 0xFF] ^ t3[c2 & 0xFF] ^ np.uint32(k[3]))
+
+        columns = (c0, c1, c2, c3)
+        box = _VECTOR_BOX
+        out = np.empty((len(c0), 4, 4), dtype=np.uint8)
+        for j in range(4):
+            word = (box[columns[j] >> 24] << 24 |
+                    box[(columns[(j + 1) % 4] >> 16) & 0xFF] << 16 |
+                    box[(columns[(j + 2) % 4] >> 8) & 0xFF] << 8 |
+                    box[columns[(j + 3) % 4] & 0xFF]) ^ np.uint32(keys[Nr][j])
+            for i in range(4):
+                out[:, i, j] = (word >> (24 - 8 * i)) & 0xFF
+        return out.tobytes()
+
+    def decrypt(self, data: bytes) -> bytes:
+        """
+        Расшифровывает буфер, длина которого кратна 16, поблочно.
+
+        :param data: Зашифрованные данные.
+        :return: Расшифрованные данные.
+        :raises ValueError: Если длина данных не кратна 16.
+        """
+        if len(data) % 16:
+            raise ValueError(f'Длина данных не кратна блоку AES '
+                             f'[{len(data)}]')
+        decrypt_block = self.decrypt_block
+        return b''.join(decrypt_block(data[i:i + 16])
+                        for i in range(0, len(data), 16))
+
+
+@lru_cache(maxsize=AES_CACHE_SIZE)
+def get_cipher(key: bytes) -> AES:
+    """
+    Возвращает шифр для ключа. Расписание ключей вычисляется один раз
+    и хранится в кэше процесса.
+
+    :param key: Ключ шифрования (16 байт).
+    :return: Объект шифра.
+    """
+    return AES(key)
+
+
+class AESCTR:
+    """
+    Шифр AES в режиме счетчика (CTR): данные складываются по модулю 2
+    с ключевым потоком из зашифрованных блоков счетчика (nonce и номер
+    блока). Блоки потока независимы, поэтому данные можно шифровать
+    и расшифровывать с любой позиции и любыми порциями, а шифрование
+    и расшифрование совпадают.
+    """
+
+    def __init__(self, key: bytes, nonce: bytes) -> None:
+        """
+        Инициализирует шифр.
+
+        :param key: Ключ шифрования (16 байт).
+        :param nonce: Уникальное для каждого потока значение
+              (CTR_NONCE_SIZE байт).
+        :raises ValueError: Если длина ключа или nonce недопустима.
+        """
+        if len(nonce) != CTR_NONCE_SIZE:
+            raise ValueError(f'Недопустимая длина nonce [{len(nonce)}]')
+        self.cipher: AES = get_cipher(key)
+        self.nonce: bytes = nonce
+        self._start: int = 0
+        self._keystream: bytes = b''
+
+    def keystream(self, offset: int, size: int) -> bytes:
+        """
+        Возвращает фрагмент ключевого потока. Последний вычисленный
+        участок потока (не меньше KEYSTREAM_SIZE байт) запоминается, так
+        что последовательные короткие запросы шифруют счетчик один раз.
+
+        :param offset: Позиция начала фрагмента в потоке.
+        :param size: Длина фрагмента.
+        :return: Байты ключевого потока.
+        """
+        start = offset - self._start
+        if start < 0 or start + size > len(self._keystream):
+            first = offset // 16
+            count = max(offset + size - first * 16 + 15,
+                        KEYSTREAM_SIZE) // 16
+            nonce = self.nonce
+            counters = b''.join(nonce + i.to_bytes(8, byteorder='big')
+                                for i in range(first, first + count))
+            self._keystream = self.cipher.encrypt(counters)
+            self._start = first * 16
+            start = offset - self._start
+        return self._keystream[start:start + size]
+
+    def crypt(self, data: bytes, offset: int = 0) -> bytes:
+        """
+        Шифрует или расшифровывает данные, начинающиеся с позиции offset
+        потока.
+
+        :param data: Данные.
+        :param offset: Позиция данных в потоке. По умолчанию 0.
+        :return: Преобразованные данные.
+        """
+        if not data:
+            return b''
+        stream = self.keystream(offset, len(data))
+        value = (int.from_bytes(data, byteorder='big') ^
+                 int.from_bytes(stream, byteorder='big'))
+        return value.to_bytes(len(data), byteorder='big')
+
+
 def aes_encrypt(message: bytes, key: bytes) -> bytes:
     """
     Шифрует сообщение с использованием AES.
 
+    Шифруется первый блок из 16 байт; остаток более длинного сообщения,
+    как и прежде, возвращается без изменений. Для буферов из нескольких
+    блоков используйте get_cipher(key).encrypt.
+
     :param message: Сообщение для шифрования (байтовая строка).
     :param key: Ключ шифрования (байтовая строка).
     :return: Зашифрованное сообщение (байтовая строка).
     """
-    state = bytes_to_matrix(message)
-    round_keys = expand_key(key)
-    state = add_round_key(state, round_keys[0])
-
-    for i in range(1, Nr):
-        state = sub_bytes(state)
-        state = shift_rows(state)
-        state = mix_columns(state)
-        state = add_round_key(state, round_keys[i])
-
-    state = sub_bytes(state)
-    state = shift_rows(state)
-    state = add_round_key(state, round_keys[Nr])
-
-    return matrix_to_bytes(state)
+    return get_cipher(key).encrypt_block(message[:16]) + message[16:]
 
 
 def aes_decrypt(ciphertext: bytes, key: bytes) -> bytes:
     """
     Расшифровывает зашифрованное сообщение с использованием AES.
 
+    Расшифровывается первый блок из 16 байт, остаток возвращается без
+    изменений (см. aes_encrypt).
+
     :param ciphertext: Зашифрованное сообщение (байтовая строка).
     :param key: Ключ шифрования (байтовая строка).
     :return: Расшифрованное сообщение (байтовая строка).
     """
-    state = bytes_to_matrix(ciphertext)
-    round_keys = expand_key(key)
-    state = add_round_key(state, round_keys[Nr])
-
-    for i in range(Nr - 1, 0, -1):
-        state = shift_rows_inv(state)
-        state = sub_bytes_inv(state)
-        state = add_round_key(state, round_keys[i])
-        state = mix_columns_inv(state)
-
-    state = shift_rows_inv(state)
-    state = sub_bytes_inv(state)
-    state = add_round_key(state, round_keys[0])
-
-    return matrix_to_bytes(state)
+    return get_cipher(key).decrypt_block(ciphertext[:16]) + ciphertext[16:]
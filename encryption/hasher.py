@@ -1,6 +1,33 @@
+import hashlib
 import struct
+import zlib
 from typing import List, Union
 
+MD5_SHIFTS: List[int] = [(7 * i) % 32 if i < 32 else (3 * i + 5) % 32
+                         for i in range(64)]
+"""
+Величины циклических сдвигов для 64 шагов MD5.
+"""
+
+MD5_CONSTANTS: List[int] = [
+    int(2 ** 32 * abs((2 ** 0.5 * abs((2 ** i) * (i + 1))) % 1))
+    for i in range(64)]
+"""
+Аддитивные константы 64 шагов MD5. Вычисляются один раз при импорте тем
+же выражением, что и раньше, поэтому хеши совпадают с записанными
+в существующих архивах.
+"""
+
+MD5_INDEXES: List[int] = [i if i < 16 else
+                          (5 * i + 1) % 16 if i < 32 else
+                          (3 * i + 5) % 16 if i < 48 else
+                          (7 * i) % 16 for i in range(64)]
+"""
+Номера 32-битных слов блока, используемых на 64 шагах MD5.
+"""
+
+_WORDS = struct.Struct('<16I')
+
 
 class MD5:
     """
@@ -16,13 +43,8 @@ class MD5:
         self.c: int = 0x98BADCFE
         self.d: int = 0x10325476
 
-        self.k: List[int] = [0x00000000] * 64
-        self.s: List[int] = [0] * 64
-
-        for i in range(64):
-            x: float = abs((2 ** 0.5 * abs((2 ** i) * (i + 1))) % 1)
-            self.k[i] = int(2 ** 32 * x)
-            self.s[i] = (7 * i) % 32 if i < 32 else (3 * i + 5) % 32
+        self.k: List[int] = MD5_CONSTANTS
+        self.s: List[int] = MD5_SHIFTS
 
         self.data: bytes = b''
 
@@ -60,39 +82,44 @@ class MD5:
 
         return message
 
-    def process_chunk(self, chunk: bytes) -> None:
+    def process_chunk(self, chunk: Union[bytes, memoryview]) -> None:
         """
         Обрабатывает отдельный блок данных согласно алгоритму MD5.
 
+        Используются только первые 64 байта блока. Промежуточные суммы не
+        усекаются до 32 бит, как и в исходной реализации, поэтому шаги
+        выполняются с теми же целыми числами Python, а результат
+        совпадает с хешами в существующих архивах.
+
         :param chunk: Блок данных для обработки.
         """
-        a: int = self.a
-        b: int = self.b
-        c: int = self.c
-        d: int = self.d
+        words = _WORDS.unpack_from(chunk)
+        constants = MD5_CONSTANTS
+        shifts = MD5_SHIFTS
+        indexes = MD5_INDEXES
+        a = last = self.a
+        b = self.b
+        c = self.c
+        d = self.d
 
         for i in range(64):
             if i < 16:
-                f: int = (b & c) | ((~b) & d)
-                g: int = i
+                f = (b & c) | ((~b) & d)
             elif i < 32:
                 f = (d & b) | ((~d) & c)
-                g = (5 * i + 1) % 16
             elif i < 48:
                 f = b ^ c ^ d
-                g = (3 * i + 5) % 16
             else:
                 f = c ^ (b | (~d))
-                g = (7 * i) % 16
 
-            d, c, a = c, b, self.a
-            temp: int = a + f + self.k[i]
-            bytes_: int = temp + struct.unpack('<I',
-                                               chunk[g * 4:g * 4 + 4])[0]
-            b = (b + self.left_rotate(bytes_, self.s[i])) & 0xFFFFFFFF
-            self.a = temp
+            d, c, a = c, b, last
+            last = a + f + constants[i]
+            x = last + words[indexes[i]]
+            shift = shifts[i]
+            b = (b + (((x << shift) | (x >> (32 - shift))) &
+                      0xFFFFFFFF)) & 0xFFFFFFFF
 
-        self.a = (self.a + a) & 0xFFFFFFFF
+        self.a = (last + a) & 0xFFFFFFFF
         self.b = (self.b + b) & 0xFFFFFFFF
         self.c = (self.c + c) & 0xFFFFFFFF
         self.d = (self.d + d) & 0xFFFFFFFF
@@ -101,14 +128,27 @@ class MD5:
         """
         Вычисляет хеш-значение для указанных данных.
 
+        Полные блоки по 64 байта обрабатываются прямо из данных, без
+        копирования остатка буфера после каждого блока; неполный хвост
+        сохраняется до следующего вызова.
+
         :param data: Данные для хеширования.
         """
-        self.data += data
-        while len(self.data) >= 64:
-            chunk: bytes = self.data[:64]
-            chunk: bytes = self.padding(chunk)
-            self.process_chunk(chunk)
-            self.data = self.data[64:]
+        if self.data:
+            need = 64 - len(self.data)
+            self.data += data[:need]
+            data = data[need:]
+            if len(self.data) < 64:
+                return
+            self.process_chunk(self.data)
+            self.data = b''
+
+        end = len(data) - len(data) % 64
+        view = memoryview(data)
+        process_chunk = self.process_chunk
+        for pos in range(0, end, 64):
+            process_chunk(view[pos:pos + 64])
+        self.data = bytes(view[end:])
 
     def get_hash(self) -> bytes:
         """
@@ -121,3 +161,61 @@ class MD5:
             self.process_chunk(chunk)
             self.data = b''
         return struct.pack('<LLLL', self.a, self.b, self.c, self.d)
+
+
+class CRC32:
+    """
+    Контрольная сумма CRC-32 (zlib.crc32) с интерфейсом MD5. Сумма
+    записывается в последние 4 байта 16-байтного значения (big-endian),
+    первые 12 байт нулевые.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализирует контрольную сумму.
+        """
+        self.value: int = 0
+
+    def hash(self, data: bytes) -> None:
+        """
+        Добавляет данные в контрольную сумму.
+
+        :param data: Данные для хеширования.
+        """
+        self.value = zlib.crc32(data, self.value)
+
+    def get_hash(self) -> bytes:
+        """
+        Возвращает 16-байтное значение контрольной суммы.
+
+        :return: Хеш.
+        """
+        return bytes(12) + self.value.to_bytes(4, byteorder='big')
+
+
+class Blake2:
+    """
+    Хеш BLAKE2b (hashlib) длиной 16 байт с интерфейсом MD5.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализирует хеш.
+        """
+        self.hasher = hashlib.blake2b(digest_size=16)
+
+    def hash(self, data: bytes) -> None:
+        """
+        Добавляет данные в хеш.
+
+        :param data: Данные для хеширования.
+        """
+        self.hasher.update(data)
+
+    def get_hash(self) -> bytes:
+        """
+        Возвращает 16-байтный хеш.
+
+        :return: Хеш.
+        """
+        return self.hasher.digest()
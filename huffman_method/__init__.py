@@ -1,4 +1,18 @@
 from .huffman import *
+from .canonical import *
+from .length_limit import *
+from .decoder import *
+from .encoder import *
+from .numpy_backend import *
+from .adaptive import *
+from .blocks import *
+from .checksum import *
+from .credentials import *
+from .directory import *
+from .checkpoints import *
+from .integrity import *
+from .payload import *
 from .compress import *
 from .decompress import *
+from .reader import *
 from .const_byte import *
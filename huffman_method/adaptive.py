@@ -0,0 +1,292 @@
+from typing import Dict, List, Tuple
+
+FLUSH_SYMBOLS: int = 512
+"""
+Количество символов, после которых накопитель кодировщика сбрасывается
+в байты.
+"""
+
+ALPHABET_SIZE: int = 256
+"""
+Размер алфавита адаптивного кода (байты).
+"""
+
+NYT: int = ALPHABET_SIZE
+"""
+Символ узла NYT (not yet transmitted), после кода которого следует
+новый байт в 8 битах.
+"""
+
+
+class AdaptiveHuffmanModel:
+    """
+    Дерево адаптивного кода Хаффмана (алгоритм FGK).
+
+    Узлы хранятся в массивах и пронумерованы так, что веса не убывают
+    с ростом номера (свойство братства). Корень имеет наибольший номер,
+    узел NYT - наименьший. Для каждого веса запоминается лидер - узел
+    с наибольшим номером среди узлов этого веса.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализирует дерево, состоящее из одного узла NYT.
+        """
+        size = 2 * ALPHABET_SIZE + 1
+        self.weight: List[int] = [0] * size
+        self.parent: List[int] = [-1] * size
+        self.left: List[int] = [-1] * size
+        self.right: List[int] = [-1] * size
+        self.symbol: List[int] = [-1] * size
+        self.leaf: List[int] = [-1] * (ALPHABET_SIZE + 1)
+        self.root: int = size - 1
+        self.nyt: int = self.root
+        self.symbol[self.root] = NYT
+        self.leaf[NYT] = self.root
+        self.leader: Dict[int, int] = {0: self.root}
+
+    def code(self, char: int) -> Tuple[int, int]:
+        """
+        Возвращает текущий код символа. Для нового символа это код NYT,
+        за которым следуют 8 бит самого символа.
+
+        :param char: Байт.
+        :return: Кортеж из кода и его длины в битах.
+        """
+        node = self.leaf[char]
+        if node < 0:
+            node = self.nyt
+        parent = self.parent
+        right = self.right
+        root = self.root
+        code = 0
+        length = 0
+        while node != root:
+            up = parent[node]
+            if right[up] == node:
+                code |= 1 << length
+            length += 1
+            node = up
+        if self.leaf[char] < 0:
+            code = (code << 8) | char
+            length += 8
+        return code, length
+
+    def update(self, char: int) -> None:
+        """
+        Увеличивает вес символа и перестраивает дерево.
+
+        :param char: Закодированный или декодированный байт.
+        """
+        weight = self.weight
+        parent = self.parent
+        leader = self.leader
+        node = self.leaf[char]
+
+        if node < 0:
+            node = self.nyt
+            self.left[node] = node - 2
+            self.right[node] = node - 1
+            parent[node - 2] = node
+            parent[node - 1] = node
+            self.symbol[node] = -1
+            self.symbol[node - 2] = NYT
+            self.symbol[node - 1] = char
+            self.leaf[NYT] = node - 2
+            self.leaf[char] = node - 1
+            weight[node - 1] = 1
+            self.nyt = node - 2
+
+        root = self.root
+        while True:
+            current = weight[node]
+            up = parent[node]
+            block_leader = leader[current]
+            if block_leader == up:
+                # Брат узла - NYT: родитель имеет тот же вес и станет
+                # тяжелее на следующем шаге, менять их местами нельзя.
+                weight[node] = current + 1
+                node = up
+                continue
+            if block_leader != node:
+                self._swap(node, block_leader)
+                node = block_leader
+            weight[node] = current + 1
+            if node > self.nyt and weight[node - 1] == current:
+                leader[current] = node - 1
+            else:
+                del leader[current]
+            if node == root or weight[node + 1] != current + 1:
+                leader[current + 1] = node
+            if node == root:
+                break
+            node = parent[node]
+        leader[0] = self.nyt
+
+    def _swap(self, first: int, second: int) -> None:
+        """
+        Меняет местами поддеревья в позициях first и second.
+
+        :param first: Номер первого узла.
+        :param second: Номер второго узла.
+        """
+        symbol = self.symbol
+        left = self.left
+        right = self.right
+        parent = self.parent
+
+        first_char = symbol[first]
+        second_char = symbol[second]
+        symbol[first] = second_char
+        symbol[second] = first_char
+        if second_char >= 0:
+            self.leaf[second_char] = first
+        if first_char >= 0:
+            self.leaf[first_char] = second
+
+        first_left, first_right = left[first], right[first]
+        second_left, second_right = left[second], right[second]
+        left[first], right[first] = second_left, second_right
+        left[second], right[second] = first_left, first_right
+        if second_left >= 0:
+            parent[second_left] = first
+            parent[second_right] = first
+        if first_left >= 0:
+            parent[first_left] = second
+            parent[first_right] = second
+
+
+class AdaptiveEncoder:
+    """
+    Однопроходный кодировщик адаптивного кода Хаффмана.
+
+    Дерево не хранится в архиве: декодер строит его заново по мере
+    чтения. Поток завершается так же, как у BitEncoder.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализирует кодировщик с пустым деревом.
+        """
+        self.model: AdaptiveHuffmanModel = AdaptiveHuffmanModel()
+        self._acc: int = 0
+        self._nbits: int = 0
+        self.bits_written: int = 0
+
+    def encode(self, block: bytes) -> bytes:
+        """
+        Кодирует блок байтов.
+
+        :param block: Блок данных для кодирования.
+        :return: Закодированные полные байты.
+        """
+        model = self.model
+        acc = self._acc
+        nbits = self._nbits
+        out = bytearray()
+
+        for start in range(0, len(block), FLUSH_SYMBOLS):
+            for char in block[start:start + FLUSH_SYMBOLS]:
+                code, length = model.code(char)
+                acc = (acc << length) | code
+                nbits += length
+                model.update(char)
+            extra = nbits & 7
+            out += (acc >> extra).to_bytes(nbits >> 3, byteorder='big')
+            self.bits_written += nbits - extra
+            acc &= (1 << extra) - 1
+            nbits = extra
+
+        self._acc = acc
+        self._nbits = nbits
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """
+        Завершает поток: дополняет последний байт нулями и добавляет байт
+        с количеством дополненных бит.
+
+        :return: Хвост потока.
+        """
+        acc = self._acc
+        nbits = self._nbits
+        self.bits_written += nbits
+        self._acc = 0
+        self._nbits = 0
+        if not nbits:
+            return bytes([0])
+        count = 8 - nbits
+        return bytes([acc << count, count])
+
+
+class AdaptiveDecoder:
+    """
+    Декодер адаптивного кода Хаффмана с тем же интерфейсом, что
+    у TableDecoder.
+    """
+
+    def __init__(self) -> None:
+        """
+        Инициализирует декодер с пустым деревом.
+        """
+        self.model: AdaptiveHuffmanModel = AdaptiveHuffmanModel()
+        self._node: int = self.model.root
+        self._raw_bits: int = 8
+        self._raw_value: int = 0
+
+    def reset(self) -> None:
+        """
+        Сбрасывает дерево и состояние декодера.
+        """
+        self.__init__()
+
+    def decode(self, data: bytes, padding: int = -1) -> bytes:
+        """
+        Декодирует очередную порцию сжатых данных.
+
+        :param data: Сжатые байты.
+        :param padding: Количество нулевых бит дополнения в конце потока.
+              Значение -1 означает, что поток еще не закончен.
+        :return: Декодированные данные.
+        :raises ValueError: Если поток оборвался внутри кода.
+        """
+        model = self.model
+        left = model.left
+        right = model.right
+        symbol = model.symbol
+        root = model.root
+        node = self._node
+        raw_bits = self._raw_bits
+        raw_value = self._raw_value
+        out = bytearray()
+
+        last = len(data) - 1
+        for index, byte in enumerate(data):
+            stop = max(padding, 0) if index == last else 0
+            for shift in range(7, stop - 1, -1):
+                bit = (byte >> shift) & 1
+                if raw_bits:
+                    raw_value = (raw_value << 1) | bit
+                    raw_bits -= 1
+                    if not raw_bits:
+                        out.append(raw_value)
+                        model.update(raw_value)
+                        node = root
+                    continue
+
+                node = right[node] if bit else left[node]
+                char = symbol[node]
+                if char == NYT:
+                    raw_bits = 8
+                    raw_value = 0
+                elif char >= 0:
+                    out.append(char)
+                    model.update(char)
+                    node = root
+
+        self._node = node
+        self._raw_bits = raw_bits
+        self._raw_value = raw_value
+        if padding >= 0 and (raw_bits or node != root):
+            raise ValueError('Файл поврежден [Поток оборвался внутри кода]')
+        return bytes(out)
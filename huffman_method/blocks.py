@@ -0,0 +1,154 @@
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+from huffman_method.decoder import TableDecoder, create_decoder
+from huffman_method.encoder import create_encoder
+from huffman_method.huffman import HuffmanTree
+from huffman_method.length_limit import code_cost
+from huffman_method.numpy_backend import NumpyDecoder
+
+TABLE_BLOCK_SIZE: int = 1 << 16
+"""
+Размер блока (в символах) с собственной таблицей кодов по умолчанию.
+"""
+
+TABLE_CACHE_SIZE: int = 16
+"""
+Количество деревьев и декодеров, восстановленных по таблицам длин,
+которые хранятся в кэше процесса.
+"""
+
+
+def reuse_saves_bits(tree: HuffmanTree,
+                     table_size: int,
+                     previous: Optional[HuffmanTree]) -> bool:
+    """
+    Проверяет, выгоднее ли закодировать блок таблицей предыдущего блока,
+    чем записать собственную.
+
+    :param tree: Дерево блока со счетчиком частот.
+    :param table_size: Размер собственной таблицы блока в байтах.
+    :param previous: Дерево предыдущего блока или None.
+    :return: True, если предыдущая таблица кодирует все символы блока
+            и дает не больше бит, чем собственная вместе с таблицей.
+    """
+    if previous is None:
+        return False
+    lengths = previous.get_code_lengths()
+    if any(char not in lengths for char in tree.frequency):
+        return False
+    own = tree.get_cost() + 8 * table_size
+    return code_cost(tree.frequency, lengths) <= own
+
+
+def build_block_tree(codec: Optional[str],
+                     max_code_length: Optional[int],
+                     block: Union[bytes, str]) -> Tuple[HuffmanTree, bytes,
+                                                        int]:
+    """
+    Строит каноническое дерево блока по его счетчику частот.
+    Предназначена для вызова в дочерних процессах.
+
+    :param codec: Кодек данных. None для бинарного режима.
+    :param max_code_length: Максимальная длина кода или None.
+    :param block: Блок данных.
+    :return: Дерево блока со счетчиком частот, его таблица длин кодов и
+            размер блока в битах до ограничения длин кодов (0, если длина
+            не ограничена).
+    """
+    tree = HuffmanTree(codec)
+    tree.add_block(block)
+    tree.build_tree()
+    optimal = 0
+    if max_code_length is not None:
+        optimal = tree.get_cost()
+        tree.limit_code_lengths(max_code_length)
+    tree.canonize()
+    return tree, tree.serialize_code_lengths(), optimal
+
+
+def encode_block(tree: HuffmanTree, block: Union[bytes, str]) -> bytes:
+    """
+    Кодирует блок целиком. Поток завершается последним байтом и байтом
+    с количеством дополненных бит.
+
+    :param tree: Дерево Хаффмана.
+    :param block: Блок данных.
+    :return: Закодированный блок.
+    """
+    encoder = create_encoder(tree)
+    return encoder.encode(block) + encoder.flush()
+
+
+def decode_block(decoder: Union[TableDecoder, NumpyDecoder],
+                 data: bytes) -> Union[bytes, str]:
+    """
+    Декодирует блок, закодированный encode_block.
+
+    :param decoder: Декодер таблицы блока.
+    :param data: Закодированный блок.
+    :return: Декодированные данные.
+    :raises ValueError: Если блок пуст или поврежден.
+    """
+    if not data:
+        raise ValueError('Файл поврежден [Пустой блок данных]')
+    decoder.reset()
+    return decoder.decode(data[:-1], data[-1])
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _table_tree(table: bytes, codec: Optional[str]) -> HuffmanTree:
+    """
+    Восстанавливает дерево по таблице длин канонических кодов.
+
+    :param table: Таблица длин кодов.
+    :param codec: Кодек данных. None для бинарного режима.
+    :return: Объект дерева.
+    """
+    tree = HuffmanTree(codec)
+    tree.deserialize_code_lengths(table)
+    return tree
+
+
+@lru_cache(maxsize=TABLE_CACHE_SIZE)
+def _table_decoder(table: bytes,
+                   codec: Optional[str]) -> Union[TableDecoder, NumpyDecoder]:
+    """
+    Создает декодер по таблице длин канонических кодов.
+
+    :param table: Таблица длин кодов.
+    :param codec: Кодек данных. None для бинарного режима.
+    :return: Объект декодера.
+    """
+    return create_decoder(_table_tree(table, codec))
+
+
+def encode_block_with_table(table: bytes,
+                            codec: Optional[str],
+                            block: Union[bytes, str]) -> bytes:
+    """
+    Кодирует блок по таблице длин канонических кодов. Предназначена для
+    вызова в дочерних процессах: аргументы передаются без дерева.
+
+    :param table: Таблица длин кодов.
+    :param codec: Кодек данных. None для бинарного режима.
+    :param block: Блок данных.
+    :return: Закодированный блок.
+    """
+    return encode_block(_table_tree(table, codec), block)
+
+
+def decode_block_with_table(table: bytes,
+                            codec: Optional[str],
+                            data: bytes) -> Union[bytes, str]:
+    """
+    Декодирует блок по таблице длин канонических кодов. Предназначена для
+    вызова в дочерних процессах.
+
+    :param table: Таблица длин кодов.
+    :param codec: Кодек данных. None для бинарного режима.
+    :param data: Закодированный блок.
+    :return: Декодированные данные.
+    :raises ValueError: Если таблица или блок повреждены.
+    """
+    return decode_block(_table_decoder(table, codec), data)
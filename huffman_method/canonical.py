@@ -0,0 +1,153 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+Symbol = Union[int, str]
+"""
+Символ алфавита: байт (int) в бинарном режиме или символ (str) в текстовом.
+"""
+
+MAX_CODE_LENGTH: int = 255
+"""
+Максимальная длина кода, которую можно записать в таблицу длин.
+"""
+
+
+def canonical_order(lengths: Dict[Symbol, int]) -> List[Tuple[Symbol, int]]:
+    """
+    Упорядочивает символы для канонического кода: по длине кода,
+    затем по значению символа.
+
+    :param lengths: Словарь длин кодов символов.
+    :return: Список пар (символ, длина) в каноническом порядке.
+    """
+    return sorted(lengths.items(), key=lambda item: (item[1], item[0]))
+
+
+def canonical_codes(lengths: Dict[Symbol, int]) -> Dict[Symbol, str]:
+    """
+    Восстанавливает канонические коды Хаффмана по длинам кодов.
+
+    :param lengths: Словарь длин кодов символов.
+    :return: Словарь канонических кодов символов.
+    """
+    codes = {}
+    code = 0
+    prev_length = 0
+    for symbol, length in canonical_order(lengths):
+        code <<= length - prev_length
+        codes[symbol] = format(code, f'0{length}b')
+        code += 1
+        prev_length = length
+    return codes
+
+
+def pack_code_lengths(lengths: Dict[Symbol, int],
+                      codec: Optional[str] = None) -> bytes:
+    """
+    Упаковывает таблицу длин кодов в компактный вид.
+
+    Формат: максимальная длина кода (1 байт), количество символов каждой
+    длины от 1 до максимальной (varint), символы в каноническом порядке
+    (байт на символ в бинарном режиме, UTF-8 в текстовом).
+
+    :param lengths: Словарь длин кодов символов.
+    :param codec: Кодек данных. None для бинарного режима.
+    :return: Упакованная таблица длин.
+    """
+    max_length = max(lengths.values(), default=0)
+    if max_length > MAX_CODE_LENGTH:
+        raise ValueError(f'Длина кода {max_length} превышает '
+                         f'допустимую ({MAX_CODE_LENGTH})')
+
+    counts = [0] * (max_length + 1)
+    for length in lengths.values():
+        counts[length] += 1
+
+    packed = bytearray([max_length])
+    for count in counts[1:]:
+        packed += encode_varint(count)
+
+    symbols = [symbol for symbol, _ in canonical_order(lengths)]
+    if codec is None:
+        packed += bytes(symbols)
+    else:
+        packed += ''.join(symbols).encode('utf-8')
+    return bytes(packed)
+
+
+def unpack_code_lengths(data: bytes,
+                        codec: Optional[str] = None) -> Dict[Symbol, int]:
+    """
+    Распаковывает таблицу длин кодов, записанную pack_code_lengths.
+
+    :param data: Упакованная таблица длин.
+    :param codec: Кодек данных. None для бинарного режима.
+    :return: Словарь длин кодов символов.
+    :raises ValueError: Если таблица повреждена.
+    """
+    if not data:
+        raise ValueError('Таблица длин кодов пуста')
+
+    max_length = data[0]
+    pos = 1
+    counts = []
+    for _ in range(max_length):
+        count, pos = decode_varint(data, pos)
+        counts.append(count)
+
+    if codec is None:
+        symbols = list(data[pos:])
+    else:
+        try:
+            symbols = list(data[pos:].decode('utf-8'))
+        except UnicodeDecodeError:
+            raise ValueError('Таблица длин кодов повреждена')
+
+    if len(symbols) != sum(counts):
+        raise ValueError('Таблица длин кодов повреждена')
+
+    lengths = {}
+    symbol_iter = iter(symbols)
+    for length, count in enumerate(counts, start=1):
+        for _ in range(count):
+            lengths[next(symbol_iter)] = length
+    return lengths
+
+
+def encode_varint(value: int) -> bytes:
+    """
+    Кодирует неотрицательное целое число в формате varint (LEB128).
+
+    :param value: Число для кодирования.
+    :return: Закодированное число.
+    """
+    result = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            result.append(byte | 0x80)
+        else:
+            result.append(byte)
+            return bytes(result)
+
+
+def decode_varint(data: bytes, pos: int = 0) -> Tuple[int, int]:
+    """
+    Декодирует число в формате varint (LEB128).
+
+    :param data: Буфер с данными.
+    :param pos: Позиция начала числа в буфере.
+    :return: Кортеж из числа и позиции сразу после него.
+    :raises ValueError: Если число обрывается на конце буфера.
+    """
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise ValueError('Неожиданный конец данных varint')
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, pos
+        shift += 7
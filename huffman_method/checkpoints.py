@@ -0,0 +1,158 @@
+from bisect import bisect_right
+from typing import BinaryIO, List, Optional, Tuple, Union
+
+from huffman_method.adaptive import AdaptiveDecoder
+from huffman_method.canonical import decode_varint, encode_varint
+from huffman_method.decoder import TableDecoder
+
+RANGE_CHUNK_SIZE: int = 1 << 12
+"""
+Размер порции (в байтах), которой читаются сжатые данные при чтении
+фрагмента файла. Порция небольшая, чтобы после конца фрагмента
+декодировалось как можно меньше лишних данных.
+"""
+
+
+def pack_checkpoints(checkpoints: List[Tuple[int, int]]) -> bytes:
+    """
+    Сериализует индекс контрольных точек: количество точек (varint) и для
+    каждой точки приращения позиции в декодированных данных и битового
+    смещения в сжатых данных относительно предыдущей точки (varint).
+
+    :param checkpoints: Пары (позиция в декодированных данных, битовое
+          смещение в сжатых данных) в порядке возрастания.
+    :return: Байты индекса.
+    """
+    parts = [encode_varint(len(checkpoints))]
+    last_offset = last_bit = 0
+    for offset, bit in checkpoints:
+        parts.append(encode_varint(offset - last_offset))
+        parts.append(encode_varint(bit - last_bit))
+        last_offset, last_bit = offset, bit
+    return b''.join(parts)
+
+
+def unpack_checkpoints(data: bytes) -> List[Tuple[int, int]]:
+    """
+    Восстанавливает индекс, сериализованный pack_checkpoints.
+
+    :param data: Байты индекса.
+    :return: Пары (позиция в декодированных данных, битовое смещение).
+    :raises ValueError: Если индекс поврежден.
+    """
+    count, pos = decode_varint(data)
+    checkpoints = []
+    offset = bit = 0
+    for _ in range(count):
+        delta, pos = decode_varint(data, pos)
+        offset += delta
+        delta, pos = decode_varint(data, pos)
+        bit += delta
+        checkpoints.append((offset, bit))
+    if pos != len(data):
+        raise ValueError('Ошибка структуры индекса контрольных точек '
+                         '[Лишние данные]')
+    return checkpoints
+
+
+def find_checkpoint(checkpoints: List[Tuple[int, int]],
+                    offset: int) -> Tuple[int, int]:
+    """
+    Находит ближайшую контрольную точку не дальше заданной позиции.
+
+    :param checkpoints: Пары (позиция, битовое смещение) по возрастанию.
+    :param offset: Позиция в декодированных данных.
+    :return: Пара (позиция, битовое смещение) точки или (0, 0), если
+            позиция находится до первой точки.
+    """
+    index = bisect_right(checkpoints, (offset, float('inf')))
+    if not index:
+        return 0, 0
+    return checkpoints[index - 1]
+
+
+class CheckpointReader:
+    """
+    Читает произвольные фрагменты сжатых данных файла: декодирование
+    начинается с ближайшей контрольной точки перед фрагментом и
+    заканчивается, как только фрагмент декодирован.
+    """
+
+    def __init__(self,
+                 file: BinaryIO,
+                 decoder: Union[TableDecoder, AdaptiveDecoder],
+                 start: int,
+                 size: int,
+                 checkpoints: List[Tuple[int, int]],
+                 codec: Optional[str] = None) -> None:
+        """
+        Инициализирует объект чтения фрагментов.
+
+        :param file: Файловый объект архива.
+        :param decoder: Декодер данных файла, возвращающий результат
+              каждого вызова decode сразу.
+        :param start: Смещение сжатых данных в архиве.
+        :param size: Размер сжатых данных вместе с байтом количества
+              бит дополнения.
+        :param checkpoints: Пары (позиция в декодированных данных,
+              битовое смещение в сжатых данных) по возрастанию.
+        :param codec: Кодек данных. None для бинарного режима.
+        """
+        self.file: BinaryIO = file
+        self.decoder: Union[TableDecoder, AdaptiveDecoder] = decoder
+        self.start: int = start
+        self.size: int = size
+        self.checkpoints: List[Tuple[int, int]] = checkpoints
+        self.codec: Optional[str] = codec
+
+    def read(self, offset: int, length: int) -> Union[bytes, str]:
+        """
+        Читает фрагмент декодированных данных.
+
+        Позиции считаются в байтах, а в текстовом режиме - в символах.
+        Фрагмент, выходящий за конец данных, укорачивается. Хеш файла
+        при этом не проверяется.
+
+        :param offset: Позиция начала фрагмента.
+        :param length: Длина фрагмента.
+        :return: Декодированный фрагмент.
+        :raises ValueError: Если диапазон недопустим или данные
+               повреждены.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError(f'Недопустимый диапазон '
+                             f'[{offset}:{offset + length}]')
+        empty = b'' if self.codec is None else ''
+        if not length:
+            return empty
+
+        position, bit = find_checkpoint(self.checkpoints, offset)
+        skip = bit & 7
+        if skip:
+            self.decoder.reset(skip)
+        else:
+            self.decoder.reset()
+
+        pos = bit >> 3
+        end = self.size - 1
+        stop = offset + length
+        decoded = position
+        parts = []
+        while decoded < stop and pos < end:
+            chunk = min(RANGE_CHUNK_SIZE, end - pos)
+            last = pos + chunk == end
+            self.file.seek(self.start + pos)
+            data = self.file.read(chunk + last)
+            if len(data) < chunk + last:
+                raise ValueError('Файл поврежден [Неожиданный конец '
+                                 'архива]')
+            pos += chunk
+            if last:
+                part = self.decoder.decode(data[:-1], data[-1])
+            else:
+                part = self.decoder.decode(data, -1)
+            parts.append(part)
+            decoded += len(part)
+
+        data = empty.join(parts)
+        return data[offset - position:stop - position]
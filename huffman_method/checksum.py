@@ -0,0 +1,36 @@
+from typing import Dict, Union
+
+from encryption.hasher import MD5, CRC32, Blake2
+from huffman_method.const_byte import (CHECKSUM_BLAKE2, CHECKSUM_CRC32,
+                                       CHECKSUM_MD5)
+
+CHECKSUMS: Dict[str, int] = {'md5': CHECKSUM_MD5,
+                             'crc32': CHECKSUM_CRC32,
+                             'blake2b': CHECKSUM_BLAKE2}
+"""
+Алгоритмы хеша файлов по названию и их флаги в заголовке архива.
+"""
+
+Hasher = Union[MD5, CRC32, Blake2]
+"""
+Объект хеширования файла: метод hash добавляет данные, get_hash
+возвращает 16-байтный хеш.
+"""
+
+
+def create_hasher(checksum: int) -> Hasher:
+    """
+    Создает объект хеширования для алгоритма из заголовка архива.
+
+    :param checksum: Флаг алгоритма (CHECKSUM_MD5, CHECKSUM_CRC32 или
+          CHECKSUM_BLAKE2).
+    :return: Объект хеширования.
+    :raises ValueError: Если алгоритм не поддерживается.
+    """
+    if checksum == CHECKSUM_MD5:
+        return MD5()
+    if checksum == CHECKSUM_CRC32:
+        return CRC32()
+    if checksum == CHECKSUM_BLAKE2:
+        return Blake2()
+    raise ValueError(f'Неподдерживаемый алгоритм хеширования [{checksum}]')
@@ -1,11 +1,38 @@
 import os
-from typing import Dict, Optional, Tuple, BinaryIO
-from encryption.coding import aes_encrypt
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (Deque, Dict, Iterator, List, Optional, Tuple, BinaryIO,
+                    TextIO, Union)
+from encryption.coding import (AESCTR, CTR_NONCE_SIZE, aes_encrypt,
+                               get_cipher)
 from huffman_method.huffman import HuffmanTree
+from huffman_method.encoder import BitEncoder, create_encoder
+from huffman_method.adaptive import AdaptiveEncoder
+from huffman_method.blocks import (build_block_tree, encode_block,
+                                   encode_block_with_table, reuse_saves_bits)
+from huffman_method.canonical import encode_varint
+from huffman_method.checkpoints import pack_checkpoints
+from huffman_method.checksum import CHECKSUMS, Hasher, create_hasher
+from huffman_method.directory import DirectoryEntry, pack_directory
+from huffman_method.integrity import iter_block_digests, pack_block_checksums
+from huffman_method.numpy_backend import NumpyEncoder
+from huffman_method.payload import EncryptedWriter
 from interfaces.compress import ICompressor
 from huffman_method.const_byte import *
 from progress_bar import ProgressBar
-from encryption.hasher import MD5
+
+COUNT_BLOCK_SIZE: int = 1 << 20
+"""
+Размер блока (в символах), которым файл читается при подсчете частот.
+"""
+
+SAMPLE_BLOCKS: int = 16
+"""
+Количество равномерно расположенных блоков, из которых берется вторая
+половина выборки при выборочном подсчете частот.
+"""
 
 
 class Compressor(ICompressor):
@@ -13,16 +40,137 @@ class Compressor(ICompressor):
     Реализует сжатие файлов и директорий с использованием метода Хаффмана.
     """
 
-    def __init__(self, codec: Optional[str] = None, block_size: int = 256):
+    def __init__(self,
+                 codec: Optional[str] = None,
+                 block_size: int = 256,
+                 canonical: bool = False,
+                 max_code_length: Optional[int] = None,
+                 adaptive: bool = False,
+                 sample_size: Optional[int] = None,
+                 table_block_size: Optional[int] = None,
+                 workers: int = 1,
+                 shared_table: bool = False,
+                 version: int = 3,
+                 checkpoint_size: Optional[int] = None,
+                 encrypt_payload: bool = False,
+                 checksum: str = 'md5',
+                 block_checksum_size: Optional[int] = None):
         """
         Инициализирует объект компрессора.
 
         :param codec: Кодек для чтения файлов. По умолчанию None.
         :param block_size: Размер блока данных для чтения. По умолчанию 128.
+        :param canonical: Записывать вместо дерева таблицу длин канонических
+              кодов. По умолчанию False.
+        :param max_code_length: Максимальная длина кода Хаффмана.
+              По умолчанию None (без ограничения).
+        :param adaptive: Кодировать файлы адаптивным кодом Хаффмана за один
+              проход без записи дерева. По умолчанию False.
+        :param sample_size: Строить дерево файлов больше этого размера
+              (в байтах) по выборке: началу файла и равномерно
+              расположенным блокам. По умолчанию None (по всему файлу).
+        :param table_block_size: Разбивать файлы на блоки этого размера
+              (в символах), каждый со своей таблицей кодов или с таблицей
+              предыдущего блока. По умолчанию None (одно дерево на файл).
+        :param workers: Количество процессов, сжимающих файлы архива
+              или блоки файла параллельно. Один файл делится на части
+              только при table_block_size, иначе он сжимается в одном
+              процессе. По умолчанию 1.
+        :param shared_table: Кодировать все блоки файла одной таблицей,
+              построенной по всему файлу или по выборке. По умолчанию
+              False.
+        :param version: Версия формата архива: 3 (секции с длинами) или 2
+              (секции с маркерами конца). По умолчанию 3.
+        :param checkpoint_size: Записывать контрольную точку после каждых
+              checkpoint_size байт (в текстовом режиме - символов) данных
+              файла для чтения фрагментов без декодирования с начала.
+              По умолчанию None (без контрольных точек).
+        :param encrypt_payload: Шифровать всю секцию данных защищенных
+              файлов AES в режиме CTR с nonce, записанным в заголовке
+              файла. По умолчанию False (шифруется только дерево).
+        :param checksum: Алгоритм хеша файлов из CHECKSUMS: 'md5' (MD5 на
+              чистом Python), 'crc32' или 'blake2b'. По умолчанию 'md5'.
+        :param block_checksum_size: Записывать после секции данных файла
+              контрольные суммы ее блоков этого размера (в байтах сжатых
+              данных), чтобы распаковщик находил повреждение до
+              декодирования. По умолчанию None (только хеш файла).
+        :raises ValueError: Если версия не поддерживается, максимальная
+               длина кода или количество процессов меньше 1 или параметры
+               выборки, блоков, контрольных точек, шифрования, хеша или
+               контрольных сумм блоков недопустимы.
         """
+        if max_code_length is not None and max_code_length < 1:
+            raise ValueError(f'Недопустимая максимальная длина кода '
+                             f'[{max_code_length}]')
+        if version not in SUPPORTED_VERSIONS:
+            raise ValueError(f'Неподдерживаемая версия архива [{version}]')
+        if workers < 1:
+            raise ValueError(f'Недопустимое количество процессов '
+                             f'[{workers}]')
+        if sample_size is not None:
+            if sample_size < 1:
+                raise ValueError(f'Недопустимый размер выборки '
+                                 f'[{sample_size}]')
+            if codec is not None:
+                raise ValueError('Выборочный подсчет частот доступен '
+                                 'только в бинарном режиме')
+            if adaptive:
+                raise ValueError('Выборочный подсчет частот не нужен '
+                                 'в адаптивном режиме')
+        if table_block_size is not None:
+            if table_block_size < 1:
+                raise ValueError(f'Недопустимый размер блока '
+                                 f'[{table_block_size}]')
+            if adaptive:
+                raise ValueError('Блочные таблицы несовместимы '
+                                 'с адаптивным режимом')
+            if sample_size is not None and not shared_table:
+                raise ValueError('Выборка для блочных таблиц доступна '
+                                 'только с общей таблицей')
+        elif shared_table:
+            raise ValueError('Общая таблица доступна только '
+                             'для блочных таблиц')
+        if checkpoint_size is not None:
+            if checkpoint_size < 1:
+                raise ValueError(f'Недопустимый интервал контрольных '
+                                 f'точек [{checkpoint_size}]')
+            if version < 3:
+                raise ValueError('Контрольные точки доступны только '
+                                 'в архиве версии 3')
+            if adaptive or table_block_size is not None:
+                raise ValueError('Контрольные точки доступны только для '
+                                 'статического кода Хаффмана')
+        if encrypt_payload and version < 3:
+            raise ValueError('Шифрование данных доступно только '
+                             'в архиве версии 3')
+        if checksum not in CHECKSUMS:
+            raise ValueError(f'Неподдерживаемый алгоритм хеширования '
+                             f'[{checksum}]')
+        if version < 3 and CHECKSUMS[checksum] != CHECKSUM_MD5:
+            raise ValueError('Архив версии 2 поддерживает только MD5')
+        if block_checksum_size is not None:
+            if block_checksum_size < 1:
+                raise ValueError(f'Недопустимый размер блока контрольных '
+                                 f'сумм [{block_checksum_size}]')
+            if version < 3:
+                raise ValueError('Контрольные суммы блоков доступны только '
+                                 'в архиве версии 3')
         self.block_size: int = block_size
-        self.version: int = 2
+        self.version: int = version
         self.codec: Optional[str] = codec
+        self.canonical: bool = canonical
+        self.max_code_length: Optional[int] = max_code_length
+        self.adaptive: bool = adaptive
+        self.sample_size: Optional[int] = sample_size
+        self.table_block_size: Optional[int] = table_block_size
+        self.workers: int = workers
+        self.shared_table: bool = shared_table
+        self.checkpoint_size: Optional[int] = checkpoint_size
+        self.encrypt_payload: bool = encrypt_payload
+        self.checksum: int = CHECKSUMS[checksum]
+        self.block_checksum_size: Optional[int] = block_checksum_size
+        self.optimal_bits: int = 0
+        self.limited_bits: int = 0
         self.open_mode_files: str = ''
         if codec is None:
             self.open_mode: str = 'rb'
@@ -44,15 +192,22 @@ class Compressor(ICompressor):
               По умолчанию None.
         :return: Кортеж, содержащий размер исходных данных и размер
                 сжатого архива.
+        :raises ValueError: Если пути недопустимы или защита паролем
+               запрошена в адаптивном режиме без шифрования данных.
         """
         if not os.path.exists(path_in):
             raise ValueError(f'Файл или директория [{path_in}] не найдены')
         elif not path_out:
             raise ValueError(f'Пустая строка в качестве пути [{path_out}]')
+        elif self.adaptive and protected_files and not self.encrypt_payload:
+            raise ValueError('Защита паролем в адаптивном режиме доступна '
+                             'только с шифрованием данных')
 
         total_size, all_files = self.get_directory_info(path_in)
 
         self.progress_bar.reset(total_size)
+        self.optimal_bits = 0
+        self.limited_bits = 0
 
         os.makedirs(path_out, exist_ok=True)
         name_dir = os.path.basename(os.path.normpath(path_in))
@@ -61,7 +216,7 @@ class Compressor(ICompressor):
         if os.path.exists(archive_file_path):
             raise ValueError(f'Архив [{archive_file_path}] уже существует')
 
-        with open(archive_file_path, 'wb') as outfile:
+        with open(archive_file_path, 'w+b') as outfile:
             outfile.write(MAGIC_BYTES)
 
             try:
@@ -71,23 +226,105 @@ class Compressor(ICompressor):
 
             if not all_files:
                 if os.path.isdir(path_in):
-                    self.compress_empty_dir(outfile, path_in, path_in)
+                    all_files = {path_in: 'empty_directory'}
                 else:
-                    self.compress_file(outfile,
-                                       path_in,
-                                       path_in,
-                                       protected_files)
+                    all_files = {path_in: 'file'}
+
+            if self.workers > 1 and len(all_files) > 1:
+                entries = self.compress_parallel(outfile, all_files, path_in,
+                                                 protected_files, path_out)
             else:
-                for path, item_type in all_files.items():
-                    if item_type == 'empty_directory':
-                        self.compress_empty_dir(outfile, path, path_in)
-                    elif item_type == 'file':
-                        self.compress_file(outfile, path,
-                                           path_in,
-                                           protected_files)
+                entries = [self.compress_entry(outfile, path, item_type,
+                                               path_in, protected_files)
+                           for path, item_type in all_files.items()]
+
+            if self.version >= 3:
+                outfile.write(pack_directory(entries, outfile.tell()))
 
         return total_size, os.path.getsize(archive_file_path)
 
+    def compress_entry(self,
+                       outfile: BinaryIO,
+                       path: str,
+                       item_type: str,
+                       path_in: str,
+                       protected_files: Optional[Dict[str, bytes]]
+                       ) -> DirectoryEntry:
+        """
+        Сжимает один элемент архива: файл или пустую директорию.
+
+        :param outfile: Выходной файл для записи, открытый также
+              на чтение: хеш элемента для каталога читается из его конца.
+        :param path: Путь к элементу.
+        :param item_type: Тип элемента из get_directory_info.
+        :param path_in: Исходный путь файла или директории.
+        :param protected_files: Зашифрованные файлы и пароли для них.
+        :return: Запись центрального каталога для элемента.
+        """
+        offset = outfile.tell()
+        is_file = item_type == 'file'
+        if is_file:
+            self.compress_file(outfile, path, path_in, protected_files)
+        else:
+            self.compress_empty_dir(outfile, path, path_in)
+
+        end = outfile.tell()
+        outfile.seek(end - 16)
+        digest = outfile.read(16)
+        original_size = os.path.getsize(path) if is_file else 0
+        protected = bool(is_file and protected_files and
+                         path in protected_files)
+        return DirectoryEntry(os.path.relpath(path, path_in), is_file,
+                              original_size > 0, protected, offset,
+                              end - offset, original_size, digest)
+
+    def compress_parallel(self,
+                          outfile: BinaryIO,
+                          all_files: Dict[str, str],
+                          path_in: str,
+                          protected_files: Optional[Dict[str, bytes]],
+                          spill_dir: str) -> List[DirectoryEntry]:
+        """
+        Сжимает элементы архива в пуле процессов. Каждый элемент
+        записывается во временный файл, а затем файлы склеиваются в порядке
+        all_files, поэтому архив совпадает с архивом последовательного
+        сжатия байт в байт.
+
+        :param outfile: Выходной файл для записи.
+        :param all_files: Словарь элементов (путь: тип).
+        :param path_in: Исходный путь файла или директории.
+        :param protected_files: Зашифрованные файлы и пароли для них.
+        :param spill_dir: Директория для временных файлов.
+        :return: Записи центрального каталога в порядке элементов.
+        """
+        entries = []
+        with tempfile.TemporaryDirectory(dir=spill_dir) as tmp, \
+                ProcessPoolExecutor(self.workers) as pool:
+            futures = []
+            for index, (path, item_type) in enumerate(all_files.items()):
+                protected = None
+                if protected_files and path in protected_files:
+                    protected = {path: protected_files[path]}
+                future = pool.submit(_compress_entry, self, path, item_type,
+                                     path_in, protected,
+                                     os.path.join(tmp, str(index)))
+                size = os.path.getsize(path) if item_type == 'file' else 0
+                future.add_done_callback(
+                    lambda _, size=size: self.progress_bar.update(size))
+                futures.append(future)
+
+            for future in futures:
+                (spill_path, entry,
+                 optimal_bits, limited_bits) = future.result()
+                self.optimal_bits += optimal_bits
+                self.limited_bits += limited_bits
+                entry.offset = outfile.tell()
+                entries.append(entry)
+                with open(spill_path, 'rb') as spill:
+                    shutil.copyfileobj(spill, outfile)
+                os.remove(spill_path)
+        return entries
+
     def _make_header(self, outfile: BinaryIO) -> None:
         """
         Создает заголовок архива.
@@ -101,10 +338,30 @@ class Compressor(ICompressor):
             header[1] = supported_codec[self.codec]
         else:
             raise ValueError(f'Кодек {self.codec} не поддерживается!')
+        header[2] = TREE_CANONICAL if self.canonical else TREE_PICKLE
+        if self.adaptive:
+            header[3] = CODING_ADAPTIVE
+        elif self.table_block_size is not None:
+            header[3] = CODING_BLOCKS
+        else:
+            header[3] = CODING_STATIC
+        if self.checkpoint_size is not None:
+            header[4] = CHECKPOINTS_INDEX
+        else:
+            header[4] = CHECKPOINTS_NONE
+        if self.encrypt_payload:
+            header[5] = ENCRYPTION_CTR
+        else:
+            header[5] = ENCRYPTION_TREE
+        header[6] = self.checksum
+        if self.block_checksum_size is not None:
+            header[7] = BLOCK_CHECKSUMS_INDEX
+        else:
+            header[7] = BLOCK_CHECKSUMS_NONE
         outfile.write(bytes(header))
 
-    @staticmethod
-    def compress_empty_dir(outfile: BinaryIO,
+    def compress_empty_dir(self,
+                           outfile: BinaryIO,
                            file_path: str,
                            path_in: str) -> None:
         """
@@ -117,14 +374,14 @@ class Compressor(ICompressor):
         relative_path = os.path.relpath(file_path, path_in)
         bytes_relative_path = relative_path.encode('utf-8')
 
-        hasher = MD5()
+        hasher = create_hasher(self.checksum)
 
         outfile.write(b'\x00'*3)
 
-        outfile.write(bytes_relative_path)
+        self._write_section(outfile, bytes_relative_path, END_PATH)
         hasher.hash(bytes_relative_path)
-        outfile.write(END_PATH)
-        outfile.write(END_DATA)
+        if self.version < 3:
+            outfile.write(END_DATA)
 
         bytes_hash = hasher.get_hash()
         outfile.write(bytes_hash)
@@ -142,28 +399,40 @@ class Compressor(ICompressor):
         :param path_in: Исходный путь файла.
         :param protected_files: Зашифрованные файлы и пароли для них.
         """
-        hasher = MD5()
+        hasher = create_hasher(self.checksum)
         tree = None
         pass_hash = None
+        cipher = None
         if protected_files and (file_path in protected_files):
             pass_hash = protected_files[file_path]
+            if self.encrypt_payload:
+                cipher = AESCTR(pass_hash, os.urandom(CTR_NONCE_SIZE))
 
         not_empty_file = self.write_header_file(outfile,
                                                 file_path,
                                                 path_in,
                                                 hasher,
-                                                pass_hash)
-
-        if not_empty_file == b'\x01':
+                                                pass_hash,
+                                                cipher)
+
+        if not_empty_file != b'\x01':
+            self.write_data(outfile, file_path, hasher, None)
+        elif self.adaptive:
+            self.write_data(outfile, file_path, hasher, None,
+                            AdaptiveEncoder(), cipher)
+        elif self.table_block_size is not None:
+            self.write_blocks(outfile, file_path, hasher, pass_hash, cipher)
+        else:
             tree = self.write_tree(outfile, file_path, hasher, pass_hash)
-        self.write_data(outfile, file_path, hasher, tree)
+            self.write_data(outfile, file_path, hasher, tree, cipher=cipher)
 
-    @staticmethod
-    def write_header_file(outfile: BinaryIO,
+    def write_header_file(self,
+                          outfile: BinaryIO,
                           file_path: str,
                           path_in: str,
-                          hasher: MD5,
-                          pass_hash: Optional[bytes]) -> bytes:
+                          hasher: Hasher,
+                          pass_hash: Optional[bytes],
+                          cipher: Optional[AESCTR] = None) -> bytes:
         """
         Записывает заголовок файла в архив.
 
@@ -172,6 +441,8 @@ class Compressor(ICompressor):
         :param path_in: Исходный путь файла.
         :param hasher: Объект для хеширования.
         :param pass_hash: Пароль для зашифрованного файла.
+        :param cipher: Шифр секции данных, nonce которого записывается
+              после байтов аутентификации. По умолчанию None.
         :return: Флаг, указывающий на наличие данных в файле.
         """
         relative_path = os.path.relpath(file_path, path_in)
@@ -190,20 +461,21 @@ class Compressor(ICompressor):
             outfile.write(b'\x01')
             auth_bytes = aes_encrypt(AUTH_BYTES, pass_hash)
             outfile.write(auth_bytes)
+            if cipher is not None:
+                outfile.write(cipher.nonce)
         else:
             outfile.write(b'\x00')
 
-        outfile.write(bytes_relative_path)
+        self._write_section(outfile, bytes_relative_path, END_PATH)
 
         hasher.hash(bytes_relative_path)
-        outfile.write(END_PATH)
 
         return not_empty_file
 
     def write_tree(self,
                    outfile: BinaryIO,
                    file_path: str,
-                   hasher: MD5,
+                   hasher: Hasher,
                    pass_hash: Optional[bytes]) -> HuffmanTree:
         """
         Записывает дерево Хаффмана в архив.
@@ -215,120 +487,475 @@ class Compressor(ICompressor):
         :return: Объект дерева Хаффмана.
         """
         tree = self._generate_huffman_tree(file_path)
-        serialized_tree = tree.serialize_to_string()
+        if self.canonical:
+            tree.canonize()
+            serialized_tree = tree.serialize_code_lengths()
+        else:
+            serialized_tree = tree.serialize_to_string()
         hasher.hash(serialized_tree)
 
         if pass_hash:
-            while len(serialized_tree) >= 16:
-                block = serialized_tree[:16]
-                serialized_tree = serialized_tree[16:]
-                outfile.write(aes_encrypt(block, pass_hash))
+            serialized_tree = self.encrypt_tree(serialized_tree, pass_hash)
+        self._write_section(outfile, serialized_tree, END_TREE)
+
+        return tree
 
-            count = 16 - len(serialized_tree)
-            added_bytes = serialized_tree + (b'\x00' * count)
-            outfile.write(aes_encrypt(added_bytes, pass_hash))
+    def _write_section(self,
+                       outfile: BinaryIO,
+                       data: bytes,
+                       end_str: bytes) -> None:
+        """
+        Записывает секцию элемента архива: в версии 3 с длиной (varint)
+        перед данными, в версии 2 с маркером конца после них.
 
-            outfile.write(count.to_bytes(1, byteorder='big'))
+        :param outfile: Выходной файл для записи.
+        :param data: Данные секции.
+        :param end_str: Маркер конца секции для версии 2.
+        """
+        if self.version < 3:
+            outfile.write(data)
+            outfile.write(end_str)
         else:
-            outfile.write(serialized_tree)
+            outfile.write(encode_varint(len(data)))
+            outfile.write(data)
 
-        outfile.write(END_TREE)
+    def _begin_data(self, outfile: BinaryIO) -> int:
+        """
+        Начинает секцию данных. В версии 3 резервирует место под ее длину,
+        которая становится известна только после кодирования.
 
-        return tree
+        :param outfile: Выходной файл для записи.
+        :return: Позиция поля длины или -1 для версии 2.
+        """
+        if self.version < 3:
+            return -1
+        start = outfile.tell()
+        outfile.write(bytes(DATA_LENGTH_SIZE))
+        return start
+
+    @staticmethod
+    def _payload_output(outfile: BinaryIO,
+                        cipher: Optional[AESCTR]
+                        ) -> Union[BinaryIO, EncryptedWriter]:
+        """
+        Возвращает объект записи содержимого секции данных, которая
+        начинается с текущей позиции: сам файл или, если задан шифр,
+        объект, шифрующий секцию AES в режиме CTR.
+
+        :param outfile: Выходной файл для записи.
+        :param cipher: Шифр секции данных или None.
+        :return: Объект с методом write.
+        """
+        if cipher is None:
+            return outfile
+        return EncryptedWriter(outfile, cipher, outfile.tell())
+
+    def _end_data(self, outfile: BinaryIO, start: int) -> None:
+        """
+        Завершает секцию данных: в версии 3 записывает ее длину в поле,
+        зарезервированное _begin_data, и индекс контрольных сумм блоков,
+        в версии 2 - маркер END_DATA.
+
+        :param outfile: Выходной файл для записи.
+        :param start: Позиция, возвращенная _begin_data.
+        """
+        if self.version < 3:
+            outfile.write(END_DATA)
+            return
+        end = outfile.tell()
+        outfile.seek(start)
+        length = end - start - DATA_LENGTH_SIZE
+        outfile.write(length.to_bytes(DATA_LENGTH_SIZE, byteorder='big'))
+        outfile.seek(end)
+        self._write_block_checksums(outfile, start + DATA_LENGTH_SIZE, length)
+
+    def _write_block_checksums(self,
+                               outfile: BinaryIO,
+                               start: int,
+                               size: int) -> None:
+        """
+        Записывает индекс контрольных сумм блоков секции данных, если
+        задан размер блока: длину индекса (varint) и байты
+        pack_block_checksums. Суммы считаются по байтам секции в архиве
+        (для защищенного файла - по зашифрованным), которые читаются
+        обратно из выходного файла.
+
+        :param outfile: Выходной файл, открытый также на чтение.
+        :param start: Смещение начала секции данных.
+        :param size: Длина секции данных.
+        """
+        if self.block_checksum_size is None:
+            return
+        end = outfile.tell()
+        digests = list(iter_block_digests(outfile, start, size,
+                                          self.block_checksum_size,
+                                          self.checksum))
+        outfile.seek(end)
+        index = pack_block_checksums(self.block_checksum_size, digests,
+                                     self.checksum)
+        outfile.write(encode_varint(len(index)))
+        outfile.write(index)
+
+    @staticmethod
+    def encrypt_tree(serialized_tree: bytes, pass_hash: bytes) -> bytes:
+        """
+        Шифрует сериализованное дерево алгоритмом AES блоками по 16 байт.
+        Последний блок дополняется нулями, их количество записывается
+        в конце.
+
+        :param serialized_tree: Сериализованное дерево или таблица длин.
+        :param pass_hash: Симметричный ключ.
+        :return: Зашифрованное дерево.
+        """
+        count = 16 - len(serialized_tree) % 16
+        padded = serialized_tree + (b'\x00' * count)
+        encrypted = get_cipher(pass_hash).encrypt(padded)
+        return encrypted + count.to_bytes(1, byteorder='big')
 
     def _generate_huffman_tree(self, file_path: str) -> HuffmanTree:
         """
-        Генерирует дерево Хаффмана для файла.
+        Генерирует дерево Хаффмана для файла. Если задан размер выборки
+        и файл больше него, частоты считаются только по выборке, а дерево
+        дополняется всеми байтами.
 
         :param file_path: Путь к файлу.
         :return: Объект дерева Хаффмана.
         """
         tree = HuffmanTree(self.codec)
-
-        with open(file_path, self.open_mode) as file:
-            for block in iter(lambda: file.read(self.block_size), b''):
-                if not block:
-                    break
-                tree.add_block(block)
+        size = max(self.block_size, COUNT_BLOCK_SIZE)
+        file_size = os.path.getsize(file_path)
+
+        if self.sample_size is not None and file_size > self.sample_size:
+            with open(file_path, 'rb') as file:
+                for offset, length in self._sample_ranges(file_size):
+                    file.seek(offset)
+                    while length > 0:
+                        block = file.read(min(length, size))
+                        tree.add_block(block)
+                        length -= len(block)
+            tree.cover_bytes()
+        else:
+            with open(file_path, self.open_mode) as file:
+                for block in iter(lambda: file.read(size), b''):
+                    if not block:
+                        break
+                    tree.add_block(block)
 
         tree.build_tree()
+        self._limit_code_lengths(tree)
         return tree
 
+    def _limit_code_lengths(self, tree: HuffmanTree) -> None:
+        """
+        Ограничивает длины кодов дерева, если задана максимальная длина,
+        и учитывает потерю степени сжатия.
+
+        :param tree: Построенное дерево Хаффмана.
+        """
+        if self.max_code_length is not None:
+            self.optimal_bits += tree.get_cost()
+            tree.limit_code_lengths(self.max_code_length)
+            self.limited_bits += tree.get_cost()
+
+    def _sample_ranges(self, file_size: int) -> List[Tuple[int, int]]:
+        """
+        Вычисляет участки файла для выборочного подсчета частот: половина
+        выборки берется из начала файла, остальное - из SAMPLE_BLOCKS
+        блоков, равномерно расположенных в оставшейся части.
+
+        :param file_size: Размер файла в байтах.
+        :return: Список пар (смещение, длина).
+        """
+        head = self.sample_size - self.sample_size // 2
+        length = (self.sample_size - head) // SAMPLE_BLOCKS
+        if not length:
+            return [(0, self.sample_size)]
+        stride = (file_size - head) // SAMPLE_BLOCKS
+        return [(0, head)] + [(head + i * stride + (stride - length) // 2,
+                               length)
+                              for i in range(SAMPLE_BLOCKS)]
+
+    def get_length_limit_loss(self) -> float:
+        """
+        Вычисляет потерю степени сжатия из-за ограничения длины кодов
+        за последний вызов compress.
+
+        :return: Прирост размера закодированных данных в процентах
+                относительно неограниченных кодов Хаффмана.
+        """
+        if not self.optimal_bits:
+            return 0
+        return (self.limited_bits - self.optimal_bits) / \
+            self.optimal_bits * 100
+
     def write_data(self,
                    outfile: BinaryIO,
                    file_path: str,
-                   hasher: MD5,
-                   tree: Optional[HuffmanTree]) -> None:
+                   hasher: Hasher,
+                   tree: Optional[HuffmanTree],
+                   encoder: Union[BitEncoder, NumpyEncoder,
+                                  AdaptiveEncoder, None] = None,
+                   cipher: Optional[AESCTR] = None) -> None:
         """
         Записывает данные файла в архив.
 
+        Если задан интервал контрольных точек, при кодировании по дереву
+        после каждых checkpoint_size символов запоминается пара (позиция
+        в данных файла, битовое смещение в сжатых данных), а после секции
+        данных (и индекса контрольных сумм блоков, если он есть)
+        записывается индекс этих точек: длина (varint) и байты
+        pack_checkpoints. Точки ставятся на границах блоков чтения.
+
         :param outfile: Выходной файл для записи.
         :param file_path: Путь к файлу.
         :param hasher: Объект для хеширования.
         :param tree: Объект дерева Хаффмана.
+        :param encoder: Кодировщик данных. По умолчанию None (создается
+              по дереву). Адаптивный кодировщик принимает только байты.
+        :param cipher: Шифр секции данных защищенного файла. По умолчанию
+              None (данные записываются открыто).
         """
-        if tree:
-            codes = tree.get_codes()
+        if tree and encoder is None:
+            encoder = create_encoder(tree)
+
+        if encoder is not None:
+            to_bytes = isinstance(encoder, AdaptiveEncoder)
+            checkpoints = None
+            if tree and self.checkpoint_size is not None:
+                checkpoints = []
+            position = last = 0
+            start = self._begin_data(outfile)
+            output = self._payload_output(outfile, cipher)
 
             with open(file_path, self.open_mode) as file:
-                buffer = ''
                 for block in iter(lambda: file.read(self.block_size), b''):
                     if not block:
                         break
 
                     if self.open_mode == 'rb':
-                        hasher.hash(block)
+                        data = block
                     else:
-                        hasher.hash(block.encode())
+                        data = block.encode()
+                    hasher.hash(data)
 
-                    if tree:
-                        buffer += ''.join([codes[obj] for obj in block])
-
-                    buffer, compressed_block = self._bits_to_bytes(buffer)
-                    outfile.write(compressed_block)
+                    output.write(encoder.encode(data if to_bytes else block))
+                    position += len(block)
+                    if (checkpoints is not None and
+                            position - last >= self.checkpoint_size):
+                        checkpoints.append((position, encoder.bit_position))
+                        last = position
 
                     self.progress_bar.update(len(block))
 
-                if buffer:
-                    byte, byte_count = self._adder_zero(buffer)
-                    outfile.write(byte)
-                    outfile.write(byte_count)
-                else:
-                    outfile.write(bytes([0]))
+                output.write(encoder.flush())
+            self._end_data(outfile, start)
+            if checkpoints is not None:
+                index = pack_checkpoints(checkpoints)
+                outfile.write(encode_varint(len(index)))
+                outfile.write(index)
+        elif self.version < 3:
+            outfile.write(END_DATA)
 
-        outfile.write(END_DATA)
         outfile.write(hasher.get_hash())
 
-    @staticmethod
-    def _bits_to_bytes(bits: str) -> Tuple[str, bytes]:
+    def write_blocks(self,
+                     outfile: BinaryIO,
+                     file_path: str,
+                     hasher: Hasher,
+                     pass_hash: Optional[bytes],
+                     cipher: Optional[AESCTR] = None) -> None:
         """
-        Преобразует биты в байты.
+        Записывает данные файла блоками с собственными таблицами кодов.
+
+        Последовательность блоков образует секцию данных элемента. Каждый
+        блок начинается с флага. За флагом BLOCK_NEW_TABLE следуют
+        длина таблицы длин канонических кодов (varint) и сама таблица,
+        зашифрованная для защищенного файла; за флагом BLOCK_REUSE_TABLE
+        таблицы нет. Далее идут количество символов блока и длина
+        закодированного блока (varint) и сам блок. Последовательность
+        завершается флагом BLOCK_END.
+
+        При нескольких процессах счетчики частот и деревья блоков
+        строятся в пуле, в основном процессе остается только выбор между
+        собственной и предыдущей таблицей, после чего блоки кодируются
+        в пуле и записываются в исходном порядке. Поэтому результат
+        не зависит от количества процессов.
 
-        :param bits: Строка с битами.
-        :return: Кортеж с оставшимися битами и байтами.
+        :param outfile: Выходной файл для записи.
+        :param file_path: Путь к файлу.
+        :param hasher: Объект для хеширования.
+        :param pass_hash: Пароль для зашифрованного файла.
+        :param cipher: Шифр секции данных защищенного файла. По умолчанию
+              None (блоки записываются открыто).
         """
-        bytes_list = []
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers)
+        pending: Deque[Tuple[Optional[bytes], Union[bytes, str],
+                             Union[bytes, Future]]] = deque()
+        start = self._begin_data(outfile)
+        output = self._payload_output(outfile, cipher)
+        try:
+            for new_table, table, tree, block in self._plan_blocks(file_path,
+                                                                   pool):
+                if pool is None:
+                    encoded = encode_block(tree, block)
+                else:
+                    encoded = pool.submit(encode_block_with_table,
+                                          table, self.codec, block)
+                pending.append((new_table, block, encoded))
+                while len(pending) > 2 * self.workers - 1:
+                    self._write_block(output, hasher, pass_hash,
+                                      *pending.popleft())
+            while pending:
+                self._write_block(output, hasher, pass_hash,
+                                  *pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        output.write(bytes([BLOCK_END]))
+        self._end_data(outfile, start)
+        outfile.write(hasher.get_hash())
 
-        while len(bits) >= 8:
-            byte = bits[:8]
-            bits = bits[8:]
-            bytes_list.append(int(byte, 2))
+    def _plan_blocks(self,
+                     file_path: str,
+                     pool: Optional[ProcessPoolExecutor] = None) -> Iterator[
+            Tuple[Optional[bytes], bytes, HuffmanTree, Union[bytes, str]]]:
+        """
+        Читает файл блоками и выбирает таблицу для каждого блока:
+        собственную, таблицу предыдущего блока или общую таблицу файла.
 
-        return bits, bytes(bytes_list)
+        :param file_path: Путь к файлу.
+        :param pool: Пул процессов, в котором строятся деревья блоков.
+              По умолчанию None (деревья строятся в текущем процессе).
+        :return: Итератор кортежей из новой таблицы (None, если блок
+                использует предыдущую), таблицы и дерева, которыми
+                кодируется блок, и самого блока.
+        """
+        previous = None
+        shared = None
+        if self.shared_table:
+            shared = self._generate_huffman_tree(file_path)
+            shared.canonize()
 
-    @staticmethod
-    def _adder_zero(bits: str) -> Tuple[bytes, bytes]:
+        with open(file_path, self.open_mode) as file:
+            if shared is not None:
+                trees = ((shared, shared.serialize_code_lengths(), block)
+                         for block in self._read_blocks(file))
+            else:
+                trees = self._block_trees(file, pool)
+
+            for tree, table, block in trees:
+                if previous is not None and (
+                        tree is previous[1] or
+                        reuse_saves_bits(tree, len(table), previous[1])):
+                    yield None, previous[0], previous[1], block
+                else:
+                    previous = table, tree
+                    yield table, table, tree, block
+
+    def _read_blocks(self, file: Union[BinaryIO, TextIO]) -> Iterator[
+            Union[bytes, str]]:
+        """
+        Читает файл блоками по table_block_size символов.
+
+        :param file: Открытый файл.
+        :return: Итератор блоков.
+        """
+        for block in iter(lambda: file.read(self.table_block_size), b''):
+            if not block:
+                break
+            yield block
+
+    def _block_trees(self,
+                     file: Union[BinaryIO, TextIO],
+                     pool: Optional[ProcessPoolExecutor]) -> Iterator[
+            Tuple[HuffmanTree, bytes, Union[bytes, str]]]:
+        """
+        Строит собственное дерево каждого блока файла. В пуле деревья
+        строятся с опережением, но возвращаются в порядке блоков.
+
+        :param file: Открытый файл.
+        :param pool: Пул процессов или None.
+        :return: Итератор кортежей из дерева блока, его таблицы и блока.
+        """
+        pending: Deque[Tuple[Union[bytes, str],
+                             Union[Tuple[HuffmanTree, bytes, int],
+                                   Future]]] = deque()
+        for block in self._read_blocks(file):
+            if pool is None:
+                built = build_block_tree(self.codec, self.max_code_length,
+                                         block)
+            else:
+                built = pool.submit(build_block_tree, self.codec,
+                                    self.max_code_length, block)
+            pending.append((block, built))
+            while len(pending) > 2 * self.workers - 1:
+                yield self._block_tree(*pending.popleft())
+        while pending:
+            yield self._block_tree(*pending.popleft())
+
+    def _block_tree(self,
+                    block: Union[bytes, str],
+                    built: Union[Tuple[HuffmanTree, bytes, int], Future]
+                    ) -> Tuple[HuffmanTree, bytes, Union[bytes, str]]:
         """
-        Добавляет нули в конец битовой строки.
+        Получает дерево блока, построенное build_block_tree, и учитывает
+        потерю степени сжатия от ограничения длин кодов.
 
-        :param bits: Битовая строка.
-        :return: Кортеж с байтом и количеством добавленных нулей.
+        :param block: Блок данных.
+        :param built: Результат build_block_tree или его Future.
+        :return: Дерево блока, его таблица и блок.
+        """
+        if isinstance(built, Future):
+            built = built.result()
+        tree, table, optimal = built
+        if self.max_code_length is not None:
+            self.optimal_bits += optimal
+            self.limited_bits += tree.get_cost()
+        return tree, table, block
+
+    def _write_block(self,
+                     outfile: Union[BinaryIO, EncryptedWriter],
+                     hasher: Hasher,
+                     pass_hash: Optional[bytes],
+                     new_table: Optional[bytes],
+                     block: Union[bytes, str],
+                     encoded: Union[bytes, Future]) -> None:
         """
-        count = (8 - (len(bits) % 8)) % 8
-        bits += '0' * count
-        byte = int(bits, 2).to_bytes(1, byteorder='big')
-        count_bits = count.to_bytes(1, byteorder='big')
-        return byte, count_bits
+        Записывает блок в архив в формате write_blocks.
+
+        :param outfile: Выходной файл или объект записи секции данных
+              (см. _payload_output).
+        :param hasher: Объект для хеширования.
+        :param pass_hash: Пароль для зашифрованного файла.
+        :param new_table: Новая таблица блока или None.
+        :param block: Исходный блок данных.
+        :param encoded: Закодированный блок или его Future.
+        """
+        if isinstance(encoded, Future):
+            encoded = encoded.result()
+
+        if new_table is None:
+            outfile.write(bytes([BLOCK_REUSE_TABLE]))
+        else:
+            hasher.hash(new_table)
+            if pass_hash:
+                new_table = self.encrypt_tree(new_table, pass_hash)
+            outfile.write(bytes([BLOCK_NEW_TABLE]))
+            outfile.write(encode_varint(len(new_table)))
+            outfile.write(new_table)
+
+        outfile.write(encode_varint(len(block)))
+        outfile.write(encode_varint(len(encoded)))
+        outfile.write(encoded)
+
+        if self.open_mode == 'rb':
+            hasher.hash(block)
+        else:
+            hasher.hash(block.encode())
+        self.progress_bar.update(len(block))
 
     @staticmethod
     def get_directory_info(path: str) -> Tuple[int, Dict[str, str]]:
@@ -367,3 +994,34 @@ class Compressor(ICompressor):
             return os.path.getsize(path), {path: "file"}
         else:
             return 0, {}
+
+
+def _compress_entry(compressor: Compressor,
+                    path: str,
+                    item_type: str,
+                    path_in: str,
+                    protected_files: Optional[Dict[str, bytes]],
+                    spill_path: str
+                    ) -> Tuple[str, DirectoryEntry, int, int]:
+    """
+    Сжимает один элемент архива во временный файл в дочернем процессе.
+
+    :param compressor: Копия компрессора с настройками архива.
+    :param path: Путь к элементу.
+    :param item_type: Тип элемента из get_directory_info.
+    :param path_in: Исходный путь файла или директории.
+    :param protected_files: Пароль элемента, если он защищен.
+    :param spill_path: Путь к временному файлу.
+    :return: Кортеж из пути к временному файлу, записи каталога
+            (со смещением во временном файле) и размеров данных в битах
+            без ограничения длины кодов и с ним.
+    """
+    compressor.progress_bar = ProgressBar(visible=False)
+    compressor.workers = 1
+    compressor.optimal_bits = 0
+    compressor.limited_bits = 0
+    with open(spill_path, 'w+b') as spill:
+        entry = compressor.compress_entry(spill, path, item_type, path_in,
+                                          protected_files)
+    return (spill_path, entry, compressor.optimal_bits,
+            compressor.limited_bits)
@@ -23,3 +23,129 @@ END_DATA: bytes = b'\x8F\xE2\xB3\x41'
 """
 Байты, обозначающие окончание блока данных в архиве.
 """
+
+SUPPORTED_VERSIONS: tuple = (2, 3)
+"""
+Версии формата архива, которые умеет читать распаковщик. Версия 2
+разделяет секции элемента маркерами END_PATH, END_TREE и END_DATA,
+версия 3 записывает перед каждой секцией ее длину.
+"""
+
+DATA_LENGTH_SIZE: int = 8
+"""
+Размер поля длины секции данных в архиве версии 3 (big-endian).
+Длины пути и дерева записываются в формате varint.
+"""
+
+DIRECTORY_MAGIC: bytes = b'\x48\x75\x66\x44'
+"""
+Байты, с которых начинается завершающий блок архива версии 3,
+указывающий на центральный каталог.
+"""
+
+TRAILER_SIZE: int = len(DIRECTORY_MAGIC) + 8 + 8 + 16
+"""
+Размер завершающего блока: DIRECTORY_MAGIC, смещение и размер каталога
+(8 байт, big-endian) и 16-байтный хеш каталога.
+"""
+
+TREE_PICKLE: int = 0
+"""
+Формат дерева в заголовке архива: дерево, сериализованное pickle.
+"""
+
+TREE_CANONICAL: int = 1
+"""
+Формат дерева в заголовке архива: таблица длин канонических кодов.
+"""
+
+CODING_STATIC: int = 0
+"""
+Режим кодирования в заголовке архива: статический код Хаффмана,
+дерево которого записывается перед данными файла.
+"""
+
+CODING_ADAPTIVE: int = 1
+"""
+Режим кодирования в заголовке архива: адаптивный код Хаффмана
+без записанного дерева.
+"""
+
+CODING_BLOCKS: int = 2
+"""
+Режим кодирования в заголовке архива: файл разбит на блоки, каждый
+со своей таблицей длин канонических кодов или с таблицей предыдущего
+блока.
+"""
+
+CHECKPOINTS_NONE: int = 0
+"""
+Флаг контрольных точек в заголовке архива: индекса контрольных точек
+нет.
+"""
+
+CHECKPOINTS_INDEX: int = 1
+"""
+Флаг контрольных точек в заголовке архива: после секции данных каждого
+непустого файла записан индекс контрольных точек для чтения фрагментов
+без декодирования файла с начала.
+"""
+
+ENCRYPTION_TREE: int = 0
+"""
+Режим шифрования в заголовке архива: у защищенного файла шифруются
+только дерево или таблицы кодов, данные записываются открыто.
+"""
+
+ENCRYPTION_CTR: int = 1
+"""
+Режим шифрования в заголовке архива: у защищенного файла после байтов
+аутентификации записан nonce, а вся секция данных зашифрована AES
+в режиме CTR.
+"""
+
+CHECKSUM_MD5: int = 0
+"""
+Алгоритм хеша файлов в заголовке архива: MD5 на чистом Python
+(encryption.hasher.MD5). Единственный алгоритм архива версии 2.
+"""
+
+CHECKSUM_CRC32: int = 1
+"""
+Алгоритм хеша файлов в заголовке архива: CRC-32 (zlib.crc32).
+"""
+
+CHECKSUM_BLAKE2: int = 2
+"""
+Алгоритм хеша файлов в заголовке архива: BLAKE2b длиной 16 байт
+(hashlib).
+"""
+
+BLOCK_END: int = 0
+"""
+Флаг блока: блоков файла больше нет.
+"""
+
+BLOCK_NEW_TABLE: int = 1
+"""
+Флаг блока: перед данными блока записана его таблица длин кодов.
+"""
+
+BLOCK_REUSE_TABLE: int = 2
+"""
+Флаг блока: блок закодирован таблицей предыдущего блока.
+"""
+
+BLOCK_CHECKSUMS_NONE: int = 0
+"""
+Флаг контрольных сумм блоков в заголовке архива: индекса контрольных
+сумм блоков нет, целостность файла проверяется только его хешем.
+"""
+
+BLOCK_CHECKSUMS_INDEX: int = 1
+"""
+Флаг контрольных сумм блоков в заголовке архива: сразу после секции
+данных каждого непустого файла записан индекс контрольных сумм блоков
+секции (см. huffman_method.integrity), который проверяется до
+декодирования файла.
+"""
@@ -0,0 +1,191 @@
+import getpass
+import os
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from encryption.hasher import MD5
+from huffman_method.directory import match_path
+
+KEY_CACHE_SIZE: int = 64
+"""
+Количество паролей, для которых ключ (MD5 пароля) хранится в кэше
+процесса.
+"""
+
+PASSWORD_ENV: str = 'HUFFMAN_PASSWORD'
+"""
+Переменная окружения с паролем по умолчанию для EnvironmentProvider.
+"""
+
+
+@lru_cache(maxsize=KEY_CACHE_SIZE)
+def derive_key(password: str) -> bytes:
+    """
+    Возвращает симметричный ключ пароля: MD5 от его байт в UTF-8. Ключ
+    вычисляется один раз для каждого пароля, а расписание раундовых
+    ключей AES для него хранит encryption.coding.get_cipher.
+
+    :param password: Пароль.
+    :return: Ключ из 16 байт.
+    """
+    hasher = MD5()
+    hasher.hash(password.encode())
+    return hasher.get_hash()
+
+
+class CredentialProvider(ABC):
+    """
+    Источник паролей защищенных файлов архива. Наследники определяют
+    get_password; пароль запрашивается по пути файла в архиве.
+    """
+
+    attempts: int = 1
+    """
+    Количество попыток ввода пароля для одного файла.
+    """
+
+    @abstractmethod
+    def get_password(self, path: str, attempt: int = 0) -> Optional[str]:
+        """
+        Возвращает пароль файла.
+
+        :param path: Путь файла в архиве ('.' для архива одного файла).
+        :param attempt: Номер попытки, начиная с 0.
+        :return: Пароль или None, если пароля для файла нет.
+        """
+        pass
+
+    def get_key(self, path: str, attempt: int = 0) -> Optional[bytes]:
+        """
+        Возвращает ключ файла, вычисленный по паролю (см. derive_key).
+
+        :param path: Путь файла в архиве.
+        :param attempt: Номер попытки, начиная с 0.
+        :return: Ключ или None, если пароля для файла нет.
+        """
+        password = self.get_password(path, attempt)
+        if not password:
+            return None
+        return derive_key(password)
+
+
+class PromptProvider(CredentialProvider):
+    """
+    Запрашивает пароль у пользователя в терминале (getpass), давая три
+    попытки на файл. Используется распаковщиком по умолчанию.
+    """
+
+    attempts: int = 3
+
+    def get_password(self, path: str, attempt: int = 0) -> Optional[str]:
+        """
+        Запрашивает пароль файла.
+
+        :param path: Путь файла в архиве.
+        :param attempt: Номер попытки, начиная с 0.
+        :return: Введенный пароль; пустая строка пропускает файл.
+        """
+        if not attempt:
+            print(f'\nВведите пароль от файла {path} '
+                  '(или пустую строку чтобы пропустить файл):')
+        return getpass.getpass()
+
+
+class PasswordFileProvider(CredentialProvider):
+    """
+    Пароли из файла, сопоставляющего пути файлов архива паролям. Каждая
+    строка имеет вид "шаблон = пароль": шаблон - путь или glob-шаблон
+    (сравнивается match_path, как при выборе элементов распаковщиком),
+    пароль - остаток строки после первого знака "=" без пробелов по
+    краям. Пустые строки и строки, начинающиеся с "#", пропускаются.
+    Файлу подходит первый совпавший шаблон.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Читает файл паролей.
+
+        :param path: Путь к файлу паролей (UTF-8).
+        :raises ValueError: Если файл не найден или строка не содержит
+               шаблон и пароль.
+        """
+        if not os.path.isfile(path):
+            raise ValueError(f'Файл паролей [{path}] не найден')
+        self.rules: List[Tuple[str, str]] = []
+        with open(path, 'r', encoding='utf-8') as file:
+            for number, line in enumerate(file, 1):
+                line = line.strip()
+                if not line or line.startswith('#'):
+                    continue
+                pattern, separator, password = line.partition('=')
+                pattern = pattern.strip()
+                password = password.strip()
+                if not separator or not pattern or not password:
+                    raise ValueError(f'Ошибка в файле паролей '
+                                     f'[{path}, строка {number}]')
+                self.rules.append((os.path.normpath(pattern), password))
+
+    def get_password(self, path: str, attempt: int = 0) -> Optional[str]:
+        """
+        Возвращает пароль первого шаблона, подходящего под путь.
+
+        :param path: Путь файла в архиве.
+        :param attempt: Номер попытки (не используется).
+        :return: Пароль или None, если ни один шаблон не подходит.
+        """
+        path = os.path.normpath(path)
+        for pattern, password in self.rules:
+            if match_path(path, [pattern]):
+                return password
+        return None
+
+
+class EnvironmentProvider(CredentialProvider):
+    """
+    Один пароль для всех защищенных файлов из переменной окружения.
+    """
+
+    def __init__(self, variable: str = PASSWORD_ENV) -> None:
+        """
+        Инициализирует источник.
+
+        :param variable: Имя переменной окружения. По умолчанию
+              PASSWORD_ENV.
+        """
+        self.variable: str = variable
+
+    def get_password(self, path: str, attempt: int = 0) -> Optional[str]:
+        """
+        Возвращает значение переменной окружения.
+
+        :param path: Путь файла в архиве (не используется).
+        :param attempt: Номер попытки (не используется).
+        :return: Пароль или None, если переменная не задана или пуста.
+        """
+        return os.environ.get(self.variable) or None
+
+
+class CallbackProvider(CredentialProvider):
+    """
+    Пароли, которые возвращает функция приложения.
+    """
+
+    def __init__(self, callback: Callable[[str], Optional[str]]) -> None:
+        """
+        Инициализирует источник.
+
+        :param callback: Функция, принимающая путь файла в архиве и
+              возвращающая пароль или None.
+        """
+        self.callback: Callable[[str], Optional[str]] = callback
+
+    def get_password(self, path: str, attempt: int = 0) -> Optional[str]:
+        """
+        Возвращает пароль, полученный от функции.
+
+        :param path: Путь файла в архиве.
+        :param attempt: Номер попытки (не используется).
+        :return: Пароль или None.
+        """
+        return self.callback(path)
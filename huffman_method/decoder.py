@@ -0,0 +1,290 @@
+import struct
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from huffman_method.canonical import Symbol, canonical_codes
+from huffman_method.huffman import HuffmanTree
+from huffman_method.numpy_backend import NumpyDecoder, numpy_can_decode
+
+DEFAULT_TABLE_BITS: int = 10
+"""
+Количество бит, декодируемых одним обращением к таблице по умолчанию.
+"""
+
+
+class TableDecoder:
+    """
+    Декодер Хаффмана, читающий по k бит за раз через таблицу поиска.
+
+    Каждая запись таблицы содержит все символы, которые целиком помещаются
+    в k бит, и число использованных бит. Коды длиннее k бит дочитываются
+    по одному биту по префиксному дереву (медленный путь).
+    """
+
+    def __init__(self,
+                 codes: Dict[Symbol, str],
+                 codec: Optional[str] = None,
+                 table_bits: int = DEFAULT_TABLE_BITS) -> None:
+        """
+        Инициализирует декодер по кодам символов.
+
+        :param codes: Словарь кодов символов ('0'/'1' строки).
+        :param codec: Кодек данных. None для бинарного режима.
+        :param table_bits: Максимальное число бит на одно обращение
+              к таблице. По умолчанию 10.
+        :raises ValueError: Если коды пусты или не являются префиксными.
+        """
+        if not codes:
+            raise ValueError('Дерево Хаффмана пусто. '
+                             'невозможно декодировать данные')
+        self.codec: Optional[str] = codec
+        self._empty: Union[bytes, str] = b'' if codec is None else ''
+
+        self._children: List[List[int]] = [[-1, -1]]
+        self._leaf: List[Optional[Union[bytes, str]]] = [None]
+        self._build_trie(codes)
+
+        self.table_bits: int = max(1, table_bits)
+        self._symbols: List[Union[bytes, str]] = []
+        self._consumed: List[int] = []
+        self._nodes: List[int] = []
+        self._build_table(0, 0, [], 0)
+
+        self._acc: int = 0
+        self._nbits: int = 0
+        self._skip: int = 0
+
+    @classmethod
+    def from_tree(cls,
+                  tree: HuffmanTree,
+                  table_bits: int = DEFAULT_TABLE_BITS) -> 'TableDecoder':
+        """
+        Создает декодер по дереву Хаффмана.
+
+        :param tree: Дерево Хаффмана.
+        :param table_bits: Максимальное число бит на одно обращение
+              к таблице.
+        :return: Объект декодера.
+        """
+        return cls(tree.get_codes(), tree.get_codec(), table_bits)
+
+    @classmethod
+    def from_code_lengths(cls,
+                          lengths: Dict[Symbol, int],
+                          codec: Optional[str] = None,
+                          table_bits: int = DEFAULT_TABLE_BITS
+                          ) -> 'TableDecoder':
+        """
+        Создает декодер по длинам канонических кодов.
+
+        :param lengths: Словарь длин кодов символов.
+        :param codec: Кодек данных. None для бинарного режима.
+        :param table_bits: Максимальное число бит на одно обращение
+              к таблице.
+        :return: Объект декодера.
+        """
+        return cls(canonical_codes(lengths), codec, table_bits)
+
+    def _build_trie(self, codes: Dict[Symbol, str]) -> None:
+        """
+        Строит префиксное дерево кодов в виде массивов.
+
+        :param codes: Словарь кодов символов.
+        :raises ValueError: Если коды не являются префиксными.
+        """
+        children = self._children
+        leaf = self._leaf
+        for char, code in codes.items():
+            node = 0
+            for bit in code:
+                if leaf[node] is not None:
+                    raise ValueError('Коды не являются префиксными')
+                branch = 1 if bit == '1' else 0
+                if children[node][branch] < 0:
+                    children[node][branch] = len(children)
+                    children.append([-1, -1])
+                    leaf.append(None)
+                node = children[node][branch]
+            if leaf[node] is not None or children[node] != [-1, -1]:
+                raise ValueError('Коды не являются префиксными')
+            leaf[node] = bytes([char]) if self.codec is None else char
+
+    def _build_table(self,
+                     depth: int,
+                     node: int,
+                     emitted: List[Union[bytes, str]],
+                     boundary: int) -> None:
+        """
+        Рекурсивно заполняет таблицу для всех продолжений текущего
+        префикса длины depth.
+
+        :param depth: Длина уже разобранного префикса.
+        :param node: Текущий узел префиксного дерева.
+        :param emitted: Символы, полностью декодированные из префикса.
+        :param boundary: Число бит, занятых этими символами.
+        """
+        if depth == self.table_bits or node < 0:
+            count = 1 << (self.table_bits - depth)
+            self._symbols.extend([self._empty.join(emitted)] * count)
+            self._consumed.extend([boundary] * count)
+            self._nodes.extend([node if not emitted else 0] * count)
+            return
+
+        for branch in (0, 1):
+            child = self._children[node][branch]
+            if child >= 0 and self._leaf[child] is not None:
+                self._build_table(depth + 1, 0,
+                                  emitted + [self._leaf[child]], depth + 1)
+            else:
+                self._build_table(depth + 1, child, emitted, boundary)
+
+    def reset(self, skip: int = 0) -> None:
+        """
+        Сбрасывает накопленные, но еще не декодированные биты.
+
+        :param skip: Количество старших бит первого байта следующей
+              порции, которые нужно пропустить (0-7). Так декодирование
+              начинается с кода, который не выровнен по байту.
+        """
+        self._acc = 0
+        self._nbits = 0
+        self._skip = skip
+
+    def decode(self,
+               data: bytes,
+               padding: int = -1) -> Union[bytes, str]:
+        """
+        Декодирует очередную порцию сжатых данных.
+
+        Неполный код в конце порции сохраняется и дочитывается при
+        следующем вызове.
+
+        :param data: Сжатые байты.
+        :param padding: Количество нулевых бит дополнения в конце потока.
+              Значение -1 означает, что поток еще не закончен.
+        :return: Декодированные данные.
+        :raises ValueError: Если данные содержат недопустимый код.
+        """
+        out: List[Union[bytes, str]] = []
+        reserve = max(padding, 0)
+        if self._skip and data:
+            self._nbits = 8 - self._skip
+            self._acc = data[0] & ((1 << self._nbits) - 1)
+            self._skip = 0
+            data = data[1:]
+        full = len(data) - len(data) % 8
+        if full:
+            words = struct.unpack(f'>{full // 8}Q', data[:full])
+            self._decode_words(words, 64, out, reserve)
+        if full < len(data):
+            tail = data[full:]
+            self._decode_words((int.from_bytes(tail, 'big'),),
+                               8 * len(tail), out, reserve)
+        if padding >= 0:
+            self._decode_tail(padding, out)
+        return self._empty.join(out)
+
+    def _decode_words(self,
+                      words: Tuple[int, ...],
+                      width: int,
+                      out: List[Union[bytes, str]],
+                      reserve: int = 0) -> None:
+        """
+        Быстрый путь: декодирует слова фиксированной ширины по таблице.
+
+        :param words: Слова сжатых данных.
+        :param width: Ширина слова в битах.
+        :param out: Список для декодированных фрагментов.
+        :param reserve: Количество последних бит, которые нельзя
+              декодировать (биты дополнения в конце потока).
+        """
+        k = self.table_bits
+        limit = k + reserve
+        mask = (1 << k) - 1
+        symbols = self._symbols
+        consumed = self._consumed
+        append = out.append
+        acc = self._acc
+        nbits = self._nbits
+
+        for word in words:
+            acc = (acc << width) | word
+            nbits += width
+            while nbits >= limit:
+                index = (acc >> (nbits - k)) & mask
+                used = consumed[index]
+                if used:
+                    append(symbols[index])
+                    nbits -= used
+                    continue
+                pos = self._walk(acc, nbits - k, self._nodes[index], append,
+                                 reserve)
+                if pos < 0:
+                    break
+                nbits = pos
+            acc &= (1 << nbits) - 1
+
+        self._acc = acc
+        self._nbits = nbits
+
+    def _walk(self,
+              acc: int,
+              pos: int,
+              node: int,
+              append: Callable[[Union[bytes, str]], None],
+              reserve: int = 0) -> int:
+        """
+        Медленный путь: дочитывает длинный код по одному биту.
+
+        :param acc: Накопитель бит.
+        :param pos: Число еще не прочитанных бит в накопителе.
+        :param node: Узел префиксного дерева, с которого начинается чтение.
+        :param append: Функция добавления декодированного символа.
+        :param reserve: Количество последних бит, которые нельзя читать.
+        :return: Число оставшихся бит после кода или -1, если битов
+                не хватило.
+        :raises ValueError: Если встречен недопустимый код.
+        """
+        children = self._children
+        leaf = self._leaf
+        while True:
+            if node < 0:
+                raise ValueError('Файл поврежден [Недопустимый код '
+                                 'Хаффмана]')
+            if leaf[node] is not None:
+                append(leaf[node])
+                return pos
+            if pos <= reserve:
+                return -1
+            pos -= 1
+            node = children[node][(acc >> pos) & 1]
+
+    def _decode_tail(self, padding: int, out: List[Union[bytes, str]]) -> None:
+        """
+        Декодирует остаток потока после отбрасывания бит дополнения.
+
+        :param padding: Количество нулевых бит дополнения.
+        :param out: Список для декодированных фрагментов.
+        """
+        nbits = max(self._nbits - padding, 0)
+        acc = self._acc >> (self._nbits - nbits)
+        while nbits > 0:
+            pos = self._walk(acc, nbits, 0, out.append)
+            if pos < 0:
+                break
+            nbits = pos
+        self.reset()
+
+
+def create_decoder(tree: HuffmanTree) -> Union[TableDecoder, NumpyDecoder]:
+    """
+    Создает самый быстрый доступный декодер для дерева: векторный,
+    если установлен NumPy, данные бинарные и коды достаточно короткие,
+    иначе TableDecoder.
+
+    :param tree: Дерево Хаффмана.
+    :return: Объект декодера.
+    """
+    codes = tree.get_codes()
+    if numpy_can_decode(codes, tree.get_codec()):
+        return NumpyDecoder(codes)
+    return TableDecoder(codes, tree.get_codec())
@@ -1,40 +1,128 @@
 import os
-import getpass
-from typing import Tuple, Optional, BinaryIO, Union, TextIO
-
-from encryption.hasher import MD5
-from encryption.coding import aes_decrypt
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import (Deque, Dict, List, Tuple, Optional, BinaryIO, Union,
+                    TextIO)
+
+from encryption.coding import (AESCTR, CTR_NONCE_SIZE, aes_decrypt,
+                               get_cipher)
 from huffman_method.huffman import HuffmanTree
+from huffman_method.decoder import TableDecoder, create_decoder
+from huffman_method.numpy_backend import NumpyDecoder
+from huffman_method.payload import DecryptedReader
+from huffman_method.adaptive import AdaptiveDecoder
+from huffman_method.blocks import decode_block_with_table
+from huffman_method.checkpoints import CheckpointReader, unpack_checkpoints
+from huffman_method.checksum import CHECKSUMS, Hasher, create_hasher
+from huffman_method.credentials import CredentialProvider, PromptProvider
+from huffman_method.directory import (DirectoryEntry, match_path,
+                                      read_directory)
+from huffman_method.integrity import (BlockVerifier, find_damaged_block,
+                                      unpack_block_checksums)
 from interfaces.decompress import IDecompressor
 from huffman_method.const_byte import *
 from progress_bar import ProgressBar
 
+DATA_CHUNK_SIZE: int = 1 << 16
+"""
+Размер порции (в байтах), которой читается секция данных известной длины
+в архиве версии 3.
+"""
+
+
+class NullOutput:
+    """
+    Приемник декодированных данных в режиме проверки архива: данные
+    отбрасываются, файлы не создаются.
+    """
+
+    def write(self, data: Union[bytes, str]) -> int:
+        """
+        Отбрасывает данные.
+
+        :param data: Декодированные данные.
+        :return: Длина данных.
+        """
+        return len(data)
+
+    def __enter__(self) -> 'NullOutput':
+        """
+        Позволяет использовать приемник вместо файла в операторе with.
+        """
+        return self
+
+    def __exit__(self, *args) -> None:
+        """
+        Ничего не закрывает: ресурсов у приемника нет.
+        """
+        return None
+
 
 class Decompressor(IDecompressor):
     """
     Класс для декомпрессии архива методом Хаффмана.
     """
 
-    def __init__(self, block_size: int = 512) -> None:
+    def __init__(self, block_size: int = 512, workers: int = 1,
+                 credentials: Optional[CredentialProvider] = None) -> None:
         """
         Инициализирует объект Decompressor.
 
         :param block_size: Размер блока для чтения данных из архива.
+        :param workers: Количество процессов, распаковывающих файлы архива
+              или декодирующих блоки файла параллельно. По умолчанию 1.
+        :param credentials: Источник паролей защищенных файлов.
+              По умолчанию None (запрос пароля в терминале,
+              PromptProvider).
+        :raises ValueError: Если количество процессов меньше 1.
         """
+        if workers < 1:
+            raise ValueError(f'Недопустимое количество процессов '
+                             f'[{workers}]')
         self.block_size = block_size
-        self.version = 2
+        self.workers = workers
+        self.version = SUPPORTED_VERSIONS[-1]
         self.codec = None
+        self.canonical = False
+        self.adaptive = False
+        self.block_tables = False
+        self.checkpoints = False
+        self.encrypt_payload = False
+        self.checksum = CHECKSUM_MD5
+        self.block_checksums = False
         self.open_mode = ''
         self.progress_bar = ProgressBar()
         self.out_path = ''
         self.archive_path = ''
+        self.directory: List[DirectoryEntry] = []
+        self.entries_end = 0
+        self.verify_only = False
+        if credentials is None:
+            credentials = PromptProvider()
+        self.credentials: Optional[CredentialProvider] = credentials
+        self.credential_keys: Dict[int, Optional[bytes]] = {}
+
+    def __getstate__(self) -> dict:
+        """
+        Состояние для передачи в дочерний процесс без источника паролей:
+        ключи защищенных файлов к этому моменту уже получены
+        (см. resolve_credentials), а источник может быть непереносимым,
+        например функцией.
+        """
+        state = self.__dict__.copy()
+        state['credentials'] = None
+        return state
 
-    def decompress(self, archive_path: str, out_path: str) -> bool:
+    def decompress(self, archive_path: str, out_path: str,
+                   patterns: Optional[List[str]] = None) -> bool:
         """
         Декомпрессия архива.
 
         :param archive_path: Путь к архиву.
         :param out_path: Путь для извлечения файлов из архива.
+        :param patterns: Пути или glob-шаблоны извлекаемых элементов
+              (см. match_path). По умолчанию None (извлечь все).
         :return: Результат операции (True - успешно, False - ошибка).
         """
         if os.path.isfile(out_path):
@@ -45,6 +133,50 @@ class Decompressor(IDecompressor):
             raise ValueError(f'Is empty string [{out_path}]')
 
         self.out_path = out_path
+        self.verify_only = False
+        return self._process_archive(archive_path, patterns,
+                                     self.workers == 1 and patterns is None)
+
+    def test(self, archive_path: str,
+             patterns: Optional[List[str]] = None) -> bool:
+        """
+        Проверяет целостность архива: декодирует элементы и сверяет хеши,
+        как при распаковке, но отбрасывает данные вместо записи файлов.
+        Проверка не останавливается на первой ошибке: сообщение выводится
+        для каждого поврежденного элемента.
+
+        :param archive_path: Путь к архиву.
+        :param patterns: Пути или glob-шаблоны проверяемых элементов.
+              По умолчанию None (проверить все).
+        :return: True, если все проверенные элементы целы.
+        :raises ValueError: Если архив не найден.
+        """
+        if not os.path.exists(archive_path):
+            raise ValueError(f'No search archive file [{archive_path}]')
+
+        self.out_path = ''
+        self.verify_only = True
+        try:
+            return self._process_archive(archive_path, patterns, False)
+        finally:
+            self.verify_only = False
+
+    def _process_archive(self, archive_path: str,
+                         patterns: Optional[List[str]],
+                         sequential: bool) -> bool:
+        """
+        Распаковывает или проверяет элементы архива. Ключи защищенных
+        элементов получаются до записи первого файла в обоих режимах;
+        в архиве версии 2 элементы для этого находятся проходом по
+        архиву без декодирования.
+
+        :param archive_path: Путь к архиву.
+        :param patterns: Пути или glob-шаблоны элементов или None.
+        :param sequential: Читать архив подряд и остановиться на первой
+              ошибке. Иначе элементы обрабатываются по смещениям
+              (decompress_entries) с отчетом о каждой ошибке.
+        :return: Результат операции (True - успешно, False - ошибка).
+        """
         self.archive_path = archive_path
 
         total_size = os.path.getsize(archive_path)
@@ -53,21 +185,346 @@ class Decompressor(IDecompressor):
         with open(archive_path, 'rb') as file:
             self.check_magic_bytes(file)
             self.check_header(file)
-            while (file.tell() + 1) <= total_size:
+            try:
+                self.load_directory(file)
+                start = file.tell()
+                entries = self.select_entries(file, patterns)
+                self.resolve_credentials(file, entries)
+                file.seek(start)
+            except ValueError as e:
+                print(f'\n{e.args[0]}')
+                return False
+            if not sequential:
+                return self.decompress_entries(file, entries)
+            while file.tell() < self.entries_end:
                 try:
-                    file_type = self.check_file_type(file)
-                    if file_type == b'\x01':
-                        self.__decompress(file)
-                    elif file_type == b'\x00':
-                        self.decompress_empty_dir(file)
-                    else:
-                        raise ValueError(f'Ошибка структуры архива '
-                                         f'[Неверный тип файла]!')
+                    self.decompress_entry(file)
                 except ValueError as e:
                     print(f'\n{e.args[0]}')
                     return False
         return True
 
+    def resolve_credentials(self, file: BinaryIO,
+                            entries: List[DirectoryEntry]) -> None:
+        """
+        Получает ключи всех защищенных элементов до начала распаковки и
+        проверяет их по байтам аутентификации, поэтому пароли
+        запрашиваются один раз и не прерывают декодирование. Ключи
+        сохраняются в self.credential_keys по смещению элемента (None -
+        элемент пропускается). Позиция в файле сохраняется.
+
+        :param file: Файловый объект архива.
+        :param entries: Элементы, которые будут распакованы.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        self.credential_keys = {}
+        position = file.tell()
+        for entry in entries:
+            if not entry.protected:
+                continue
+            file.seek(entry.offset + 3)
+            auth_bytes = file.read(16)
+            if len(auth_bytes) < 16:
+                raise ValueError('Файл поврежден [Неожиданный конец архива]')
+            _, key = self.authentication(entry.path, auth_bytes)
+            self.credential_keys[entry.offset] = key
+        file.seek(position)
+
+    def list_entries(self, archive_path: str) -> List[DirectoryEntry]:
+        """
+        Возвращает содержимое архива, не декодируя данные. Для архива
+        версии 3 читаются только заголовок и центральный каталог, архив
+        версии 2 проходится по границам элементов.
+
+        :param archive_path: Путь к архиву.
+        :return: Записи элементов в порядке архива.
+        :raises ValueError: Если архив не найден или поврежден.
+        """
+        if not os.path.exists(archive_path):
+            raise ValueError(f'No search archive file [{archive_path}]')
+
+        progress_bar = self.progress_bar
+        self.progress_bar = ProgressBar(visible=False)
+        try:
+            with open(archive_path, 'rb') as file:
+                self.check_magic_bytes(file)
+                self.check_header(file)
+                self.load_directory(file)
+                return self.select_entries(file)
+        finally:
+            self.progress_bar = progress_bar
+
+    def read(self, archive_path: str, path: str,
+             offset: int, length: int) -> Union[bytes, str]:
+        """
+        Читает фрагмент файла из архива без распаковки. Декодирование
+        начинается с ближайшей контрольной точки перед фрагментом
+        (см. open_range), поэтому время чтения зависит от интервала
+        контрольных точек, а не от размера файла. Хеш файла не
+        проверяется.
+
+        :param archive_path: Путь к архиву.
+        :param path: Путь файла в архиве ('.' для архива одного файла).
+        :param offset: Позиция начала фрагмента в байтах (в текстовом
+              режиме - в символах).
+        :param length: Длина фрагмента.
+        :return: Фрагмент файла.
+        :raises ValueError: Если архив не найден или поврежден, файла нет
+               в архиве или диапазон недопустим.
+        """
+        if not os.path.exists(archive_path):
+            raise ValueError(f'No search archive file [{archive_path}]')
+        if offset < 0 or length < 0:
+            raise ValueError(f'Недопустимый диапазон '
+                             f'[{offset}:{offset + length}]')
+
+        self.archive_path = archive_path
+        self.out_path = ''
+        progress_bar = self.progress_bar
+        self.progress_bar = ProgressBar(visible=False)
+        try:
+            with open(archive_path, 'rb') as file:
+                self.check_magic_bytes(file)
+                self.check_header(file)
+                self.load_directory(file)
+                entry = self.find_file(file, path)
+                if not entry.not_empty:
+                    return b'' if self.codec is None else ''
+                return self.open_range(file, entry).read(offset, length)
+        finally:
+            self.progress_bar = progress_bar
+
+    def find_file(self, file: BinaryIO, path: str) -> DirectoryEntry:
+        """
+        Находит файл архива по точному пути.
+
+        :param file: Файловый объект архива после заголовка.
+        :param path: Путь файла в архиве.
+        :return: Запись файла.
+        :raises ValueError: Если файла нет в архиве.
+        """
+        path = os.path.normpath(path)
+        for entry in self.select_entries(file):
+            if entry.is_file and entry.path == path:
+                return entry
+        raise ValueError(f'В архиве нет файла [{path}]')
+
+    def open_range(self, file: BinaryIO,
+                   entry: DirectoryEntry) -> CheckpointReader:
+        """
+        Читает заголовок непустого файла архива версии 3 и его индекс
+        контрольных точек и возвращает объект чтения фрагментов. Для
+        защищенного файла запрашивается пароль.
+
+        Фрагменты декодирует TableDecoder, даже если доступен NumPy:
+        NumpyDecoder копит DECODE_BATCH_SIZE сжатых байт перед
+        декодированием и прочитал бы гораздо больше нужного участка.
+
+        :param file: Файловый объект архива.
+        :param entry: Запись непустого файла.
+        :return: Объект чтения фрагментов файла.
+        :raises ValueError: Если формат архива не позволяет читать
+               фрагменты, пароль не введен или файл поврежден.
+        """
+        if self.version < 3 or self.block_tables:
+            raise ValueError('Чтение фрагментов доступно только в архиве '
+                             'версии 3 без блочных таблиц')
+        file.seek(entry.offset + 2)
+        (out_dir, buffer, hasher, level_protect,
+         hash_pass, cipher) = self.decompress_common_actions(file)
+        if out_dir is None:
+            raise ValueError(f'Нет доступа к файлу [{entry.path}]')
+
+        if self.adaptive:
+            decoder = AdaptiveDecoder()
+        else:
+            tree, buffer = self.get_tree(file, hasher, hash_pass, buffer)
+            decoder = TableDecoder.from_tree(tree)
+        size, buffer = self.read_data_length(file, buffer)
+        start = file.tell() - len(buffer)
+        payload, _ = self.open_payload(file, buffer, size, cipher)
+        file.seek(start + size)
+        _, buffer = self.read_block_checksums(file, b'')
+        checkpoints, _ = self.read_checkpoints(file, buffer)
+        return CheckpointReader(payload, decoder, start, size, checkpoints,
+                                self.codec)
+
+    def select_entries(self, file: BinaryIO,
+                       patterns: Optional[List[str]] = None
+                       ) -> List[DirectoryEntry]:
+        """
+        Находит элементы архива, подходящие под шаблоны. Границы элементов
+        берутся из центрального каталога, а в архиве версии 2 находятся
+        проходом по архиву.
+
+        :param file: Файловый объект архива после заголовка.
+        :param patterns: Пути или glob-шаблоны. None - все элементы.
+        :return: Записи выбранных элементов в порядке архива.
+        :raises ValueError: Если структура архива повреждена или
+               какой-либо шаблон не подходит ни к одному элементу.
+        """
+        entries = self.directory
+        if not entries:
+            entries = self.locate_entries(file, self.entries_end)
+        if patterns is None:
+            return entries
+
+        missing = [pattern for pattern in patterns
+                   if not any(self.match_path(entry.path, [pattern])
+                              for entry in entries)]
+        if missing:
+            raise ValueError(f'В архиве не найдены элементы '
+                             f'[{", ".join(missing)}]')
+        return [entry for entry in entries
+                if self.match_path(entry.path, patterns)]
+
+    @staticmethod
+    def match_path(path: str, patterns: List[str]) -> bool:
+        """
+        Проверяет, подходит ли путь элемента архива под один из шаблонов
+        (см. huffman_method.directory.match_path).
+
+        :param path: Путь элемента в архиве.
+        :param patterns: Пути или glob-шаблоны.
+        :return: True, если путь подходит хотя бы под один шаблон.
+        """
+        return match_path(path, patterns)
+
+    def load_directory(self, file: BinaryIO) -> List[DirectoryEntry]:
+        """
+        Загружает центральный каталог архива версии 3 и определяет конец
+        области элементов. Для архива версии 2 каталога нет, и элементы
+        занимают архив до конца. Позиция в файле сохраняется.
+
+        :param file: Файловый объект архива после заголовка.
+        :return: Записи каталога (пустой список для версии 2).
+        :raises ValueError: Если каталог поврежден.
+        """
+        start = file.tell()
+        if self.version >= 3:
+            self.directory, self.entries_end = read_directory(file, start)
+        else:
+            self.directory = []
+            self.entries_end = file.seek(0, 2)
+        file.seek(start)
+        self.progress_bar.total = self.entries_end
+        return self.directory
+
+    def decompress_entry(self, file: BinaryIO) -> None:
+        """
+        Распаковывает один элемент архива, начинающийся с текущей позиции.
+
+        :param file: Файловый объект архива.
+        :raises ValueError: Если элемент поврежден.
+        """
+        file_type = self.check_file_type(file)
+        if file_type == b'\x01':
+            self.__decompress(file)
+        elif file_type == b'\x00':
+            self.decompress_empty_dir(file)
+        else:
+            raise ValueError(f'Ошибка структуры архива '
+                             f'[Неверный тип файла]!')
+
+    def decompress_entries(self, file: BinaryIO,
+                           entries: List[DirectoryEntry]) -> bool:
+        """
+        Распаковывает выбранные элементы архива, переходя к каждому по его
+        смещению; остальные элементы не читаются. При нескольких процессах
+        каждый процесс открывает архив сам и распаковывает элемент со
+        своего смещения; ключи защищенных файлов получены заранее
+        (resolve_credentials) и передаются процессам вместе с
+        распаковщиком. Ошибки выводятся для каждого элемента отдельно.
+
+        :param file: Файловый объект архива после заголовка.
+        :param entries: Элементы из select_entries.
+        :return: Результат операции (True - успешно, False - ошибка).
+        """
+        self.progress_bar.reset(sum(entry.compressed_size
+                                    for entry in entries))
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers)
+        errors = []
+        try:
+            futures = []
+            for entry in entries:
+                if pool is None:
+                    continue
+                future = pool.submit(_decompress_entry, self, entry.offset)
+                future.add_done_callback(
+                    lambda _, size=entry.compressed_size:
+                    self.progress_bar.update(size))
+                futures.append((entry.path, future))
+
+            for entry in entries:
+                if pool is not None:
+                    continue
+                progress_bar = self.progress_bar
+                self.progress_bar = ProgressBar(visible=False)
+                try:
+                    error = _decompress_entry(self, entry.offset, file)
+                finally:
+                    self.progress_bar = progress_bar
+                progress_bar.update(entry.compressed_size)
+                if error is not None:
+                    errors.append((entry.path, error))
+
+            for path, future in futures:
+                error = future.result()
+                if error is not None:
+                    errors.append((path, error))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        for path, error in errors:
+            print(f'\n[{path}] {error}')
+        return not errors
+
+    def locate_entries(self, file: BinaryIO,
+                       total_size: int) -> List[DirectoryEntry]:
+        """
+        Находит границы элементов архива без декодирования данных. Так
+        строится каталог архива версии 2, в котором нет центрального
+        каталога; исходный размер файлов при этом неизвестен.
+
+        :param file: Файловый объект архива после заголовка.
+        :param total_size: Конец области элементов архива.
+        :return: Записи элементов с исходным размером None.
+        :raises ValueError: Если структура архива повреждена.
+        """
+        entries = []
+        while file.tell() < total_size:
+            offset = file.tell()
+            flags, buffer = self.read_exact(file, b'', 3)
+            if flags[0] > 1 or flags[1] > 1 or flags[2] > 1:
+                raise ValueError('Ошибка структуры архива '
+                                 '[Неверные флаги элемента]')
+            protected = flags[2] == 1
+            if protected:
+                size = 16
+                if self.encrypt_payload:
+                    size += CTR_NONCE_SIZE
+                _, buffer = self.read_exact(file, buffer, size)
+            bytes_path, buffer = self.read_section(file, buffer, END_PATH)
+
+            if flags[1] == 0:
+                size = 16 if self.version >= 3 else len(END_DATA) + 16
+                buffer = self.skip_exact(file, buffer, size)
+                file.seek(file.tell() - len(buffer))
+            else:
+                self.skip_file(file, buffer)
+
+            end = file.tell()
+            file.seek(end - 16)
+            digest = file.read(16)
+            entries.append(DirectoryEntry(bytes_path.decode('utf-8'),
+                                          flags[0] == 1, flags[1] == 1,
+                                          protected, offset, end - offset,
+                                          None, digest))
+        return entries
+
     def check_magic_bytes(self, file: BinaryIO) -> bool:
         """
         Проверяет магические байты архива.
@@ -84,16 +541,22 @@ class Decompressor(IDecompressor):
         """
         Проверяет заголовок архива.
 
+        Поддерживаются все версии из SUPPORTED_VERSIONS; версия архива
+        сохраняется в self.version и определяет разбор элементов.
+
         :param file: Файловый объект архива.
-        :raises ValueError: Если версия архива не поддерживается
-               или кодировка архива недопустима.
+        :raises ValueError: Если версия архива не поддерживается,
+               кодировка архива, формат дерева, режим кодирования, флаг
+               контрольных точек, режим шифрования, алгоритм хеша или флаг
+               контрольных сумм блоков недопустимы.
         """
         header = file.read(32)
 
         arch_version = header[0]
 
-        if arch_version != self.version:
+        if arch_version not in SUPPORTED_VERSIONS:
             raise ValueError(f'Не поддерживаемая версия архива!')
+        self.version = arch_version
 
         flag_codec = header[1]
 
@@ -108,6 +571,60 @@ class Decompressor(IDecompressor):
         else:
             raise ValueError(f'Неподдерживаемая кодировка архива!')
 
+        flag_tree = header[2]
+
+        if flag_tree == TREE_PICKLE:
+            self.canonical = False
+        elif flag_tree == TREE_CANONICAL:
+            self.canonical = True
+        else:
+            raise ValueError(f'Неподдерживаемый формат дерева!')
+
+        flag_coding = header[3]
+
+        if flag_coding not in (CODING_STATIC, CODING_ADAPTIVE,
+                               CODING_BLOCKS):
+            raise ValueError(f'Неподдерживаемый режим кодирования!')
+
+        self.adaptive = flag_coding == CODING_ADAPTIVE
+        self.block_tables = flag_coding == CODING_BLOCKS
+        if self.adaptive:
+            self.open_mode = 'ab'
+
+        flag_checkpoints = header[4]
+
+        if flag_checkpoints not in (CHECKPOINTS_NONE, CHECKPOINTS_INDEX):
+            raise ValueError(f'Неподдерживаемый формат контрольных точек!')
+        self.checkpoints = flag_checkpoints == CHECKPOINTS_INDEX
+        if self.checkpoints and (arch_version < 3 or
+                                 flag_coding != CODING_STATIC):
+            raise ValueError(f'Неподдерживаемый формат контрольных точек!')
+
+        flag_encryption = header[5]
+
+        if flag_encryption not in (ENCRYPTION_TREE, ENCRYPTION_CTR):
+            raise ValueError(f'Неподдерживаемый режим шифрования!')
+        self.encrypt_payload = flag_encryption == ENCRYPTION_CTR
+        if self.encrypt_payload and arch_version < 3:
+            raise ValueError(f'Неподдерживаемый режим шифрования!')
+
+        flag_checksum = header[6]
+
+        if flag_checksum not in CHECKSUMS.values() or (
+                arch_version < 3 and flag_checksum != CHECKSUM_MD5):
+            raise ValueError(f'Неподдерживаемый алгоритм хеширования!')
+        self.checksum = flag_checksum
+
+        flag_block_checksums = header[7]
+
+        if flag_block_checksums not in (BLOCK_CHECKSUMS_NONE,
+                                        BLOCK_CHECKSUMS_INDEX) or (
+                arch_version < 3 and
+                flag_block_checksums != BLOCK_CHECKSUMS_NONE):
+            raise ValueError(f'Неподдерживаемый формат контрольных сумм '
+                             f'блоков!')
+        self.block_checksums = flag_block_checksums == BLOCK_CHECKSUMS_INDEX
+
         self.progress_bar.update(len(header))
         return True
 
@@ -139,32 +656,52 @@ class Decompressor(IDecompressor):
             raise e
 
     def decompress_common_actions(self, file: BinaryIO) -> \
-            [Tuple[str, bytes, MD5, bytes, Union[bytes, None]]]:
+            [Tuple[str, bytes, Hasher, bytes, Union[bytes, None],
+                   Optional[AESCTR]]]:
         """
-        Выполняет общие действия при распаковке файла из архива.
+        Выполняет общие действия при распаковке файла из архива. Ключ
+        защищенного файла берется из полученных заранее
+        (resolve_credentials), а если его там нет, запрашивается
+        у источника паролей и запоминается для следующих чтений.
 
         :param file: Файловый объект архива.
-        :return: Кортеж с путем и буфером данных.
+        :return: Кортеж с путем, буфером данных, объектом хеширования,
+                флагом защиты, ключом защищенного файла и шифром его
+                секции данных (None, если данные не зашифрованы).
         :raises ValueError: Если файл не корректен или поврежден.
         """
+        offset = file.tell() - 2
         level_protect = file.read(1)
         self.progress_bar.update(1)
 
-        hasher = MD5()
+        hasher = create_hasher(self.checksum)
 
         try:
             if level_protect == b'\x01':
                 auth_bytes = file.read(16)
                 self.progress_bar.update(16)
+                nonce = None
+                if self.encrypt_payload:
+                    nonce = file.read(CTR_NONCE_SIZE)
+                    self.progress_bar.update(len(nonce))
                 out_dir, buffer = self.get_path(file, hasher)
-                result, hash_pass = self.authentication(out_dir, auth_bytes)
-                if not result:
+                if offset in self.credential_keys:
+                    hash_pass = self.credential_keys[offset]
+                else:
+                    path = os.path.relpath(out_dir, self.archive_root())
+                    _, hash_pass = self.authentication(path, auth_bytes)
+                    self.credential_keys[offset] = hash_pass
+                if hash_pass is None:
                     self.skip_file(file, buffer)
-                    return None, None, None, None, None
-                return out_dir, buffer, hasher, level_protect, hash_pass
+                    return None, None, None, None, None, None
+                cipher = None
+                if nonce is not None:
+                    cipher = AESCTR(hash_pass, nonce)
+                return (out_dir, buffer, hasher, level_protect, hash_pass,
+                        cipher)
             else:
                 out_dir, buffer = self.get_path(file, hasher)
-                return out_dir, buffer, hasher, level_protect, None
+                return out_dir, buffer, hasher, level_protect, None, None
         except ValueError as e:
             raise e
 
@@ -175,28 +712,25 @@ class Decompressor(IDecompressor):
         :param file: Файловый объект архива.
         :raises ValueError: Если файл не корректен или поврежден.
         """
-        (out_dir, buffer, hasher,
-         level_protect, hash_pass) = self.decompress_common_actions(file)
+        (out_dir, buffer, hasher, level_protect,
+         hash_pass, _) = self.decompress_common_actions(file)
 
         try:
             if out_dir is None:
                 return
 
-            end_data = buffer[:4]
-            if len(end_data) < 4:
-                chunk = file.read(4 - len(end_data))
-                self.progress_bar.update(len(chunk))
-                buffer += chunk
+            if self.version < 3:
+                end_data, buffer = self.read_exact(file, buffer,
+                                                   len(END_DATA))
+                if end_data != END_DATA:
+                    raise ValueError(f'Ошибка идентификации конца файла')
 
-            if end_data == END_DATA:
-                buffer = buffer[4:]
-                self.check_hash(file, hasher, out_dir, buffer)
+            self.check_hash(file, hasher, out_dir, buffer)
 
+            if not self.verify_only:
                 dir_path = os.path.dirname(os.path.normpath(out_dir))
                 os.makedirs(dir_path, exist_ok=True)
                 open(out_dir, 'wb').close()
-            else:
-                raise ValueError(f'Ошибка идентификации конца файла')
         except ValueError as e:
             raise e
 
@@ -207,19 +741,33 @@ class Decompressor(IDecompressor):
         :param file: Файловый объект архива.
         :raises ValueError: Если файл не корректен или поврежден.
         """
-        (out_dir, buffer, hasher,
-         level_protect, hash_pass) = self.decompress_common_actions(file)
+        (out_dir, buffer, hasher, level_protect,
+         hash_pass, cipher) = self.decompress_common_actions(file)
 
         try:
             if out_dir is None:
                 return
 
+            if self.adaptive:
+                buffer = self.read_data(file, None, hasher, out_dir, buffer,
+                                        AdaptiveDecoder(), cipher)
+                self.check_hash(file, hasher, out_dir, buffer)
+                return
+
+            if self.block_tables:
+                buffer = self.read_blocks(file, hasher, out_dir, buffer,
+                                          hash_pass, cipher)
+                self.check_hash(file, hasher, out_dir, buffer)
+                return
+
             if level_protect == b'\x01':
                 tree, buffer = self.get_tree(file, hasher, hash_pass, buffer)
             else:
                 tree, buffer = self.get_tree(file, hasher, buffer=buffer)
 
-            buffer = self.read_data(file, tree, hasher, out_dir, buffer)
+            buffer = self.read_data(file, tree, hasher, out_dir, buffer,
+                                    cipher=cipher)
+            _, buffer = self.read_checkpoints(file, buffer)
             self.check_hash(file, hasher, out_dir, buffer)
         except ValueError as e:
             raise e
@@ -231,7 +779,7 @@ class Decompressor(IDecompressor):
         :param file: Файловый объект архива.
         :raises ValueError: Если файл не корректен или поврежден.
         """
-        hasher = MD5()
+        hasher = create_hasher(self.checksum)
 
         is_emtpy = file.read(1)
         level_protected = file.read(1)
@@ -239,14 +787,14 @@ class Decompressor(IDecompressor):
             raise ValueError('Ошибка флагов пустой директории')
 
         out_dir, buffer = self.get_path(file, hasher)
-        os.makedirs(out_dir, exist_ok=False)
-
-        end_data = buffer[:4]
-        if end_data != END_DATA:
-            raise ValueError('Ошибка идентификации '
-                             'конца пустой директории')
+        if not self.verify_only:
+            os.makedirs(out_dir, exist_ok=False)
 
-        buffer = buffer[4:]
+        if self.version < 3:
+            end_data, buffer = self.read_exact(file, buffer, len(END_DATA))
+            if end_data != END_DATA:
+                raise ValueError('Ошибка идентификации '
+                                 'конца пустой директории')
 
         try:
             self.check_hash(file, hasher, out_dir, buffer)
@@ -254,7 +802,7 @@ class Decompressor(IDecompressor):
             raise e
 
     def get_path(self, file: BinaryIO,
-                 hasher: MD5,
+                 hasher: Hasher,
                  buffer: bytes = b'') -> Tuple[str, bytes]:
         """
         Извлекает путь из буфера данных и возвращает путь и оставшийся буфер.
@@ -265,22 +813,34 @@ class Decompressor(IDecompressor):
         :return: Кортеж, содержащий извлеченный путь и оставшийся
                 буфер данных.
         """
-        bytes_path, buffer = self.finder_ends(file, buffer, END_PATH)
+        bytes_path, buffer = self.read_section(file, buffer, END_PATH)
 
         relative_path = bytes_path.decode('utf-8')
         hasher.hash(bytes_path)
 
         if relative_path == '.':
             relative_path = ''
-        full_arch_name = os.path.basename(self.archive_path)
-        arch_name = os.path.splitext(full_arch_name)[0]
-        out_dir = os.path.join(self.out_path, arch_name, relative_path)
-        out_dir = os.path.normpath(out_dir)
+        root = self.archive_root()
+        out_dir = os.path.normpath(os.path.join(root, relative_path))
+        if os.path.commonpath([root, out_dir]) != root:
+            raise ValueError(f'Недопустимый путь в архиве '
+                             f'[{relative_path}]')
 
         return out_dir, buffer
 
+    def archive_root(self) -> str:
+        """
+        Возвращает директорию, в которую распаковывается архив: out_path
+        и имя архива без расширения.
+
+        :return: Путь к директории.
+        """
+        full_arch_name = os.path.basename(self.archive_path)
+        arch_name = os.path.splitext(full_arch_name)[0]
+        return os.path.normpath(os.path.join(self.out_path, arch_name))
+
     def get_tree(self, file: BinaryIO,
-                 hasher: MD5,
+                 hasher: Hasher,
                  hash_pass: Optional[bytes] = None,
                  buffer: bytes = b'') -> Tuple[HuffmanTree, bytes]:
         """
@@ -293,21 +853,44 @@ class Decompressor(IDecompressor):
         :param buffer: Буфер для обработки данных.
         :return: Кортеж, содержащий дерево Хаффмана и оставшийся буфер данных.
         """
-        serialized_tree, buffer = self.finder_ends(file, buffer, END_TREE )
+        serialized_tree, buffer = self.read_section(file, buffer, END_TREE)
 
         if hash_pass:
             tree = self.get_protected_tree(serialized_tree, hash_pass, hasher)
         else:
             hasher.hash(serialized_tree)
-            tree = HuffmanTree()
-            tree.deserialize_from_string(serialized_tree)
+            tree = self.load_tree(serialized_tree)
 
         return tree, buffer
 
-    @staticmethod
-    def get_protected_tree(serialized_tree: bytes,
+    def load_tree(self, serialized_tree: bytes) -> HuffmanTree:
+        """
+        Восстанавливает дерево Хаффмана в формате, указанном в заголовке.
+
+        Дерево формата TREE_PICKLE восстанавливается pickle.loads, поэтому
+        распаковка и проверка такого архива выполняют код из его байт:
+        архивы из недоверенных источников следует сжимать с таблицей длин
+        канонических кодов (-k). Любая ошибка разбора дерева сообщается
+        как повреждение файла.
+
+        :param serialized_tree: Сериализованное дерево или таблица длин.
+        :return: Объект дерева.
+        :raises ValueError: Если дерево повреждено.
+        """
+        tree = HuffmanTree(self.codec)
+        try:
+            if self.canonical:
+                tree.deserialize_code_lengths(serialized_tree)
+            else:
+                tree.deserialize_from_string(serialized_tree)
+        except Exception:
+            raise ValueError('Файл поврежден [Дерево]')
+        return tree
+
+    def get_protected_tree(self,
+                           serialized_tree: bytes,
                            hash_pass: bytes,
-                           hasher: MD5) -> HuffmanTree:
+                           hasher: Hasher) -> HuffmanTree:
         """
         Декодирует дерево по ключу алгоритмом AES
 
@@ -316,23 +899,32 @@ class Decompressor(IDecompressor):
         :param hasher: Объект для вычисления хеша.
         :return: Объект дерева.
         """
-        count = int.from_bytes(serialized_tree[-1:], byteorder='big')
-        decoded_tree = b''
-        while len(serialized_tree) >= 16:
-            block = serialized_tree[:16]
-            decoded_tree += aes_decrypt(block, hash_pass)
-            serialized_tree = serialized_tree[16:]
-        decoded_tree = decoded_tree[:-count]
+        decoded_tree = self.decrypt_tree(serialized_tree, hash_pass)
         hasher.hash(decoded_tree)
-        tree = HuffmanTree()
-        tree.deserialize_from_string(decoded_tree)
-        return tree
+        return self.load_tree(decoded_tree)
+
+    @staticmethod
+    def decrypt_tree(serialized_tree: bytes, hash_pass: bytes) -> bytes:
+        """
+        Расшифровывает дерево, зашифрованное Compressor.encrypt_tree.
+
+        :param serialized_tree: Зашифрованное дерево.
+        :param hash_pass: Симметричный ключ.
+        :return: Сериализованное дерево.
+        """
+        count = int.from_bytes(serialized_tree[-1:], byteorder='big')
+        size = (len(serialized_tree) - 1) // 16 * 16
+        cipher = get_cipher(hash_pass)
+        return cipher.decrypt(serialized_tree[:size])[:-count]
 
     def read_data(self, file: BinaryIO,
-                  tree: HuffmanTree,
-                  hasher: MD5,
+                  tree: Optional[HuffmanTree],
+                  hasher: Hasher,
                   out_file: str,
-                  buffer: bytes) -> bytes:
+                  buffer: bytes,
+                  decoder: Union[TableDecoder, NumpyDecoder,
+                                 AdaptiveDecoder, None] = None,
+                  cipher: Optional[AESCTR] = None) -> bytes:
         """
         Читает данные из файла и декодирует с использованием дерева Хаффмана.
 
@@ -342,21 +934,25 @@ class Decompressor(IDecompressor):
         :param out_file: Путь к файлу, в который будут записаны
               раскодированные данные.
         :param buffer: Буфер данных для обработки.
+        :param decoder: Декодер данных. По умолчанию None (создается
+              по дереву).
+        :param cipher: Шифр секции данных защищенного файла. По умолчанию
+              None (данные не зашифрованы).
         :return: Оставшийся буфер данных.
         """
-        dir_path = os.path.dirname(os.path.normpath(out_file))
-        os.makedirs(dir_path, exist_ok=True)
-
-        bits = ''
-        with open(out_file, self.open_mode) as outfile:
+        if decoder is None:
+            decoder = create_decoder(tree)
+        with self.open_output(out_file) as outfile:
+            if self.version >= 3:
+                return self.read_sized_data(file, decoder, hasher, outfile,
+                                            buffer, cipher)
             end_data = buffer.find(END_DATA)
             if end_data < 0:
-                buffer, bits = self.decoded_block(outfile,
-                                                  bits,
-                                                  buffer,
-                                                  end_data,
-                                                  tree,
-                                                  hasher)
+                buffer = self.decoded_block(outfile,
+                                            decoder,
+                                            buffer,
+                                            end_data,
+                                            hasher)
                 for block in iter(lambda: file.read(self.block_size), b''):
                     if not block:
                         raise ValueError(f'Файл поврежден [Не удалось '
@@ -365,40 +961,533 @@ class Decompressor(IDecompressor):
                     self.progress_bar.update(len(block))
                     buffer = buffer[-5:] + block
                     end_data = buffer.find(END_DATA)
-                    buffer, bits = self.decoded_block(outfile,
-                                                      bits,
-                                                      buffer,
-                                                      end_data,
-                                                      tree,
-                                                      hasher)
+                    buffer = self.decoded_block(outfile,
+                                                decoder,
+                                                buffer,
+                                                end_data,
+                                                hasher)
                     if end_data >= 0:
                         return buffer
             else:
-                buffer, bits = self.decoded_block(outfile,
-                                                  bits,
-                                                  buffer,
-                                                  end_data,
-                                                  tree,
-                                                  hasher)
+                buffer = self.decoded_block(outfile,
+                                            decoder,
+                                            buffer,
+                                            end_data,
+                                            hasher)
         return buffer
 
+    def open_output(self, out_file: str
+                    ) -> Union[BinaryIO, TextIO, NullOutput]:
+        """
+        Открывает файл для записи раскодированных данных, создавая его
+        директорию. В режиме проверки файл не создается.
+
+        :param out_file: Путь к файлу.
+        :return: Файловый объект или NullOutput в режиме проверки.
+        """
+        if self.verify_only:
+            return NullOutput()
+        dir_path = os.path.dirname(os.path.normpath(out_file))
+        os.makedirs(dir_path, exist_ok=True)
+        return open(out_file, self.open_mode)
+
+    def read_sized_data(self, file: BinaryIO,
+                        decoder: Union[TableDecoder, NumpyDecoder,
+                                       AdaptiveDecoder],
+                        hasher: Hasher,
+                        outfile: Union[BinaryIO, TextIO],
+                        buffer: bytes,
+                        cipher: Optional[AESCTR] = None) -> bytes:
+        """
+        Читает секцию данных архива версии 3: длина секции известна
+        заранее, поэтому данные читаются порциями точного размера без
+        поиска маркера конца. Если в архиве есть контрольные суммы
+        блоков, каждая порция сверяется с ними до декодирования (см.
+        open_verified).
+
+        :param file: Файловый объект, из которого читаются данные.
+        :param decoder: Декодер данных.
+        :param hasher: Объект для вычисления хеша.
+        :param outfile: Файл для записи раскодированных данных.
+        :param buffer: Буфер данных для обработки.
+        :param cipher: Шифр секции данных или None.
+        :return: Оставшийся буфер данных.
+        :raises ValueError: Если секция данных пуста или повреждена.
+        """
+        size, buffer = self.read_data_length(file, buffer)
+        if not size:
+            raise ValueError('Файл поврежден [Пустая секция данных]')
+        file, verifier = self.open_verified(file, buffer, size)
+        file, buffer = self.open_payload(file, buffer, size, cipher)
+
+        chunk_size = max(self.block_size, DATA_CHUNK_SIZE)
+        position = decoded = 0
+        while size:
+            step = min(size, chunk_size)
+            encoded_data, buffer = self.read_exact(file, buffer, step)
+            size -= step
+            self.check_chunk(verifier, decoder, encoded_data, position,
+                             decoded)
+            position += step
+            if size:
+                decoded_data = decoder.decode(encoded_data, -1)
+            else:
+                decoded_data = decoder.decode(encoded_data[:-1],
+                                              encoded_data[-1])
+            decoded += len(decoded_data)
+            self._write_decoded(outfile, hasher, decoded_data)
+        _, buffer = self.read_block_checksums(file, buffer)
+        return buffer
+
+    def read_blocks(self, file: BinaryIO,
+                    hasher: Hasher,
+                    out_file: str,
+                    buffer: bytes,
+                    hash_pass: Optional[bytes] = None,
+                    cipher: Optional[AESCTR] = None) -> bytes:
+        """
+        Читает и декодирует данные файла, записанные
+        Compressor.write_blocks. При нескольких процессах блоки
+        декодируются в пуле и записываются в исходном порядке. Если
+        в архиве есть контрольные суммы блоков, каждый прочитанный блок
+        сверяется с ними до декодирования (см. open_verified).
+
+        :param file: Файловый объект, из которого читаются данные.
+        :param hasher: Объект для вычисления хеша.
+        :param out_file: Путь к файлу, в который будут записаны
+              раскодированные данные.
+        :param buffer: Буфер данных для обработки.
+        :param hash_pass: Ключ для зашифрованных таблиц. По умолчанию None.
+        :param cipher: Шифр секции данных защищенного файла. По умолчанию
+              None (данные не зашифрованы).
+        :return: Оставшийся буфер данных.
+        :raises ValueError: Если блоки повреждены.
+        """
+        verifier = None
+        if self.version >= 3:
+            data_size, buffer = self.read_data_length(file, buffer)
+            start = file.tell() - len(buffer)
+            file, verifier = self.open_verified(file, buffer, data_size)
+            file, buffer = self.open_payload(file, buffer, data_size, cipher)
+        marks: List[Tuple[int, int]] = []
+        decoded = 0
+
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(self.workers)
+        pending: Deque[Tuple[Optional[bytes], int,
+                             Union[bytes, str, Future]]] = deque()
+        table = None
+        try:
+            with self.open_output(out_file) as outfile:
+                while True:
+                    (new_table, table, length,
+                     encoded_data, buffer) = self.read_verified_block(
+                        file, buffer, table, hash_pass, verifier, marks,
+                        decoded)
+                    if table is None:
+                        break
+                    decoded += length
+                    if pool is None:
+                        decoded_data = decode_block_with_table(
+                            table, self.codec, encoded_data)
+                    else:
+                        decoded_data = pool.submit(decode_block_with_table,
+                                                   table, self.codec,
+                                                   encoded_data)
+                    pending.append((new_table, length, decoded_data))
+                    while len(pending) > 2 * self.workers - 1:
+                        self._write_block(outfile, hasher,
+                                          *pending.popleft())
+                while pending:
+                    self._write_block(outfile, hasher, *pending.popleft())
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if self.version >= 3:
+            if file.tell() - len(buffer) - start != data_size:
+                raise ValueError('Файл поврежден '
+                                 '[Неверная длина секции данных]')
+            _, buffer = self.read_block_checksums(file, buffer)
+            return buffer
+
+        end_data, buffer = self.read_exact(file, buffer, len(END_DATA))
+        if end_data != END_DATA:
+            raise ValueError('Ошибка идентификации конца файла')
+        return buffer
+
+    def read_block(self, file: BinaryIO,
+                   buffer: bytes,
+                   table: Optional[bytes],
+                   hash_pass: Optional[bytes] = None
+                   ) -> Tuple[Optional[bytes], Optional[bytes], int, bytes,
+                              bytes]:
+        """
+        Читает очередной блок, записанный Compressor.write_blocks.
+
+        :param file: Файловый объект, из которого читаются данные.
+        :param buffer: Буфер данных для обработки.
+        :param table: Таблица предыдущего блока или None.
+        :param hash_pass: Ключ для зашифрованных таблиц. По умолчанию None.
+        :return: Кортеж из собственной таблицы блока (None, если блок
+                использует таблицу предыдущего), таблицы, которой
+                закодирован блок (None после флага BLOCK_END), количества
+                символов блока, закодированного блока и оставшегося
+                буфера.
+        :raises ValueError: Если блок поврежден.
+        """
+        flag, buffer = self.read_exact(file, buffer, 1)
+        if flag[0] == BLOCK_END:
+            return None, None, 0, b'', buffer
+        new_table = None
+        if flag[0] == BLOCK_NEW_TABLE:
+            size, buffer = self.read_varint(file, buffer)
+            table, buffer = self.read_exact(file, buffer, size)
+            if hash_pass:
+                table = self.decrypt_tree(table, hash_pass)
+            new_table = table
+        elif flag[0] != BLOCK_REUSE_TABLE or table is None:
+            raise ValueError('Файл поврежден [Неверный флаг блока]')
+
+        length, buffer = self.read_varint(file, buffer)
+        size, buffer = self.read_varint(file, buffer)
+        encoded_data, buffer = self.read_exact(file, buffer, size)
+        return new_table, table, length, encoded_data, buffer
+
+    def _write_block(self,
+                     outfile: Union[BinaryIO, TextIO],
+                     hasher: Hasher,
+                     new_table: Optional[bytes],
+                     length: int,
+                     decoded_data: Union[bytes, str, Future]) -> None:
+        """
+        Проверяет размер декодированного блока и записывает его в файл.
+
+        :param outfile: Файл для записи раскодированных данных.
+        :param hasher: Объект для вычисления хеша.
+        :param new_table: Новая таблица блока или None.
+        :param length: Количество символов блока из архива.
+        :param decoded_data: Декодированный блок или его Future.
+        :raises ValueError: Если размер блока не совпадает.
+        """
+        if isinstance(decoded_data, Future):
+            decoded_data = decoded_data.result()
+        if new_table is not None:
+            hasher.hash(new_table)
+        if len(decoded_data) != length:
+            raise ValueError('Файл поврежден [Неверный размер блока]')
+
+        self._write_decoded(outfile, hasher, decoded_data)
+
+    def _write_decoded(self,
+                       outfile: Union[BinaryIO, TextIO],
+                       hasher: Hasher,
+                       decoded_data: Union[bytes, str]) -> None:
+        """
+        Записывает декодированные данные в файл и добавляет их в хеш.
+
+        :param outfile: Файл для записи раскодированных данных.
+        :param hasher: Объект для вычисления хеша.
+        :param decoded_data: Декодированные данные.
+        """
+        outfile.write(decoded_data)
+        if isinstance(decoded_data, bytes):
+            hasher.hash(decoded_data)
+        else:
+            hasher.hash(decoded_data.encode(self.codec))
+
+    def read_exact(self, file: BinaryIO,
+                   buffer: bytes,
+                   size: int) -> Tuple[bytes, bytes]:
+        """
+        Читает ровно size байт, начиная с буфера.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :param size: Количество байт.
+        :return: Кортеж из прочитанных байт и оставшегося буфера.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        if len(buffer) < size:
+            chunk = file.read(size - len(buffer))
+            self.progress_bar.update(len(chunk))
+            buffer += chunk
+            if len(buffer) < size:
+                raise ValueError('Файл поврежден [Неожиданный конец архива]')
+        return buffer[:size], buffer[size:]
+
+    def read_varint(self, file: BinaryIO,
+                    buffer: bytes) -> Tuple[int, bytes]:
+        """
+        Читает число в формате varint.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :return: Кортеж из числа и оставшегося буфера.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        value = 0
+        shift = 0
+        while True:
+            byte, buffer = self.read_exact(file, buffer, 1)
+            value |= (byte[0] & 0x7F) << shift
+            if not byte[0] & 0x80:
+                return value, buffer
+            shift += 7
+
+    def read_data_length(self, file: BinaryIO,
+                         buffer: bytes) -> Tuple[int, bytes]:
+        """
+        Читает длину секции данных архива версии 3.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :return: Кортеж из длины секции и оставшегося буфера.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        size, buffer = self.read_exact(file, buffer, DATA_LENGTH_SIZE)
+        return int.from_bytes(size, byteorder='big'), buffer
+
+    @staticmethod
+    def open_payload(file: BinaryIO,
+                     buffer: bytes,
+                     size: int,
+                     cipher: Optional[AESCTR]
+                     ) -> Tuple[Union[BinaryIO, DecryptedReader], bytes]:
+        """
+        Готовит чтение секции данных, которая начинается с буфера: если
+        задан шифр, возвращает объект, расшифровывающий секцию при чтении
+        с любой позиции, и расшифровывает уже прочитанную часть буфера.
+
+        :param file: Файловый объект архива.
+        :param buffer: Буфер данных, начинающийся с секции.
+        :param size: Длина секции данных.
+        :param cipher: Шифр секции или None.
+        :return: Кортеж из объекта чтения архива и буфера.
+        """
+        if cipher is None:
+            return file, buffer
+        start = file.tell() - len(buffer)
+        reader = DecryptedReader(file, cipher, start, start + size)
+        return reader, reader.decrypt(buffer, start)
+
+    def read_block_checksums(self, file: BinaryIO,
+                             buffer: bytes) -> Tuple[Optional[bytes], bytes]:
+        """
+        Читает индекс контрольных сумм блоков, записанный сразу после
+        секции данных, если он есть в архиве.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :return: Кортеж из байт индекса (None, если индекса нет) и
+                оставшегося буфера.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        if not self.block_checksums:
+            return None, buffer
+        size, buffer = self.read_varint(file, buffer)
+        return self.read_exact(file, buffer, size)
+
+    def open_verified(self, file: BinaryIO,
+                      buffer: bytes,
+                      size: int
+                      ) -> Tuple[Union[BinaryIO, BlockVerifier],
+                                 Optional[BlockVerifier]]:
+        """
+        Готовит проверку секции данных, которая начинается с буфера, по
+        индексу контрольных сумм блоков. При распаковке блоки сверяются
+        по мере чтения секции декодером (BlockVerifier), поэтому секция
+        читается один раз. В режиме проверки блоки сначала сверяются
+        в нескольких потоках без декодирования (find_damaged_block), и
+        если все они целы, при декодировании не хешируются повторно.
+        Позиция в файле сохраняется.
+
+        :param file: Файловый объект архива.
+        :param buffer: Буфер данных, начинающийся с секции.
+        :param size: Длина секции данных.
+        :return: Кортеж из объекта чтения секции и объекта проверки
+                (None, если проверять при чтении нечего).
+        :raises ValueError: Если индекс поврежден.
+        """
+        if not self.block_checksums:
+            return file, None
+        position = file.tell()
+        start = position - len(buffer)
+        file.seek(start + size)
+        index, _ = self.read_block_checksums(file, b'')
+        block_size, digests = unpack_block_checksums(index, size,
+                                                     self.checksum)
+        damaged = None
+        if self.verify_only:
+            damaged = find_damaged_block(file, start, size, block_size,
+                                         digests, self.checksum)
+        file.seek(position)
+        if self.verify_only and damaged is None:
+            return file, None
+        verifier = BlockVerifier(file, start, size, block_size, digests,
+                                 self.checksum)
+        verifier.update(buffer, start)
+        return verifier, verifier
+
+    @staticmethod
+    def block_damage(verifier: BlockVerifier, position: int) -> ValueError:
+        """
+        Создает ошибку о поврежденном блоке секции данных.
+
+        :param verifier: Объект проверки, нашедший поврежденный блок.
+        :param position: Позиция в исходном файле (в текстовом режиме -
+              в символах), до которой данные декодированы из целых
+              блоков.
+        :return: Ошибка с диапазоном байт блока в архиве и частью
+                исходного файла, начиная с которой данные потеряны.
+        """
+        begin, end = verifier.damaged
+        return ValueError(f'Файл поврежден [Блок данных {begin}-{end} '
+                          f'архива, данные файла с позиции {position}]')
+
+    def read_verified_block(self, file: BinaryIO,
+                            buffer: bytes,
+                            table: Optional[bytes],
+                            hash_pass: Optional[bytes],
+                            verifier: Optional[BlockVerifier],
+                            marks: List[Tuple[int, int]],
+                            decoded: int
+                            ) -> Tuple[Optional[bytes], Optional[bytes],
+                                       int, bytes, bytes]:
+        """
+        Читает очередной блок (см. read_block) и проверяет, не попал ли
+        в прочитанные данные поврежденный блок секции. Блоки
+        Compressor.write_blocks декодируются независимо, поэтому данные
+        теряются с начала блока, в котором начинается повреждение.
+
+        :param file: Файловый объект, из которого читаются данные.
+        :param buffer: Буфер данных для обработки.
+        :param table: Таблица предыдущего блока или None.
+        :param hash_pass: Ключ для зашифрованных таблиц или None.
+        :param verifier: Объект проверки секции или None.
+        :param marks: Пары (позиция блока в секции, позиция его данных
+              в исходном файле) прочитанных блоков; дополняется.
+        :param decoded: Количество символов в предыдущих блоках.
+        :return: Результат read_block.
+        :raises ValueError: Если блок или секция повреждены.
+        """
+        if verifier is None:
+            return self.read_block(file, buffer, table, hash_pass)
+        marks.append((file.tell() - len(buffer) - verifier.start, decoded))
+        try:
+            block = self.read_block(file, buffer, table, hash_pass)
+        except ValueError:
+            self.check_marks(verifier, marks, verifier.end - verifier.start)
+            raise
+        self.check_marks(verifier, marks,
+                         file.tell() - len(block[-1]) - verifier.start)
+        return block
+
+    def check_marks(self, verifier: BlockVerifier,
+                    marks: List[Tuple[int, int]],
+                    end: int) -> None:
+        """
+        Сообщает о поврежденном блоке секции, если он начинается в уже
+        прочитанных данных.
+
+        :param verifier: Объект проверки секции.
+        :param marks: Пары (позиция блока в секции, позиция его данных
+              в исходном файле) прочитанных блоков по порядку.
+        :param end: Позиция в секции, до которой данные прочитаны.
+        :raises ValueError: Если поврежденный блок уже прочитан.
+        """
+        begin = verifier.find_damage(end)
+        if begin is None:
+            return
+        index = max(bisect_right(marks, (begin, float('inf'))) - 1, 0)
+        raise self.block_damage(verifier, marks[index][1])
+
+    def check_chunk(self, verifier: Optional[BlockVerifier],
+                    decoder: Union[TableDecoder, NumpyDecoder,
+                                   AdaptiveDecoder],
+                    encoded_data: bytes,
+                    position: int,
+                    decoded: int) -> None:
+        """
+        Проверяет, попал ли поврежденный блок секции в прочитанную порцию
+        сжатых данных, до ее декодирования. Если попал, целая часть
+        порции перед блоком декодируется, чтобы найти позицию исходного
+        файла, с которой данные потеряны.
+
+        :param verifier: Объект проверки секции или None.
+        :param decoder: Декодер секции данных.
+        :param encoded_data: Прочитанная порция.
+        :param position: Позиция порции в секции.
+        :param decoded: Количество символов, декодированных из
+              предыдущих порций.
+        :raises ValueError: Если порция содержит поврежденный блок.
+        """
+        if verifier is None:
+            return
+        begin = verifier.find_damage(position + len(encoded_data))
+        if begin is None:
+            return
+        try:
+            decoded += len(decoder.decode(encoded_data[:begin - position],
+                                          0))
+        except ValueError:
+            pass
+        raise self.block_damage(verifier, decoded)
+
+    def read_checkpoints(self, file: BinaryIO,
+                         buffer: bytes
+                         ) -> Tuple[List[Tuple[int, int]], bytes]:
+        """
+        Читает индекс контрольных точек, записанный после секции данных,
+        если он есть в архиве.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :return: Кортеж из контрольных точек (пустой список, если индекса
+                нет) и оставшегося буфера.
+        :raises ValueError: Если индекс поврежден.
+        """
+        if not self.checkpoints:
+            return [], buffer
+        size, buffer = self.read_varint(file, buffer)
+        index, buffer = self.read_exact(file, buffer, size)
+        return unpack_checkpoints(index), buffer
+
+    def read_section(self, file: BinaryIO,
+                     buffer: bytes,
+                     end_str: bytes) -> Tuple[bytes, bytes]:
+        """
+        Читает секцию пути или дерева: в архиве версии 3 по длине
+        (varint), в архиве версии 2 до маркера конца.
+
+        :param file: Файловый объект для чтения данных.
+        :param buffer: Буфер данных для обработки.
+        :param end_str: Маркер конца секции для версии 2.
+        :return: Кортеж из данных секции и оставшегося буфера.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        if self.version < 3:
+            return self.finder_ends(file, buffer, end_str)
+        size, buffer = self.read_varint(file, buffer)
+        return self.read_exact(file, buffer, size)
+
     def decoded_block(self,
                       outfile: Union[BinaryIO, TextIO],
-                      bits: str,
+                      decoder: Union[TableDecoder, NumpyDecoder,
+                                     AdaptiveDecoder],
                       buffer: bytes,
                       end_data: int,
-                      tree: HuffmanTree,
-                      hasher: MD5) -> Tuple[bytes, str]:
+                      hasher: Hasher) -> bytes:
         """
         Декодирует блок данных и записывает результат в файл.
 
         :param outfile: Файл для записи раскодированных данных.
-        :param bits: Биты, представляющие закодированные данные.
+        :param decoder: Декодер Хаффмана.
         :param buffer: Буфер данных.
         :param end_data: Позиция окончания данных в буфере.
-        :param tree: Дерево Хаффмана.
         :param hasher: Объект для вычисления хеша.
-        :return: Оставшийся буфер данных и оставшиеся биты.
+        :return: Оставшийся буфер данных.
         """
         if end_data >= 0:
             encoded_data = buffer[:end_data-1]
@@ -409,20 +1498,14 @@ class Decompressor(IDecompressor):
             encoded_data = buffer[:-5]
             count = -1
             buffer = buffer[-5:]
-        bits += self._bytes_to_bits(encoded_data)
-        decoded_data, bits = tree.decode(bits, count)
-        outfile.write(decoded_data)
-
-        if self.codec is None:
-            hasher.hash(decoded_data)
-        else:
-            hasher.hash(decoded_data.encode(self.codec))
+        decoded_data = decoder.decode(encoded_data, count)
+        self._write_decoded(outfile, hasher, decoded_data)
 
-        return buffer, bits
+        return buffer
 
     def check_hash(self,
                    file: BinaryIO,
-                   hasher: MD5,
+                   hasher: Hasher,
                    out_path: str,
                    buffer: bytes = b'') -> None:
         """
@@ -456,6 +1539,14 @@ class Decompressor(IDecompressor):
         :param file: Объект файла архива.
         :param buffer: Буфер данных.
         """
+        if self.version >= 3:
+            self.skip_sized(file, buffer)
+            return
+
+        if self.block_tables:
+            self.skip_blocks(file, buffer)
+            return
+
         pointer = file.tell()
 
         end_data = buffer.find(END_DATA)
@@ -477,37 +1568,109 @@ class Decompressor(IDecompressor):
                 self.progress_bar.update_with_point(file.tell())
                 return
 
+    def skip_sized(self, file: BinaryIO, buffer: bytes = b'') -> None:
+        """
+        Пропускает файл в архиве версии 3 по длинам секций, не читая
+        дерево и данные.
+
+        :param file: Объект файла архива.
+        :param buffer: Буфер данных.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        if not (self.adaptive or self.block_tables):
+            size, buffer = self.read_varint(file, buffer)
+            buffer = self.skip_exact(file, buffer, size)
+        size, buffer = self.read_data_length(file, buffer)
+        buffer = self.skip_exact(file, buffer, size)
+        if self.block_checksums:
+            size, buffer = self.read_varint(file, buffer)
+            buffer = self.skip_exact(file, buffer, size)
+        if self.checkpoints:
+            size, buffer = self.read_varint(file, buffer)
+            buffer = self.skip_exact(file, buffer, size)
+        buffer = self.skip_exact(file, buffer, 16)
+        file.seek(file.tell() - len(buffer))
+        self.progress_bar.update_with_point(file.tell())
+
+    def skip_blocks(self, file: BinaryIO, buffer: bytes = b'') -> None:
+        """
+        Пропускает блоки файла, записанные Compressor.write_blocks, вместе
+        с концом данных и хешем, не читая содержимое блоков.
+
+        :param file: Объект файла архива.
+        :param buffer: Буфер данных.
+        :raises ValueError: Если блоки повреждены.
+        """
+        while True:
+            flag, buffer = self.read_exact(file, buffer, 1)
+            if flag[0] == BLOCK_END:
+                break
+            if flag[0] == BLOCK_NEW_TABLE:
+                size, buffer = self.read_varint(file, buffer)
+                buffer = self.skip_exact(file, buffer, size)
+            elif flag[0] != BLOCK_REUSE_TABLE:
+                raise ValueError('Файл поврежден [Неверный флаг блока]')
+            _, buffer = self.read_varint(file, buffer)
+            size, buffer = self.read_varint(file, buffer)
+            buffer = self.skip_exact(file, buffer, size)
+
+        buffer = self.skip_exact(file, buffer, len(END_DATA) + 16)
+        file.seek(file.tell() - len(buffer))
+        self.progress_bar.update_with_point(file.tell())
+
     @staticmethod
-    def authentication(path: str,
+    def skip_exact(file: BinaryIO, buffer: bytes, size: int) -> bytes:
+        """
+        Пропускает ровно size байт, начиная с буфера.
+
+        :param file: Объект файла архива.
+        :param buffer: Буфер данных.
+        :param size: Количество байт.
+        :return: Оставшийся буфер данных.
+        :raises ValueError: Если архив закончился раньше.
+        """
+        if size <= len(buffer):
+            return buffer[size:]
+        target = file.tell() + size - len(buffer)
+        if target > os.fstat(file.fileno()).st_size:
+            raise ValueError('Файл поврежден [Неожиданный конец архива]')
+        file.seek(target)
+        return b''
+
+    def authentication(self, path: str,
                        auth_bytes: bytes
                        ) -> Tuple[bool, Optional[bytes]]:
         """
-        Аутентификация пользователя для защищенного файла.
+        Аутентификация пользователя для защищенного файла: ключ берется
+        у источника паролей (self.credentials) и проверяется по байтам
+        аутентификации; источнику дается credentials.attempts попыток.
 
-        :param path: Путь к файлу.
+        :param path: Путь файла в архиве.
         :param auth_bytes: Зашифрованный хэш пароля.
         :return: Кортеж, содержащий результат аутентификации
                 и хэш пароля (если успешно).
         """
-        print(f'\nВведите пароль от файла {path} '
-              '(или пустую строку чтобы пропустить файл):')
+        credentials = self.credentials
+        if credentials is None:
+            return False, None
 
-        for i in range(3):
-            password = getpass.getpass()
-            if not password:
+        for i in range(credentials.attempts):
+            hash_pass = credentials.get_key(path, i)
+            if hash_pass is None:
                 print(f'\nВы пропустили файл {path}')
                 return False, None
 
-            hasher = MD5()
-            hasher.hash(password.encode())
-            hash_pass = hasher.get_hash()
             if AUTH_BYTES == aes_decrypt(auth_bytes, hash_pass):
                 return True, hash_pass
-            else:
-                print(f'Не верный пароль. Осталось {2 - i} попытка(-ки)')
-                continue
+            left = credentials.attempts - i - 1
+            if left:
+                print(f'Не верный пароль. Осталось {left} попытка(-ки)')
 
-        print(f'Попытки закончились. Файл автоматически пропускается.')
+        if credentials.attempts > 1:
+            print(f'Попытки закончились. Файл автоматически пропускается.')
+        else:
+            print(f'\nНе верный пароль от файла {path}. '
+                  f'Файл пропускается.')
         return False, None
 
     @staticmethod
@@ -565,3 +1728,33 @@ class Decompressor(IDecompressor):
                 self.progress_bar.update_with_point(file.tell())
 
         return _bytes, buffer
+
+
+def _decompress_entry(decompressor: Decompressor,
+                      offset: int,
+                      file: Optional[BinaryIO] = None) -> Optional[str]:
+    """
+    Распаковывает один элемент архива. В дочернем процессе архив
+    открывается заново и читается с нужного смещения.
+
+    :param decompressor: Распаковщик с прочитанным заголовком архива.
+    :param offset: Смещение элемента в архиве.
+    :param file: Уже открытый архив. По умолчанию None (открыть заново).
+    :return: Сообщение об ошибке или None, если элемент распакован. Любое
+            исключение распаковки элемента возвращается сообщением, чтобы
+            ошибка одного элемента не прерывала обработку остальных.
+    """
+    if file is None:
+        decompressor.progress_bar = ProgressBar(visible=False)
+        decompressor.workers = 1
+        with open(decompressor.archive_path, 'rb') as file:
+            return _decompress_entry(decompressor, offset, file)
+
+    file.seek(offset)
+    try:
+        decompressor.decompress_entry(file)
+    except ValueError as e:
+        return e.args[0]
+    except Exception as e:
+        return f'Ошибка распаковки [{type(e).__name__}: {e}]'
+    return None
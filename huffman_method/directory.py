@@ -0,0 +1,222 @@
+import fnmatch
+import os
+from typing import BinaryIO, List, Optional, Tuple
+
+from huffman_method.canonical import decode_varint, encode_varint
+from huffman_method.checksum import create_hasher
+from huffman_method.const_byte import (CHECKSUM_BLAKE2, DIRECTORY_MAGIC,
+                                       TRAILER_SIZE)
+
+DIRECTORY_READ_SIZE: int = 1 << 16
+"""
+Размер хвоста архива (в байтах), который читается одним обращением
+при загрузке центрального каталога.
+"""
+
+DIRECTORY_CHECKSUM: int = CHECKSUM_BLAKE2
+"""
+Алгоритм хеша центрального каталога в завершающем блоке. Каталог
+хешируется при каждом открытии архива, поэтому используется BLAKE2b
+(hashlib), а не MD5 на чистом Python, независимо от алгоритма хеша
+файлов в заголовке.
+"""
+
+
+def match_path(path: str, patterns: List[str]) -> bool:
+    """
+    Проверяет, подходит ли путь элемента архива под один из шаблонов.
+    Шаблон подходит, если совпадает с путем как glob-шаблон (fnmatch,
+    с учетом регистра) или является одной из его родительских
+    директорий.
+
+    :param path: Нормализованный путь элемента в архиве.
+    :param patterns: Пути или glob-шаблоны.
+    :return: True, если путь подходит хотя бы под один шаблон.
+    """
+    for pattern in patterns:
+        pattern = os.path.normpath(pattern)
+        if (fnmatch.fnmatchcase(path, pattern) or
+                path.startswith(pattern + os.sep)):
+            return True
+    return False
+
+
+class DirectoryEntry:
+    """
+    Запись центрального каталога архива: описание одного элемента,
+    достаточное для его поиска и извлечения без чтения остальных.
+    """
+
+    def __init__(self,
+                 path: str,
+                 is_file: bool,
+                 not_empty: bool,
+                 protected: bool,
+                 offset: int,
+                 compressed_size: int,
+                 original_size: Optional[int],
+                 digest: bytes) -> None:
+        """
+        Инициализирует запись каталога.
+
+        :param path: Путь элемента в архиве.
+        :param is_file: True для файла, False для пустой директории.
+        :param not_empty: Флаг наличия данных в файле.
+        :param protected: Флаг защиты паролем.
+        :param offset: Смещение элемента в архиве.
+        :param compressed_size: Размер элемента в архиве в байтах.
+        :param original_size: Размер исходного файла в байтах или None,
+              если он неизвестен (элемент найден в архиве версии 2).
+        :param digest: Хеш элемента, записанный в его конце.
+        """
+        self.path: str = path
+        self.is_file: bool = is_file
+        self.not_empty: bool = not_empty
+        self.protected: bool = protected
+        self.offset: int = offset
+        self.compressed_size: int = compressed_size
+        self.original_size: Optional[int] = original_size
+        self.digest: bytes = digest
+
+    @property
+    def end(self) -> int:
+        """
+        Смещение сразу после элемента в архиве.
+        """
+        return self.offset + self.compressed_size
+
+    def pack(self) -> bytes:
+        """
+        Сериализует запись: длина пути (varint), путь, тип, флаги данных
+        и защиты, смещение, сжатый и исходный размеры (varint) и хеш.
+
+        :return: Байты записи.
+        """
+        bytes_path = self.path.encode('utf-8')
+        return b''.join((encode_varint(len(bytes_path)),
+                         bytes_path,
+                         bytes([self.is_file, self.not_empty,
+                                self.protected]),
+                         encode_varint(self.offset),
+                         encode_varint(self.compressed_size),
+                         encode_varint(self.original_size),
+                         self.digest))
+
+    @classmethod
+    def unpack(cls, data: bytes, pos: int = 0) -> Tuple['DirectoryEntry',
+                                                        int]:
+        """
+        Восстанавливает запись, сериализованную pack.
+
+        :param data: Байты каталога.
+        :param pos: Позиция начала записи.
+        :return: Кортеж из записи и позиции сразу после нее.
+        :raises ValueError: Если запись повреждена.
+        """
+        size, pos = decode_varint(data, pos)
+        path = data[pos:pos + size].decode('utf-8')
+        pos += size
+        flags = data[pos:pos + 3]
+        if len(flags) < 3 or max(flags) > 1:
+            raise ValueError('Ошибка структуры каталога '
+                             '[Неверные флаги элемента]')
+        offset, pos = decode_varint(data, pos + 3)
+        compressed_size, pos = decode_varint(data, pos)
+        original_size, pos = decode_varint(data, pos)
+        digest = data[pos:pos + 16]
+        if len(digest) < 16:
+            raise ValueError('Ошибка структуры каталога '
+                             '[Неожиданный конец каталога]')
+        entry = cls(path, flags[0] == 1, flags[1] == 1, flags[2] == 1,
+                    offset, compressed_size, original_size, digest)
+        return entry, pos + 16
+
+
+def pack_directory(entries: List[DirectoryEntry], offset: int) -> bytes:
+    """
+    Сериализует центральный каталог вместе с завершающим блоком.
+
+    Каталог состоит из количества записей (varint) и самих записей.
+    Завершающий блок фиксированного размера TRAILER_SIZE содержит
+    DIRECTORY_MAGIC, смещение и размер каталога (8 байт, big-endian)
+    и хеш каталога (DIRECTORY_CHECKSUM).
+
+    :param entries: Записи каталога в порядке элементов архива.
+    :param offset: Смещение, с которого каталог будет записан.
+    :return: Байты каталога и завершающего блока.
+    """
+    directory = encode_varint(len(entries)) + b''.join(
+        entry.pack() for entry in entries)
+    hasher = create_hasher(DIRECTORY_CHECKSUM)
+    hasher.hash(directory)
+    return b''.join((directory,
+                     DIRECTORY_MAGIC,
+                     offset.to_bytes(8, byteorder='big'),
+                     len(directory).to_bytes(8, byteorder='big'),
+                     hasher.get_hash()))
+
+
+def unpack_directory(directory: bytes) -> List[DirectoryEntry]:
+    """
+    Восстанавливает записи каталога, сериализованного pack_directory.
+
+    :param directory: Байты каталога без завершающего блока.
+    :return: Записи каталога.
+    :raises ValueError: Если каталог поврежден.
+    """
+    count, pos = decode_varint(directory)
+    entries = []
+    for _ in range(count):
+        entry, pos = DirectoryEntry.unpack(directory, pos)
+        entries.append(entry)
+    if pos != len(directory):
+        raise ValueError('Ошибка структуры каталога [Лишние данные]')
+    return entries
+
+
+def read_directory(file: BinaryIO,
+                   start: int) -> Tuple[List[DirectoryEntry], int]:
+    """
+    Читает центральный каталог с конца архива. Хвост архива читается
+    одним обращением размером DIRECTORY_READ_SIZE, поэтому небольшой
+    каталог загружается за один переход; большой каталог дочитывается
+    вторым.
+
+    :param file: Файловый объект архива.
+    :param start: Смещение первого элемента архива.
+    :return: Кортеж из записей каталога и смещения каталога (конца
+            элементов архива).
+    :raises ValueError: Если завершающий блок или каталог повреждены.
+    """
+    size = file.seek(0, 2)
+    if size - start < TRAILER_SIZE:
+        raise ValueError('Ошибка структуры архива [Нет центрального '
+                         'каталога]')
+    tail_size = min(size - start, max(DIRECTORY_READ_SIZE, TRAILER_SIZE))
+    file.seek(size - tail_size)
+    tail = file.read(tail_size)
+
+    trailer = tail[-TRAILER_SIZE:]
+    magic_size = len(DIRECTORY_MAGIC)
+    if trailer[:magic_size] != DIRECTORY_MAGIC:
+        raise ValueError('Ошибка структуры архива [Нет центрального '
+                         'каталога]')
+    offset = int.from_bytes(trailer[magic_size:magic_size + 8],
+                            byteorder='big')
+    length = int.from_bytes(trailer[magic_size + 8:magic_size + 16],
+                            byteorder='big')
+    if offset < start or offset + length != size - TRAILER_SIZE:
+        raise ValueError('Ошибка структуры архива [Неверное смещение '
+                         'каталога]')
+
+    if length <= tail_size - TRAILER_SIZE:
+        directory = tail[len(tail) - TRAILER_SIZE - length:-TRAILER_SIZE]
+    else:
+        file.seek(offset)
+        directory = file.read(length)
+
+    hasher = create_hasher(DIRECTORY_CHECKSUM)
+    hasher.hash(directory)
+    if hasher.get_hash() != trailer[magic_size + 16:]:
+        raise ValueError('Центральный каталог архива поврежден!')
+    return unpack_directory(directory), offset
@@ -0,0 +1,121 @@
+from typing import Dict, List, Optional, Tuple, Union
+
+from huffman_method.canonical import Symbol
+from huffman_method.huffman import HuffmanTree
+from huffman_method.numpy_backend import NumpyEncoder, numpy_can_encode
+
+FLUSH_SYMBOLS: int = 512
+"""
+Количество символов, после которых накопитель сбрасывается в байты.
+"""
+
+
+class BitEncoder:
+    """
+    Кодировщик Хаффмана, упаковывающий коды в целочисленный накопитель.
+
+    Для каждого символа заранее вычисляется пара (код, длина), поэтому
+    при кодировании не создаются строки из '0' и '1'.
+    """
+
+    def __init__(self,
+                 codes: Dict[Symbol, str],
+                 codec: Optional[str] = None) -> None:
+        """
+        Инициализирует кодировщик по кодам символов.
+
+        :param codes: Словарь кодов символов ('0'/'1' строки).
+        :param codec: Кодек данных. None для бинарного режима.
+        """
+        self.codec: Optional[str] = codec
+        self._table: Union[List[Optional[Tuple[int, int]]],
+                           Dict[str, Tuple[int, int]]]
+        if codec is None:
+            self._table = [None] * 256
+        else:
+            self._table = {}
+        for char, code in codes.items():
+            self._table[char] = (int(code, 2), len(code))
+
+        self._acc: int = 0
+        self._nbits: int = 0
+        self.bits_written: int = 0
+
+    @classmethod
+    def from_tree(cls, tree: HuffmanTree) -> 'BitEncoder':
+        """
+        Создает кодировщик по дереву Хаффмана.
+
+        :param tree: Дерево Хаффмана.
+        :return: Объект кодировщика.
+        """
+        return cls(tree.get_codes(), tree.get_codec())
+
+    @property
+    def bit_position(self) -> int:
+        """
+        Количество бит, закодированных с начала потока, включая биты,
+        еще не записанные в выходные байты.
+        """
+        return self.bits_written + self._nbits
+
+    def encode(self, block: Union[bytes, str]) -> bytes:
+        """
+        Кодирует блок данных.
+
+        Возвращает только полные байты, оставшиеся биты сохраняются
+        до следующего вызова или до flush.
+
+        :param block: Блок данных для кодирования.
+        :return: Закодированные байты.
+        """
+        table = self._table
+        acc = self._acc
+        nbits = self._nbits
+        out = bytearray()
+
+        for start in range(0, len(block), FLUSH_SYMBOLS):
+            for char in block[start:start + FLUSH_SYMBOLS]:
+                code, length = table[char]
+                acc = (acc << length) | code
+                nbits += length
+            extra = nbits & 7
+            out += (acc >> extra).to_bytes(nbits >> 3, byteorder='big')
+            self.bits_written += nbits - extra
+            acc &= (1 << extra) - 1
+            nbits = extra
+
+        self._acc = acc
+        self._nbits = nbits
+        return bytes(out)
+
+    def flush(self) -> bytes:
+        """
+        Завершает поток: дополняет последний байт нулями и добавляет байт
+        с количеством дополненных бит.
+
+        :return: Хвост потока.
+        """
+        acc = self._acc
+        nbits = self._nbits
+        self.bits_written += nbits
+        self._acc = 0
+        self._nbits = 0
+        if not nbits:
+            return bytes([0])
+        count = 8 - nbits
+        return bytes([acc << count, count])
+
+
+def create_encoder(tree: HuffmanTree) -> Union[BitEncoder, NumpyEncoder]:
+    """
+    Создает самый быстрый доступный кодировщик для дерева: векторный,
+    если установлен NumPy и данные бинарные, иначе BitEncoder.
+
+    :param tree: Дерево Хаффмана.
+    :return: Объект кодировщика.
+    """
+    codes = tree.get_codes()
+    if numpy_can_encode(codes, tree.get_codec()):
+        return NumpyEncoder(codes)
+    return BitEncoder(codes, tree.get_codec())
@@ -1,7 +1,14 @@
 import heapq
+from array import array
 from collections import Counter
 import pickle
-from typing import Dict, Tuple, Union, Optional
+from typing import Any, Dict, List, Tuple, Union, Optional
+
+from huffman_method.canonical import (Symbol, canonical_codes,
+                                      pack_code_lengths, unpack_code_lengths)
+from huffman_method.length_limit import code_cost, package_merge
+from huffman_method.numpy_backend import (HISTOGRAM_MIN_SIZE,
+                                          NUMPY_AVAILABLE, byte_histogram)
 
 
 class HuffmanNode:
@@ -40,9 +47,44 @@ class HuffmanNode:
         return self.left is None and self.right is None
 
 
+class _HeapItem:
+    """
+    Элемент очереди с приоритетом при построении дерева.
+
+    Сравнивается только по частоте, как HuffmanNode, поэтому при равных
+    частотах дерево строится так же, как из объектов HuffmanNode.
+    """
+
+    __slots__ = ('freq', 'node')
+
+    def __init__(self, freq: int, node: int):
+        """
+        Инициализирует элемент очереди.
+
+        :param freq: Частота узла.
+        :param node: Индекс узла в массивах дерева.
+        """
+        self.freq = freq
+        self.node = node
+
+    def __lt__(self, other: '_HeapItem') -> bool:
+        """
+        Сравнивает два элемента очереди на основе их частот.
+
+        :param other: Другой элемент очереди.
+        :return: True, если частота текущего элемента меньше частоты другого.
+        """
+        return self.freq < other.freq
+
+
 class HuffmanTree:
     """
     Сущность дерева кодирования Хаффмана.
+
+    Узлы хранятся в параллельных массивах: индексы левых и правых потомков
+    (-1, если потомка нет), частоты узлов и символы листьев. При сериализации
+    дерево преобразуется в граф HuffmanNode, поэтому формат архива
+    не меняется.
     """
 
     def __init__(self, codec: Optional[str] = None):
@@ -51,41 +93,88 @@ class HuffmanTree:
 
         :param codec: Кодек, используемый для декодирования. По умолчанию None.
         """
-        self.root = None
         self.frequency = Counter()
         self.codec = codec
+        self._clear()
+
+    @property
+    def root(self) -> Optional[int]:
+        """
+        Индекс корня дерева или None, если дерево не построено.
+        """
+        return None if self._root < 0 else self._root
 
-    def _build_codes(self,
-                     node: HuffmanNode, prefix: str = '',
-                     codes: Dict[str, str] = {}) -> Dict[str, str]:
+    def _clear(self) -> None:
+        """
+        Удаляет все узлы дерева.
         """
-        Рекурсивно строит коды Хаффмана для символов в дереве.
+        self._left: array = array('i')
+        self._right: array = array('i')
+        self._weights: array = array('q')
+        self._chars: List[Optional[Symbol]] = []
+        self._root: int = -1
+        self._codes: Optional[Dict[Symbol, str]] = None
+
+    def _new_node(self, char: Optional[Symbol], freq: int = 0) -> int:
+        """
+        Добавляет узел в массивы дерева.
 
-        :param node: Текущий узел, который обрабатывается.
-        :param prefix: Префиксный код, сгенерированный на данный момент.
-        :param codes: Словарь для хранения кодов Хаффмана.
-        :return: Словарь, содержащий коды Хаффмана для символов.
+        :param char: Символ листа или None для внутреннего узла.
+        :param freq: Частота узла.
+        :return: Индекс нового узла.
         """
-        if node is not None:
-            if node.char is not None:
-                codes[node.char] = prefix
-            self._build_codes(node.left, prefix + '0', codes)
-            self._build_codes(node.right, prefix + '1', codes)
-        return codes
+        self._left.append(-1)
+        self._right.append(-1)
+        self._weights.append(freq)
+        self._chars.append(char)
+        return len(self._chars) - 1
 
-    def get_codes(self) -> Dict[str, str]:
+    def clear(self) -> None:
+        """
+        Сбрасывает счетчик частот и дерево, чтобы объект можно было
+        использовать для следующего файла.
+        """
+        self.frequency = Counter()
+        self._clear()
+
+    def get_codes(self) -> Dict[Symbol, str]:
         """
         Генерирует коды Хаффмана для всех символов в дереве.
 
+        Коды вычисляются обходом дерева без рекурсии и запоминаются
+        до следующего изменения дерева.
+
         :return: Словарь, содержащий коды Хаффмана для символов.
         """
-        if self.root is None:
+        if self._root < 0:
             return {}
+        if self._codes is None:
+            self._codes = self._build_codes()
+        return dict(self._codes)
 
-        if self.root.left is None and self.root.right is None:
-            return {self.root.char: '1'}
+    def _build_codes(self) -> Dict[Symbol, str]:
+        """
+        Строит коды Хаффмана для символов в дереве обходом в глубину.
 
-        return self._build_codes(self.root)
+        :return: Словарь, содержащий коды Хаффмана для символов.
+        """
+        left = self._left
+        right = self._right
+        chars = self._chars
+        if left[self._root] < 0 and right[self._root] < 0:
+            return {chars[self._root]: '1'}
+
+        codes = {}
+        stack = [(self._root, '')]
+        while stack:
+            node, prefix = stack.pop()
+            if chars[node] is not None:
+                codes[chars[node]] = prefix
+            if right[node] >= 0:
+                stack.append((right[node], prefix + '1'))
+            if left[node] >= 0:
+                stack.append((left[node], prefix + '0'))
+        return codes
 
     def decode(self,
                bit_sequence: str,
@@ -97,41 +186,41 @@ class HuffmanTree:
         :param count: Количество битов для декодирования. По умолчанию -1.
         :return: Кортеж, содержащий декодированные данные и оставшиеся биты.
         """
-        if self.root is None:
+        if self._root < 0:
             raise ValueError('Дерево Хаффмана пусто. '
                              'невозможно декодировать данные')
 
-        current_node = self.root
-
         if count >= 1:
             bit_sequence = bit_sequence[:-count]
 
-        if self.codec is None:
-            decoded_data = bytearray()
-        else:
-            decoded_data = []
-
-        remaining_bits = ''
-
-        for bit_str in bit_sequence:
-            remaining_bits += bit_str
-
-            if bit_str == '0':
-                current_node = current_node.left
-            else:
-                current_node = current_node.right
-
-            if current_node.is_leaf():
-                decoded_data.append(current_node.char)
-                remaining_bits = ''
-                current_node = self.root
+        left = self._left
+        right = self._right
+        chars = self._chars
+        root = self._root
+        node = root
+        decoded_data = []
+        start = 0
+
+        if left[root] < 0 and right[root] < 0:
+            decoded_data = [chars[root]] * len(bit_sequence)
+            start = len(bit_sequence)
+
+        for pos, bit_str in enumerate(bit_sequence[start:]):
+            node = left[node] if bit_str == '0' else right[node]
+            if node < 0:
+                raise ValueError('Файл поврежден [Недопустимый код '
+                                 'Хаффмана]')
+            if left[node] < 0 and right[node] < 0:
+                decoded_data.append(chars[node])
+                node = root
+                start = pos + 1
 
         if self.codec is None:
-            decoded_data = bytes(decoded_data)
+            decoded = bytes(decoded_data)
         else:
-            decoded_data = ''.join(decoded_data)
+            decoded = ''.join(decoded_data)
 
-        return decoded_data, remaining_bits
+        return decoded, bit_sequence[start:]
 
     def add_block(self, block: Union[str, bytes]) -> None:
         """
@@ -141,31 +230,79 @@ class HuffmanTree:
         """
         if not block:
             return
-        self.frequency.update(block)
+        if (NUMPY_AVAILABLE and isinstance(block, (bytes, bytearray)) and
+                len(block) >= HISTOGRAM_MIN_SIZE):
+            self._add_histogram(block)
+        else:
+            self.frequency.update(block)
+
+    def cover_bytes(self) -> None:
+        """
+        Добавляет в счетчик частот с частотой 1 все байты, которые
+        не встретились в блоках, чтобы дерево могло закодировать любые
+        бинарные данные.
+        """
+        frequency = self.frequency
+        for char in range(256):
+            if char not in frequency:
+                frequency[char] = 1
+
+    def _add_histogram(self, block: Union[bytes, bytearray]) -> None:
+        """
+        Добавляет частоты байтов блока, посчитанные векторно.
+
+        Новые символы добавляются в счетчик в порядке первого появления
+        в блоке, как это делает Counter.update, поэтому дерево строится
+        так же, как при посимвольном подсчете.
+
+        :param block: Блок байтов.
+        """
+        counts = byte_histogram(block)
+        frequency = self.frequency
+        new = [char for char, count in enumerate(counts)
+               if count and char not in frequency]
+        for char in sorted(new, key=block.find):
+            frequency[char] = 0
+        for char, count in enumerate(counts):
+            if count:
+                frequency[char] += count
 
     def build_tree(self) -> None:
         """
         Строит дерево Хаффмана на основе счетчика частот.
         """
+        self._clear()
+        if not self.frequency:
+            return
         if len(self.frequency) == 1:
             char, freq = next(iter(self.frequency.items()))
-            self.root = HuffmanNode(char, freq)
+            self._root = self._new_node(char, freq)
             return
-        else:
-            priority_queue = []
-            for char, freq in self.frequency.items():
-                priority_queue.append(HuffmanNode(char, freq))
-            heapq.heapify(priority_queue)
-
-            while len(priority_queue) > 1:
-                left = heapq.heappop(priority_queue)
-                right = heapq.heappop(priority_queue)
-                merged = HuffmanNode(None, left.freq + right.freq)
-                merged.left = left
-                merged.right = right
-                heapq.heappush(priority_queue, merged)
 
-            self.root = priority_queue[0]
+        count = len(self.frequency)
+        self._chars = list(self.frequency) + [None] * (count - 1)
+        self._weights = array('q', self.frequency.values())
+        self._weights.extend(array('q', bytes(8 * (count - 1))))
+        self._left = array('i', [-1]) * (2 * count - 1)
+        self._right = array('i', [-1]) * (2 * count - 1)
+        weights = self._weights
+        left_nodes = self._left
+        right_nodes = self._right
+
+        priority_queue = [_HeapItem(freq, node)
+                          for node, freq in enumerate(weights[:count])]
+        heapq.heapify(priority_queue)
+
+        for merged in range(count, 2 * count - 1):
+            left = heapq.heappop(priority_queue)
+            right = heapq.heappop(priority_queue)
+            freq = left.freq + right.freq
+            weights[merged] = freq
+            left_nodes[merged] = left.node
+            right_nodes[merged] = right.node
+            heapq.heappush(priority_queue, _HeapItem(freq, merged))
+
+        self._root = priority_queue[0].node
 
     def serialize_to_string(self) -> bytes:
         """
@@ -182,9 +319,160 @@ class HuffmanTree:
         :param serialized_tree_string: Сериализованная строка дерева.
         """
         deserialized_tree = pickle.loads(serialized_tree_string)
-        self.root = deserialized_tree.root
+        self._left = deserialized_tree._left
+        self._right = deserialized_tree._right
+        self._weights = deserialized_tree._weights
+        self._chars = deserialized_tree._chars
+        self._root = deserialized_tree._root
+        self._codes = None
         self.codec = deserialized_tree.codec
 
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Возвращает состояние для pickle в виде графа HuffmanNode, как его
+        сохраняли прежние версии архиватора.
+
+        :return: Словарь состояния.
+        """
+        return {'root': self._to_nodes(),
+                'frequency': self.frequency,
+                'codec': self.codec}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Восстанавливает дерево из состояния pickle.
+
+        :param state: Словарь состояния с графом HuffmanNode.
+        """
+        self.frequency = state.get('frequency', Counter())
+        self.codec = state.get('codec')
+        self._from_nodes(state.get('root'))
+
+    def _to_nodes(self) -> Optional[HuffmanNode]:
+        """
+        Преобразует массивы дерева в граф объектов HuffmanNode.
+
+        :return: Корень графа или None, если дерево пусто.
+        """
+        if self._root < 0:
+            return None
+        nodes = [HuffmanNode(char, freq)
+                 for char, freq in zip(self._chars, self._weights)]
+        for node, left, right in zip(nodes, self._left, self._right):
+            if left >= 0:
+                node.left = nodes[left]
+            if right >= 0:
+                node.right = nodes[right]
+        return nodes[self._root]
+
+    def _from_nodes(self, root: Optional[HuffmanNode]) -> None:
+        """
+        Заполняет массивы дерева по графу объектов HuffmanNode.
+
+        :param root: Корень графа или None.
+        """
+        self._clear()
+        if root is None:
+            return
+        self._root = self._new_node(root.char, root.freq)
+        stack = [(root, self._root)]
+        while stack:
+            node, index = stack.pop()
+            if node.left is not None:
+                child = self._new_node(node.left.char, node.left.freq)
+                self._left[index] = child
+                stack.append((node.left, child))
+            if node.right is not None:
+                child = self._new_node(node.right.char, node.right.freq)
+                self._right[index] = child
+                stack.append((node.right, child))
+
+    def get_code_lengths(self) -> Dict[Symbol, int]:
+        """
+        Возвращает длины кодов Хаффмана для всех символов в дереве.
+
+        :return: Словарь, содержащий длины кодов для символов.
+        """
+        return {char: len(code) for char, code in self.get_codes().items()}
+
+    def canonize(self) -> None:
+        """
+        Перестраивает дерево так, чтобы его коды стали каноническими.
+        Длины кодов при этом не меняются.
+        """
+        if self.root is None:
+            return
+        self._build_from_codes(canonical_codes(self.get_code_lengths()))
+
+    def get_cost(self) -> int:
+        """
+        Вычисляет размер данных, закодированных деревом, по счетчику частот.
+
+        :return: Количество бит.
+        """
+        return code_cost(self.frequency, self.get_code_lengths())
+
+    def limit_code_lengths(self, max_length: int) -> bool:
+        """
+        Ограничивает длину кодов: если дерево содержит коды длиннее
+        max_length, оно перестраивается по оптимальным длинам кодов,
+        найденным алгоритмом package-merge. Коды при этом становятся
+        каноническими.
+
+        :param max_length: Максимальная длина кода.
+        :return: True, если дерево было перестроено.
+        :raises ValueError: Если символов больше, чем 2 ** max_length.
+        """
+        lengths = self.get_code_lengths()
+        if not lengths or max(lengths.values()) <= max_length:
+            return False
+        lengths = package_merge(self.frequency, max_length)
+        self._build_from_codes(canonical_codes(lengths))
+        return True
+
+    def serialize_code_lengths(self) -> bytes:
+        """
+        Сериализует дерево в компактную таблицу длин канонических кодов.
+
+        :return: Упакованная таблица длин кодов.
+        """
+        return pack_code_lengths(self.get_code_lengths(), self.codec)
+
+    def deserialize_code_lengths(self, data: bytes) -> None:
+        """
+        Восстанавливает дерево из таблицы длин канонических кодов.
+
+        :param data: Упакованная таблица длин кодов.
+        """
+        lengths = unpack_code_lengths(data, self.codec)
+        self._build_from_codes(canonical_codes(lengths))
+
+    def _build_from_codes(self, codes: Dict[Symbol, str]) -> None:
+        """
+        Строит дерево по готовым префиксным кодам символов.
+
+        :param codes: Словарь кодов символов.
+        :raises ValueError: Если коды не образуют префиксный код.
+        """
+        self._clear()
+        if not codes:
+            return
+        self._root = self._new_node(None)
+        chars = self._chars
+        for char, code in codes.items():
+            node = self._root
+            for bit in code:
+                if chars[node] is not None:
+                    raise ValueError('Коды не являются префиксными')
+                children = self._left if bit == '0' else self._right
+                if children[node] < 0:
+                    children[node] = self._new_node(None)
+                node = children[node]
+            if (self._left[node] >= 0 or self._right[node] >= 0 or
+                    chars[node] is not None):
+                raise ValueError('Коды не являются префиксными')
+            chars[node] = char
+
     def get_codec(self) -> Optional[str]:
         """
         Возвращает кодек, используемый для кодирования и декодирования.
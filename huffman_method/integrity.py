@@ -0,0 +1,263 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import BinaryIO, Deque, Iterator, List, Optional, Tuple
+
+from huffman_method.canonical import decode_varint, encode_varint
+from huffman_method.checksum import create_hasher
+
+VERIFY_THREADS: int = 4
+"""
+Количество потоков, вычисляющих контрольные суммы блоков при проверке.
+zlib.crc32 и hashlib освобождают GIL на больших буферах, поэтому блоки
+хешируются параллельно, пока основной поток читает следующие.
+"""
+
+
+def block_digest(checksum: int, data: bytes) -> bytes:
+    """
+    Вычисляет контрольную сумму одного блока.
+
+    :param checksum: Флаг алгоритма хеша из заголовка архива.
+    :param data: Данные блока.
+    :return: 16-байтная контрольная сумма.
+    """
+    hasher = create_hasher(checksum)
+    hasher.hash(data)
+    return hasher.get_hash()
+
+
+def pack_block_checksums(block_size: int,
+                         digests: List[bytes],
+                         checksum: int) -> bytes:
+    """
+    Сериализует индекс контрольных сумм блоков: размер блока (varint),
+    суммы блоков по порядку и общую сумму, вычисленную по суммам блоков,
+    которая защищает сам индекс.
+
+    :param block_size: Размер блока секции данных в байтах.
+    :param digests: Контрольные суммы блоков.
+    :param checksum: Флаг алгоритма хеша из заголовка архива.
+    :return: Байты индекса.
+    """
+    joined = b''.join(digests)
+    return (encode_varint(block_size) + joined +
+            block_digest(checksum, joined))
+
+
+def unpack_block_checksums(data: bytes,
+                           size: int,
+                           checksum: int) -> Tuple[int, List[bytes]]:
+    """
+    Восстанавливает индекс, сериализованный pack_block_checksums, и
+    сверяет общую сумму с суммами блоков.
+
+    :param data: Байты индекса.
+    :param size: Длина секции данных, к которой относится индекс.
+    :param checksum: Флаг алгоритма хеша из заголовка архива.
+    :return: Кортеж из размера блока и контрольных сумм блоков.
+    :raises ValueError: Если индекс поврежден.
+    """
+    block_size, pos = decode_varint(data)
+    if not block_size:
+        raise ValueError('Ошибка структуры индекса контрольных сумм '
+                         '[Нулевой размер блока]')
+    count = -(-size // block_size)
+    end = pos + 16 * count
+    if len(data) != end + 16:
+        raise ValueError('Ошибка структуры индекса контрольных сумм '
+                         '[Неверная длина индекса]')
+    joined = data[pos:end]
+    if block_digest(checksum, joined) != data[end:]:
+        raise ValueError('Ошибка структуры индекса контрольных сумм '
+                         '[Неверная общая сумма]')
+    return block_size, [joined[i:i + 16] for i in range(0, len(joined), 16)]
+
+
+def iter_block_digests(file: BinaryIO,
+                       start: int,
+                       size: int,
+                       block_size: int,
+                       checksum: int,
+                       pool: Optional[ThreadPoolExecutor] = None,
+                       threads: int = 1) -> Iterator[bytes]:
+    """
+    Читает секцию данных блоками и возвращает их контрольные суммы по
+    порядку. С пулом потоков блоки хешируются параллельно, а в очереди
+    держится не больше двух блоков на поток.
+
+    :param file: Файловый объект архива.
+    :param start: Смещение секции данных в файле.
+    :param size: Длина секции данных.
+    :param block_size: Размер блока.
+    :param checksum: Флаг алгоритма хеша из заголовка архива.
+    :param pool: Пул потоков или None (хешировать в текущем потоке).
+    :param threads: Количество потоков пула.
+    :return: Итератор контрольных сумм блоков.
+    :raises ValueError: Если архив закончился раньше конца секции.
+    """
+    pending: Deque[Future] = deque()
+    limit = 2 * threads - 1
+    file.seek(start)
+    for offset in range(0, size, block_size):
+        data = file.read(min(block_size, size - offset))
+        if len(data) < min(block_size, size - offset):
+            raise ValueError('Файл поврежден [Неожиданный конец архива]')
+        if pool is None:
+            yield block_digest(checksum, data)
+            continue
+        pending.append(pool.submit(block_digest, checksum, data))
+        while len(pending) > limit:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def find_damaged_block(file: BinaryIO,
+                       start: int,
+                       size: int,
+                       block_size: int,
+                       digests: List[bytes],
+                       checksum: int,
+                       threads: int = VERIFY_THREADS
+                       ) -> Optional[Tuple[int, int]]:
+    """
+    Сверяет блоки секции данных с индексом и останавливается на первом
+    поврежденном блоке, не читая остальные.
+
+    :param file: Файловый объект архива.
+    :param start: Смещение секции данных в файле.
+    :param size: Длина секции данных.
+    :param block_size: Размер блока из индекса.
+    :param digests: Контрольные суммы блоков из индекса.
+    :param checksum: Флаг алгоритма хеша из заголовка архива.
+    :param threads: Количество потоков. По умолчанию VERIFY_THREADS.
+    :return: Диапазон байт архива [начало, конец) первого поврежденного
+            блока или None, если все блоки целы.
+    :raises ValueError: Если архив закончился раньше конца секции.
+    """
+    pool = None
+    if threads > 1 and len(digests) > 1:
+        pool = ThreadPoolExecutor(threads)
+    try:
+        blocks = iter_block_digests(file, start, size, block_size,
+                                    checksum, pool, threads)
+        for index, (digest, expected) in enumerate(zip(blocks, digests)):
+            if digest != expected:
+                begin = start + index * block_size
+                return begin, min(begin + block_size, start + size)
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return None
+
+
+class BlockVerifier:
+    """
+    Сверяет блоки секции данных с индексом контрольных сумм по мере ее
+    чтения при декодировании, поэтому секция читается один раз. Объект
+    передается вместо файла архива: чтение и позиционирование
+    передаются файлу, а байты, попадающие в секцию, добавляются в сумму
+    текущего блока. Первый поврежденный блок запоминается в damaged, и
+    читающий код проверяет его перед декодированием прочитанных данных.
+    """
+
+    def __init__(self,
+                 file: BinaryIO,
+                 start: int,
+                 size: int,
+                 block_size: int,
+                 digests: List[bytes],
+                 checksum: int) -> None:
+        """
+        Инициализирует проверку секции.
+
+        :param file: Файловый объект архива.
+        :param start: Смещение секции данных в файле.
+        :param size: Длина секции данных.
+        :param block_size: Размер блока из индекса.
+        :param digests: Контрольные суммы блоков из индекса.
+        :param checksum: Флаг алгоритма хеша из заголовка архива.
+        """
+        self.file: BinaryIO = file
+        self.start: int = start
+        self.end: int = start + size
+        self.block_size: int = block_size
+        self.digests: List[bytes] = digests
+        self.checksum: int = checksum
+        self.damaged: Optional[Tuple[int, int]] = None
+        self._position: int = start
+        self._hasher = create_hasher(checksum)
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Читает данные с текущей позиции файла и проверяет их часть,
+        попадающую в секцию.
+
+        :param size: Количество байт. По умолчанию -1 (до конца файла).
+        :return: Прочитанные данные.
+        """
+        position = self.file.tell()
+        data = self.file.read(size)
+        self.update(data, position)
+        return data
+
+    def update(self, data: bytes, position: int) -> None:
+        """
+        Добавляет в суммы блоков еще не проверенную часть данных секции.
+        Секция проверяется подряд, поэтому уже проверенные байты
+        пропускаются, а байты после пропуска не учитываются.
+
+        :param data: Данные, прочитанные из файла.
+        :param position: Смещение данных в файле.
+        """
+        low = max(self._position, position)
+        high = min(position + len(data), self.end)
+        if low >= high or position > self._position:
+            return
+        view = memoryview(data)[low - position:high - position]
+        while view:
+            offset = self._position - self.start
+            index = offset // self.block_size
+            block_end = min((index + 1) * self.block_size,
+                            self.end - self.start)
+            part = view[:block_end - offset]
+            self._hasher.hash(bytes(part))
+            self._position += len(part)
+            view = view[len(part):]
+            if self._position - self.start == block_end:
+                digest = self._hasher.get_hash()
+                self._hasher = create_hasher(self.checksum)
+                if (digest != self.digests[index] and
+                        self.damaged is None):
+                    self.damaged = (self.start + index * self.block_size,
+                                    self.start + block_end)
+
+    def find_damage(self, end: int) -> Optional[int]:
+        """
+        Проверяет, начинается ли поврежденный блок до заданной позиции
+        секции, то есть попал ли он в уже прочитанные данные.
+
+        :param end: Позиция в секции, до которой данные прочитаны.
+        :return: Позиция начала поврежденного блока в секции или None.
+        """
+        if self.damaged is None or self.damaged[0] - self.start >= end:
+            return None
+        return self.damaged[0] - self.start
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """
+        Перемещает позицию в файле.
+        """
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        """
+        Возвращает текущую позицию в файле.
+        """
+        return self.file.tell()
+
+    def fileno(self) -> int:
+        """
+        Возвращает дескриптор файла.
+        """
+        return self.file.fileno()
@@ -0,0 +1,59 @@
+import heapq
+from typing import Dict, List, Tuple, Union
+
+from huffman_method.canonical import Symbol
+
+PackageNode = Union[int, Tuple['PackageNode', 'PackageNode']]
+"""
+Элемент алгоритма package-merge: индекс символа или пакет из двух элементов.
+"""
+
+
+def package_merge(frequency: Dict[Symbol, int],
+                  max_length: int) -> Dict[Symbol, int]:
+    """
+    Вычисляет оптимальные длины префиксных кодов, не превышающие
+    max_length, алгоритмом package-merge.
+
+    :param frequency: Словарь частот символов.
+    :param max_length: Максимальная длина кода.
+    :return: Словарь длин кодов символов.
+    :raises ValueError: Если символов больше, чем 2 ** max_length.
+    """
+    symbols = sorted(frequency, key=lambda char: frequency[char])
+    if len(symbols) > 1 << max_length:
+        raise ValueError(f'{len(symbols)} символов не помещаются в коды '
+                         f'длины {max_length}')
+    if len(symbols) == 1:
+        return {symbols[0]: 1}
+
+    leaves: List[Tuple[int, PackageNode]] = [
+        (frequency[char], index) for index, char in enumerate(symbols)]
+    items = leaves
+    for _ in range(max_length - 1):
+        packages = [(items[i][0] + items[i + 1][0],
+                     (items[i][1], items[i + 1][1]))
+                    for i in range(0, len(items) - 1, 2)]
+        items = list(heapq.merge(leaves, packages,
+                                 key=lambda item: item[0]))
+
+    lengths = [0] * len(symbols)
+    stack = [node for _, node in items[:2 * len(symbols) - 2]]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, int):
+            lengths[node] += 1
+        else:
+            stack.extend(node)
+    return {char: lengths[index] for index, char in enumerate(symbols)}
+
+
+def code_cost(frequency: Dict[Symbol, int], lengths: Dict[Symbol, int]) -> int:
+    """
+    Вычисляет размер закодированных данных в битах.
+
+    :param frequency: Словарь частот символов.
+    :param lengths: Словарь длин кодов символов.
+    :return: Количество бит.
+    """
+    return sum(count * lengths[char] for char, count in frequency.items())
@@ -0,0 +1,454 @@
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+NUMPY_AVAILABLE: bool = np is not None
+"""
+Признак того, что NumPy установлен и векторный бэкенд доступен.
+"""
+
+MAX_ENCODE_LENGTH: int = 57
+"""
+Максимальная длина кода для векторного кодирования (коды хранятся в uint64).
+"""
+
+MAX_DECODE_LENGTH: int = 16
+"""
+Максимальная длина кода для векторного декодирования: таблица окна
+содержит 2 ** длина записей.
+"""
+
+SEGMENT_BITS: int = 2048
+"""
+Размер сегмента (в битах), декодируемого векторным декодером в одном
+столбце.
+"""
+
+OVERLAP_BITS: int = 512
+"""
+Запас (в битах), на который каждый сегмент декодируется после своего
+конца, чтобы найти точку синхронизации со следующим сегментом.
+"""
+
+HISTOGRAM_MIN_SIZE: int = 1 << 12
+"""
+Минимальный размер блока (в байтах), для которого частоты байтов
+выгоднее считать через np.bincount, чем через Counter.
+"""
+
+BATCH_SIZE: int = 1 << 16
+"""
+Минимальный объем данных (в байтах), обрабатываемый одним векторным
+вызовом кодировщика. Меньшие порции накапливаются.
+"""
+
+DECODE_BATCH_SIZE: int = 1 << 20
+"""
+Минимальный объем сжатых данных (в байтах), обрабатываемый одним
+векторным вызовом декодера. Декодер делает шаг на каждый код сегмента,
+поэтому выгоднее обрабатывать большие порции сразу.
+"""
+
+
+def numpy_can_encode(codes: Dict[int, str], codec: Optional[str]) -> bool:
+    """
+    Проверяет, может ли векторный кодировщик работать с данными кодами.
+
+    :param codes: Словарь кодов символов.
+    :param codec: Кодек данных.
+    :return: True, если векторный кодировщик применим.
+    """
+    return (NUMPY_AVAILABLE and codec is None and bool(codes) and
+            max(len(code) for code in codes.values()) <= MAX_ENCODE_LENGTH)
+
+
+def numpy_can_decode(codes: Dict[int, str], codec: Optional[str]) -> bool:
+    """
+    Проверяет, может ли векторный декодер работать с данными кодами.
+
+    :param codes: Словарь кодов символов.
+    :param codec: Кодек данных.
+    :return: True, если векторный декодер применим.
+    """
+    return (NUMPY_AVAILABLE and codec is None and bool(codes) and
+            max(len(code) for code in codes.values()) <= MAX_DECODE_LENGTH)
+
+
+def byte_histogram(block: bytes) -> List[int]:
+    """
+    Считает количество каждого значения байта в блоке за один
+    векторный проход.
+
+    :param block: Блок данных.
+    :return: Список из 256 частот.
+    """
+    return np.bincount(np.frombuffer(block, dtype=np.uint8),
+                       minlength=256).tolist()
+
+
+class NumpyEncoder:
+    """
+    Векторный кодировщик Хаффмана для бинарного режима.
+
+    Длины и коды собираются для всего блока сразу, позиции бит вычисляются
+    накопленной суммой длин, а биты упаковываются np.packbits. Выходной
+    поток совпадает с потоком BitEncoder.
+    """
+
+    def __init__(self, codes: Dict[int, str]) -> None:
+        """
+        Инициализирует кодировщик по кодам символов.
+
+        :param codes: Словарь кодов байтов ('0'/'1' строки).
+        """
+        self._lengths = np.zeros(256, dtype=np.int64)
+        self._codes = np.zeros(256, dtype=np.uint64)
+        for char, code in codes.items():
+            self._lengths[char] = len(code)
+            self._codes[char] = int(code, 2)
+
+        self._pending_bits = np.zeros(0, dtype=np.uint8)
+        self._pending_data: List[bytes] = []
+        self._pending_size: int = 0
+        self._counted: int = 0
+        self._counted_bits: int = 0
+        self.bits_written: int = 0
+
+    @property
+    def bit_position(self) -> int:
+        """
+        Количество бит, закодированных с начала потока, включая
+        накопленные, но еще не закодированные блоки. Длины кодов
+        накопленных блоков считаются один раз.
+        """
+        fresh = self._pending_data[self._counted:]
+        if fresh:
+            symbols = np.frombuffer(b''.join(fresh), dtype=np.uint8)
+            self._counted_bits += int(self._lengths[symbols].sum())
+            self._counted = len(self._pending_data)
+        return (self.bits_written + len(self._pending_bits) +
+                self._counted_bits)
+
+    def encode(self, block: bytes) -> bytes:
+        """
+        Кодирует блок данных. Небольшие блоки накапливаются до BATCH_SIZE.
+
+        :param block: Блок данных для кодирования.
+        :return: Закодированные полные байты.
+        """
+        self._pending_data.append(block)
+        self._pending_size += len(block)
+        if self._pending_size < BATCH_SIZE:
+            return b''
+        return self._encode_pending()
+
+    def _encode_pending(self) -> bytes:
+        """
+        Кодирует накопленные блоки одним векторным проходом.
+
+        :return: Закодированные полные байты.
+        """
+        data = b''.join(self._pending_data)
+        self._pending_data = []
+        self._pending_size = 0
+        self._counted = 0
+        self._counted_bits = 0
+        if not data:
+            return b''
+
+        symbols = np.frombuffer(data, dtype=np.uint8)
+        lengths = self._lengths[symbols]
+        if not lengths.all():
+            raise ValueError('Символ отсутствует в дереве Хаффмана')
+        ends = np.cumsum(lengths)
+        total = int(ends[-1])
+
+        codes = np.repeat(self._codes[symbols], lengths)
+        shifts = (np.repeat(ends, lengths) - 1 -
+                  np.arange(total, dtype=np.int64)).astype(np.uint64)
+        bits = ((codes >> shifts) & np.uint64(1)).astype(np.uint8)
+        del codes, shifts
+
+        if len(self._pending_bits):
+            bits = np.concatenate((self._pending_bits, bits))
+        full = len(bits) - len(bits) % 8
+        self._pending_bits = bits[full:].copy()
+        self.bits_written += full
+        return np.packbits(bits[:full]).tobytes()
+
+    def flush(self) -> bytes:
+        """
+        Завершает поток так же, как BitEncoder.flush.
+
+        :return: Закодированный остаток, последний байт и байт с количеством
+                дополненных бит.
+        """
+        out = self._encode_pending()
+        tail = self._pending_bits
+        self._pending_bits = np.zeros(0, dtype=np.uint8)
+        self.bits_written += len(tail)
+        if not len(tail):
+            return out + bytes([0])
+        count = 8 - len(tail)
+        return out + np.packbits(tail).tobytes() + bytes([count])
+
+
+class NumpyDecoder:
+    """
+    Векторный декодер Хаффмана для бинарного режима.
+
+    Поток бит делится на сегменты по SEGMENT_BITS бит, и все сегменты
+    декодируются одновременно, шаг за шагом по одному символу через таблицу
+    окна фиксированной ширины. Декодирование сегмента начинается с его
+    первого бита наугад, поэтому затем цепочка каждого сегмента
+    согласуется с концом предыдущего: коды Хаффмана самосинхронизируются,
+    и обычно достаточно заново прочитать несколько символов.
+    """
+
+    def __init__(self, codes: Dict[int, str]) -> None:
+        """
+        Инициализирует декодер по кодам символов.
+
+        :param codes: Словарь кодов байтов ('0'/'1' строки).
+        """
+        self.width: int = max(len(code) for code in codes.values())
+        size = 1 << self.width
+        self._symbols = np.zeros(size, dtype=np.uint8)
+        self._lengths = np.zeros(size, dtype=np.int32)
+        for char, code in codes.items():
+            shift = self.width - len(code)
+            start = int(code, 2) << shift
+            end = start + (1 << shift)
+            self._symbols[start:end] = char
+            self._lengths[start:end] = len(code)
+        self._length_list: List[int] = self._lengths.tolist()
+
+        self._pending: bytes = b''
+        self._offset: int = 0
+        self._pending_data: List[bytes] = []
+        self._pending_size: int = 0
+
+    def reset(self, skip: int = 0) -> None:
+        """
+        Сбрасывает накопленные, но еще не декодированные данные.
+
+        :param skip: Количество старших бит первого байта следующей
+              порции, которые нужно пропустить (0-7).
+        """
+        self._pending = b''
+        self._offset = skip
+        self._pending_data = []
+        self._pending_size = 0
+
+    def decode(self, data: bytes, padding: int = -1) -> bytes:
+        """
+        Декодирует очередную порцию сжатых данных.
+
+        :param data: Сжатые байты.
+        :param padding: Количество нулевых бит дополнения в конце потока.
+              Значение -1 означает, что поток еще не закончен.
+        :return: Декодированные данные.
+        :raises ValueError: Если данные содержат недопустимый код.
+        """
+        self._pending_data.append(data)
+        self._pending_size += len(data)
+        if padding < 0 and self._pending_size < DECODE_BATCH_SIZE:
+            return b''
+
+        raw = self._pending + b''.join(self._pending_data)
+        self._pending_data = []
+        self._pending_size = 0
+        total = 8 * len(raw) - max(padding, 0)
+
+        decoded, stop = self._decode_bits(raw, self._offset, total)
+        if padding < 0:
+            self._pending = raw[stop >> 3:]
+            self._offset = stop & 7
+        else:
+            self._pending = b''
+            self._offset = 0
+        return decoded
+
+    def _decode_bits(self,
+                     raw: bytes,
+                     start: int,
+                     total: int) -> Tuple[bytes, int]:
+        """
+        Декодирует все полные коды в битах [start, total) буфера.
+
+        :param raw: Буфер сжатых данных.
+        :param start: Позиция первого бита первого кода.
+        :param total: Количество значимых бит в буфере.
+        :return: Кортеж из декодированных байтов и позиции первого
+                недекодированного бита.
+        :raises ValueError: Если встречен недопустимый код.
+        """
+        if start >= total:
+            return b'', start
+
+        index = np.int32 if total + OVERLAP_BITS < 1 << 31 else np.int64
+        data = np.frombuffer(raw + bytes(4), dtype=np.uint8)
+        words = ((data[:-2].astype(index) << 16) |
+                 (data[1:-1].astype(index) << 8) |
+                 data[2:].astype(index))
+
+        count = -(-total // SEGMENT_BITS)
+        ends = np.minimum(
+            np.arange(1, count + 1, dtype=index) * SEGMENT_BITS, total)
+        positions = np.arange(count, dtype=index) * SEGMENT_BITS
+        positions[0] = start
+        limits = np.minimum(ends + OVERLAP_BITS, total)
+        matrix, exits = self._lockstep(words, positions, limits)
+        chain = self._synchronize(matrix, exits, ends, raw, start, total)
+
+        window = self._windows(words, chain)
+        lengths = self._lengths[window]
+        complete = (lengths > 0) & (chain + lengths <= total)
+        stop = total
+        if not complete.all():
+            first = int(np.argmin(complete))
+            stop = int(chain[first])
+            if lengths[first] == 0 and stop + self.width <= total:
+                raise ValueError('Файл поврежден [Недопустимый код '
+                                 'Хаффмана]')
+            chain = chain[:first]
+            window = window[:first]
+        elif len(chain):
+            stop = int(chain[-1] + lengths[-1])
+        return self._symbols[window].tobytes(), stop
+
+    def _windows(self,
+                 words: 'np.ndarray',
+                 positions: 'np.ndarray') -> 'np.ndarray':
+        """
+        Читает окна ширины self.width, начинающиеся с данных позиций бит.
+
+        :param words: 24-битные слова, начинающиеся с каждого байта.
+        :param positions: Позиции бит.
+        :return: Значения окон.
+        """
+        shift = 24 - self.width
+        mask = (1 << self.width) - 1
+        return (words[positions >> 3] >> (shift - (positions & 7))) & mask
+
+    def _lockstep(self,
+                  words: 'np.ndarray',
+                  positions: 'np.ndarray',
+                  limits: 'np.ndarray') -> Tuple['np.ndarray', 'np.ndarray']:
+        """
+        Декодирует все сегменты одновременно, по одному коду за шаг.
+
+        :param words: 24-битные слова, начинающиеся с каждого байта.
+        :param positions: Начальные позиции сегментов.
+        :param limits: Позиции, на которых декодирование сегментов
+              останавливается.
+        :return: Кортеж из матрицы позиций кодов (строка на сегмент,
+                -1 для пустых ячеек) и позиций остановки сегментов
+                (-1, если сегмент остановился на недопустимом коде).
+        """
+        positions = positions.copy()
+        active = positions < limits
+        rows = []
+        while active.any():
+            rows.append(np.where(active, positions, -1))
+            lengths = self._lengths[self._windows(words, positions)]
+            lengths *= active
+            positions += lengths
+            active = (lengths > 0) & (positions < limits)
+        if not rows:
+            rows.append(np.full(len(positions), -1, dtype=positions.dtype))
+        matrix = np.stack(rows, axis=1)
+        exits = np.where(positions >= limits, positions, -1)
+        return matrix, exits
+
+    def _synchronize(self,
+                     matrix: 'np.ndarray',
+                     exits: 'np.ndarray',
+                     ends: 'np.ndarray',
+                     raw: bytes,
+                     start: int,
+                     total: int) -> 'np.ndarray':
+        """
+        Собирает настоящую цепочку позиций кодов из цепочек сегментов.
+
+        Каждый сегмент декодируется с запасом OVERLAP_BITS бит после своего
+        конца. Первая позиция из этого запаса, совпавшая с позицией из
+        цепочки следующего сегмента, является точкой синхронизации:
+        дальше цепочки совпадают. Если совпадения нет, коды читаются
+        заново по одному до совпадения.
+
+        :param matrix: Позиции кодов по сегментам.
+        :param exits: Позиции остановки сегментов.
+        :param ends: Конечные позиции сегментов.
+        :param raw: Буфер сжатых данных.
+        :param start: Позиция первого бита первого кода.
+        :param total: Количество значимых бит в буфере.
+        :return: Позиции начала всех кодов потока.
+        """
+        count = len(ends)
+        valid = matrix >= 0
+        own = valid & (matrix < ends[:, None])
+        marked = np.zeros(total, dtype=bool)
+        marked[matrix[own]] = True
+        overlap = valid & ~own
+        hits = overlap & marked[np.where(overlap, matrix, 0)]
+        merges = np.where(hits.any(axis=1),
+                          matrix[np.arange(count), hits.argmax(axis=1)], -1)
+
+        merge_list = merges.tolist()
+        exit_list = exits.tolist()
+        end_list = ends.tolist()
+        own_counts = own.sum(axis=1)
+        lower = [total] * count
+        upper = [0] * count
+
+        lengths = self._length_list
+        shift = 24 - self.width
+        mask = (1 << self.width) - 1
+        raw = raw + bytes(4)
+        walked: List[int] = []
+        position = start
+        segment = 0
+        while segment < count:
+            lower[segment] = position
+            if merge_list[segment] >= 0:
+                position = upper[segment] = merge_list[segment]
+                segment += 1
+                continue
+            upper[segment] = total
+            position = exit_list[segment]
+            if position < 0:
+                break
+
+            segment += 1
+            while segment < count and position < total:
+                if position >= end_list[segment]:
+                    segment += 1
+                    continue
+                row = matrix[segment, :own_counts[segment]].tolist()
+                index = bisect_left(row, position)
+                if index < len(row) and row[index] == position:
+                    break
+                walked.append(position)
+                byte = position >> 3
+                word = (raw[byte] << 16) | (raw[byte + 1] << 8) | \
+                    raw[byte + 2]
+                length = lengths[(word >> (shift - (position & 7))) & mask]
+                if not length:
+                    position = total
+                    break
+                position += length
+            if position >= total:
+                break
+
+        chosen = (valid & (matrix >= np.array(lower)[:, None]) &
+                  (matrix < np.array(upper)[:, None]))
+        chain = matrix[chosen]
+        if walked:
+            extra = np.array(walked, dtype=chain.dtype)
+            chain = np.insert(chain, np.searchsorted(chain, extra), extra)
+        return chain
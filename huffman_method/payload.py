@@ -0,0 +1,111 @@
+from typing import BinaryIO
+
+from encryption.coding import AESCTR
+
+
+class EncryptedWriter:
+    """
+    Записывает секцию данных файла, шифруя ее шифром AES в режиме CTR.
+    Позиция в ключевом потоке отсчитывается от начала секции, поэтому
+    данные можно записывать порциями любого размера.
+    """
+
+    def __init__(self, file: BinaryIO, cipher: AESCTR, start: int) -> None:
+        """
+        Инициализирует объект записи.
+
+        :param file: Выходной файл архива.
+        :param cipher: Шифр секции.
+        :param start: Смещение начала секции в файле.
+        """
+        self.file: BinaryIO = file
+        self.cipher: AESCTR = cipher
+        self.start: int = start
+
+    def write(self, data: bytes) -> int:
+        """
+        Шифрует данные и записывает их в текущую позицию файла.
+
+        :param data: Данные секции.
+        :return: Количество записанных байт.
+        """
+        offset = self.file.tell() - self.start
+        return self.file.write(self.cipher.crypt(data, offset))
+
+    def tell(self) -> int:
+        """
+        Возвращает текущую позицию в файле.
+        """
+        return self.file.tell()
+
+
+class DecryptedReader:
+    """
+    Читает архив, расшифровывая байты, которые попадают в секцию данных
+    файла, зашифрованную EncryptedWriter. Байты вне секции возвращаются
+    без изменений, а позиционирование передается файлу, поэтому объект
+    можно передавать вместо файла архива, в том числе для чтения
+    фрагментов с произвольной позиции.
+    """
+
+    def __init__(self,
+                 file: BinaryIO,
+                 cipher: AESCTR,
+                 start: int,
+                 end: int) -> None:
+        """
+        Инициализирует объект чтения.
+
+        :param file: Файловый объект архива.
+        :param cipher: Шифр секции.
+        :param start: Смещение начала секции в файле.
+        :param end: Смещение конца секции в файле.
+        """
+        self.file: BinaryIO = file
+        self.cipher: AESCTR = cipher
+        self.start: int = start
+        self.end: int = end
+
+    def read(self, size: int = -1) -> bytes:
+        """
+        Читает данные с текущей позиции файла.
+
+        :param size: Количество байт. По умолчанию -1 (до конца файла).
+        :return: Прочитанные данные, расшифрованные внутри секции.
+        """
+        position = self.file.tell()
+        data = self.file.read(size)
+        return self.decrypt(data, position)
+
+    def decrypt(self, data: bytes, position: int) -> bytes:
+        """
+        Расшифровывает часть данных, попадающую в секцию.
+
+        :param data: Данные, прочитанные из файла.
+        :param position: Смещение данных в файле.
+        :return: Данные с расшифрованной частью секции.
+        """
+        low = max(position, self.start) - position
+        high = min(position + len(data), self.end) - position
+        if low >= high:
+            return data
+        plain = self.cipher.crypt(data[low:high], position + low - self.start)
+        return data[:low] + plain + data[high:]
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """
+        Перемещает позицию в файле.
+        """
+        return self.file.seek(offset, whence)
+
+    def tell(self) -> int:
+        """
+        Возвращает текущую позицию в файле.
+        """
+        return self.file.tell()
+
+    def fileno(self) -> int:
+        """
+        Возвращает дескриптор файла.
+        """
+        return self.file.fileno()
@@ -0,0 +1,274 @@
+import io
+import os
+from typing import Generator, Iterator, List, Optional, Tuple, Union
+
+from huffman_method.adaptive import AdaptiveDecoder
+from huffman_method.blocks import decode_block_with_table
+from huffman_method.credentials import CredentialProvider
+from huffman_method.decoder import create_decoder
+from huffman_method.decompress import DATA_CHUNK_SIZE, Decompressor
+from huffman_method.directory import DirectoryEntry
+from progress_bar import ProgressBar
+
+
+class EntryStream(io.RawIOBase):
+    """
+    Поток декодированных данных одного файла архива.
+
+    Данные декодируются по мере чтения порциями не больше
+    DATA_CHUNK_SIZE сжатых байт (в режиме блочных таблиц - по одному
+    блоку), поэтому расход памяти не зависит от размера файла. Когда
+    поток доходит до конца, хеш файла сверяется с записанным в архиве.
+    Если в архиве есть контрольные суммы блоков, сжатые данные
+    сверяются с ними по мере чтения.
+    В текстовом режиме поток возвращает данные в кодировке архива.
+    """
+
+    def __init__(self,
+                 decompressor: Decompressor,
+                 entry: DirectoryEntry) -> None:
+        """
+        Открывает архив, читает заголовок файла и готовит декодер. Для
+        защищенного файла пароль запрашивается здесь, до первого чтения.
+
+        :param decompressor: Распаковщик с прочитанным заголовком архива.
+        :param entry: Запись файла в центральном каталоге.
+        :raises ValueError: Если пароль не введен или заголовок файла
+               поврежден.
+        """
+        super().__init__()
+        self.entry: DirectoryEntry = entry
+        self._decompressor: Decompressor = decompressor
+        self._file = open(decompressor.archive_path, 'rb')
+        self._pending: bytes = b''
+        self._offset: int = 0
+        try:
+            self._file.seek(entry.offset + 2)
+            (out_dir, buffer, self._hasher, _,
+             hash_pass, self._cipher) = \
+                decompressor.decompress_common_actions(self._file)
+            if out_dir is None:
+                raise ValueError(f'Нет доступа к файлу [{entry.path}]')
+            self._chunks: Iterator[bytes] = self._decode(buffer, hash_pass)
+        except Exception:
+            self._file.close()
+            raise
+
+    def readable(self) -> bool:
+        """
+        Поток доступен для чтения.
+        """
+        return True
+
+    def readinto(self, buffer: Union[bytearray, memoryview]) -> int:
+        """
+        Заполняет буфер очередными декодированными байтами.
+
+        :param buffer: Буфер для данных.
+        :return: Количество записанных байт, 0 в конце файла.
+        :raises ValueError: Если файл поврежден или поток закрыт.
+        """
+        if self.closed:
+            raise ValueError('Поток закрыт')
+        while self._offset == len(self._pending):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._pending = chunk
+            self._offset = 0
+        size = min(len(buffer), len(self._pending) - self._offset)
+        buffer[:size] = self._pending[self._offset:self._offset + size]
+        self._offset += size
+        return size
+
+    def close(self) -> None:
+        """
+        Закрывает поток и файл архива.
+        """
+        if not self.closed:
+            self._file.close()
+        super().close()
+
+    def _decode(self, buffer: bytes,
+                hash_pass: Optional[bytes]) -> Iterator[bytes]:
+        """
+        Декодирует данные файла порциями, а в конце сверяет хеш файла.
+
+        :param buffer: Буфер данных после пути файла.
+        :param hash_pass: Ключ защищенного файла или None.
+        :return: Итератор декодированных порций.
+        :raises ValueError: Если данные или хеш файла не совпадают.
+        """
+        if self.entry.not_empty and self._decompressor.block_tables:
+            buffer = yield from self._decode_blocks(buffer, hash_pass)
+        elif self.entry.not_empty:
+            buffer = yield from self._decode_sized(buffer, hash_pass)
+
+        digest, buffer = self._decompressor.read_exact(self._file, buffer,
+                                                       16)
+        if digest != self._hasher.get_hash():
+            raise ValueError(f'Файл [{self.entry.path}] поврежден!')
+
+    def _decode_sized(self, buffer: bytes,
+                      hash_pass: Optional[bytes]
+                      ) -> Generator[bytes, None, bytes]:
+        """
+        Декодирует секцию данных статического или адаптивного кода
+        порциями по DATA_CHUNK_SIZE сжатых байт.
+
+        :param buffer: Буфер данных после пути файла.
+        :param hash_pass: Ключ защищенного файла или None.
+        :return: Генератор декодированных порций, возвращающий
+                оставшийся буфер.
+        :raises ValueError: Если данные повреждены.
+        """
+        decompressor = self._decompressor
+        file = self._file
+        if decompressor.adaptive:
+            decoder = AdaptiveDecoder()
+        else:
+            tree, buffer = decompressor.get_tree(file, self._hasher,
+                                                 hash_pass, buffer)
+            decoder = create_decoder(tree)
+
+        size, buffer = decompressor.read_data_length(file, buffer)
+        if not size:
+            raise ValueError('Файл поврежден [Пустая секция данных]')
+        payload, verifier = decompressor.open_verified(file, buffer, size)
+        payload, buffer = decompressor.open_payload(payload, buffer, size,
+                                                    self._cipher)
+        position = decoded = 0
+        while size:
+            step = min(size, DATA_CHUNK_SIZE)
+            encoded_data, buffer = decompressor.read_exact(payload, buffer,
+                                                           step)
+            size -= step
+            decompressor.check_chunk(verifier, decoder, encoded_data,
+                                     position, decoded)
+            position += step
+            if size:
+                decoded_data = decoder.decode(encoded_data, -1)
+            else:
+                decoded_data = decoder.decode(encoded_data[:-1],
+                                              encoded_data[-1])
+            decoded += len(decoded_data)
+            data = self._to_bytes(decoded_data)
+            self._hasher.hash(data)
+            yield data
+
+        _, buffer = decompressor.read_block_checksums(file, buffer)
+        _, buffer = decompressor.read_checkpoints(file, buffer)
+        return buffer
+
+    def _decode_blocks(self, buffer: bytes,
+                       hash_pass: Optional[bytes]
+                       ) -> Generator[bytes, None, bytes]:
+        """
+        Декодирует блоки файла, записанные Compressor.write_blocks,
+        по одному.
+
+        :param buffer: Буфер данных после пути файла.
+        :param hash_pass: Ключ для зашифрованных таблиц или None.
+        :return: Генератор декодированных блоков, возвращающий
+                оставшийся буфер.
+        :raises ValueError: Если блоки повреждены.
+        """
+        decompressor = self._decompressor
+        size, buffer = decompressor.read_data_length(self._file, buffer)
+        payload, verifier = decompressor.open_verified(self._file, buffer,
+                                                       size)
+        payload, buffer = decompressor.open_payload(payload, buffer, size,
+                                                    self._cipher)
+        marks: List[Tuple[int, int]] = []
+        decoded = 0
+        table = None
+        while True:
+            (new_table, table, length,
+             encoded_data, buffer) = decompressor.read_verified_block(
+                payload, buffer, table, hash_pass, verifier, marks, decoded)
+            if table is None:
+                _, buffer = decompressor.read_block_checksums(self._file,
+                                                              buffer)
+                return buffer
+            if new_table is not None:
+                self._hasher.hash(new_table)
+            decoded_data = decode_block_with_table(table, decompressor.codec,
+                                                   encoded_data)
+            if len(decoded_data) != length:
+                raise ValueError('Файл поврежден [Неверный размер блока]')
+            decoded += length
+            data = self._to_bytes(decoded_data)
+            self._hasher.hash(data)
+            yield data
+
+    def _to_bytes(self, data: Union[bytes, str]) -> bytes:
+        """
+        Приводит декодированные данные к байтам.
+
+        :param data: Декодированные данные.
+        :return: Байты данных.
+        """
+        if isinstance(data, bytes):
+            return data
+        return data.encode(self._decompressor.codec)
+
+
+class ArchiveReader:
+    """
+    Чтение файлов архива потоками без распаковки на диск.
+
+    При создании читаются только заголовок и центральный каталог архива;
+    каждый поток, возвращаемый open, открывает архив сам и декодирует
+    данные своего файла по мере чтения.
+    """
+
+    def __init__(self, archive_path: str,
+                 credentials: Optional[CredentialProvider] = None) -> None:
+        """
+        Открывает архив и загружает его каталог. Пароль защищенного файла
+        запрашивается у источника паролей при первом открытии файла и
+        запоминается для следующих.
+
+        :param archive_path: Путь к архиву.
+        :param credentials: Источник паролей защищенных файлов.
+              По умолчанию None (запрос пароля в терминале).
+        :raises ValueError: Если архив не найден, поврежден или имеет
+               версию 2, в которой длина данных файла неизвестна.
+        """
+        if not os.path.exists(archive_path):
+            raise ValueError(f'No search archive file [{archive_path}]')
+        self.archive_path: str = archive_path
+        self.decompressor: Decompressor = Decompressor(
+            credentials=credentials)
+        self.decompressor.progress_bar = ProgressBar(visible=False)
+        self.decompressor.archive_path = archive_path
+        with open(archive_path, 'rb') as file:
+            self.decompressor.check_magic_bytes(file)
+            self.decompressor.check_header(file)
+            if self.decompressor.version < 3:
+                raise ValueError('Потоковое чтение доступно только '
+                                 'в архиве версии 3')
+            self.entries: List[DirectoryEntry] = \
+                self.decompressor.load_directory(file)
+
+    def names(self) -> List[str]:
+        """
+        Возвращает пути файлов архива.
+
+        :return: Пути файлов в порядке архива.
+        """
+        return [entry.path for entry in self.entries if entry.is_file]
+
+    def open(self, name: str) -> EntryStream:
+        """
+        Открывает файл архива для потокового чтения.
+
+        :param name: Путь файла в архиве ('.' для архива одного файла).
+        :return: Поток декодированных данных файла.
+        :raises ValueError: Если файла нет в архиве или пароль не введен.
+        """
+        path = os.path.normpath(name)
+        for entry in self.entries:
+            if entry.is_file and entry.path == path:
+                return EntryStream(self.decompressor, entry)
+        raise ValueError(f'В архиве нет файла [{path}]')
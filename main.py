@@ -2,10 +2,11 @@ import argparse
 import time
 import os
 import getpass
-from typing import Dict
+from typing import Dict, List, Optional
 
-from encryption.hasher import MD5
-from huffman_method import Decompressor, Compressor
+from huffman_method import (CredentialProvider, Decompressor, Compressor,
+                            DirectoryEntry, EnvironmentProvider,
+                            PasswordFileProvider, derive_key)
 
 
 def calculate_percentage(size_path_in: int, size_archive: int) -> float:
@@ -23,7 +24,8 @@ def calculate_percentage(size_path_in: int, size_archive: int) -> float:
 
 def set_password(directory: str) -> Dict[str, bytes]:
     """
-    Устанавливает пароль для файлов.
+    Устанавливает пароль для файлов в диалоге с пользователем. Для
+    запуска без терминала см. collect_passwords.
 
     :param directory: Директория с файлами.
     :return: Словарь паролей для файлов.
@@ -50,7 +52,6 @@ def set_password(directory: str) -> Dict[str, bytes]:
         file_stat = os.stat(absolute_path_path)
         dir_stat = os.stat(absolute_path_dir)
         path_exists_and_belongs = file_stat.st_dev == dir_stat.st_dev
-        hasher = MD5()
         if path_exists_and_belongs:
             print('Придумайте пароль:')
             try:
@@ -72,8 +73,7 @@ def set_password(directory: str) -> Dict[str, bytes]:
                 if not password_accept:
                     break
                 if password == password_accept:
-                    hasher.hash(password.encode())
-                    passwords[path] = hasher.get_hash()
+                    passwords[path] = derive_key(password)
                     break
                 print('Ошибка. Пароли не совпадают')
         else:
@@ -81,6 +81,44 @@ def set_password(directory: str) -> Dict[str, bytes]:
     return passwords
 
 
+def collect_passwords(path_in: str,
+                      credentials: CredentialProvider) -> Dict[str, bytes]:
+    """
+    Устанавливает пароли файлов без диалога: ключ каждого файла берется
+    у источника паролей по пути файла относительно path_in ('.' для
+    одного файла). Файлы, для которых пароля нет, не защищаются.
+
+    :param path_in: Исходный путь файла или директории.
+    :param credentials: Источник паролей.
+    :return: Словарь ключей для файлов.
+    """
+    passwords = {}
+    _, all_files = Compressor.get_directory_info(path_in)
+    for path, item_type in all_files.items():
+        if item_type != 'file':
+            continue
+        key = credentials.get_key(os.path.relpath(path, path_in))
+        if key is not None:
+            passwords[path] = key
+    return passwords
+
+
+def get_credentials(args: argparse.Namespace
+                    ) -> Optional[CredentialProvider]:
+    """
+    Создает источник паролей из аргументов командной строки.
+
+    :param args: Аргументы командной строки.
+    :return: Источник паролей или None, если пароли вводятся вручную.
+    :raises ValueError: Если файл паролей не найден или поврежден.
+    """
+    if args.password_file is not None:
+        return PasswordFileProvider(args.password_file)
+    if args.password_env is not None:
+        return EnvironmentProvider(args.password_env)
+    return None
+
+
 def format_size(size_bytes: int) -> str:
     """
     Форматирует размер файла в удобный для чтения формат.
@@ -96,6 +134,53 @@ def format_size(size_bytes: int) -> str:
     return "{:.2f} {}".format(size_bytes, size_units[i])
 
 
+def format_listing(archive_path: str,
+                   entries: List[DirectoryEntry]) -> List[str]:
+    """
+    Форматирует содержимое архива в таблицу: тип, исходный и сжатый
+    размеры, процент сжатия, защита паролем и путь элемента.
+
+    :param archive_path: Путь к архиву.
+    :param entries: Записи элементов архива.
+    :return: Строки таблицы с заголовком и итогом.
+    """
+    arch_name = os.path.splitext(os.path.basename(archive_path))[0]
+    row = '{:<5} {:>12} {:>12} {:>10} {:<6} {}'
+    lines = [row.format('Тип', 'Исходный', 'Сжатый', 'Сжатие', 'Пароль',
+                        'Путь')]
+    total_original = 0
+    total_compressed = 0
+    for entry in entries:
+        total_compressed += entry.compressed_size
+        if entry.original_size is None:
+            original = ratio = '-'
+            total_original = None
+        else:
+            original = format_size(entry.original_size)
+            percents = calculate_percentage(entry.original_size,
+                                            entry.compressed_size)
+            ratio = f'{round(percents, 2)} %'
+            if total_original is not None:
+                total_original += entry.original_size
+        path = arch_name if entry.path == '.' else entry.path
+        lines.append(row.format('файл' if entry.is_file else 'дир',
+                                original,
+                                format_size(entry.compressed_size),
+                                ratio,
+                                'да' if entry.protected else 'нет',
+                                path))
+
+    if total_original is None:
+        original = ratio = '-'
+    else:
+        original = format_size(total_original)
+        percents = calculate_percentage(total_original, total_compressed)
+        ratio = f'{round(percents, 2)} %'
+    lines.append(row.format('', original, format_size(total_compressed),
+                            ratio, '', f'Элементов: {len(entries)}'))
+    return lines
+
+
 def main() -> None:
     """
     Основная функция, выполняющая архивацию или разархивацию файлов.
@@ -113,6 +198,16 @@ def main() -> None:
         action='store_true',
         help='Операция распаковки'
     )
+    parser.add_argument(
+        '-l', '--list',
+        action='store_true',
+        help='Вывести содержимое архива без распаковки'
+    )
+    parser.add_argument(
+        '--test',
+        action='store_true',
+        help='Проверить целостность архива без записи файлов'
+    )
     parser.add_argument(
         '-b', '--bin',
         action='store_true',
@@ -128,25 +223,184 @@ def main() -> None:
         action='store_true',
         help='Установка защиты на файлы'
     )
+    parser.add_argument(
+        '-k', '--canonical',
+        action='store_true',
+        help='Хранить таблицу длин канонических кодов вместо дерева'
+    )
+    parser.add_argument(
+        '-m', '--max-code-length',
+        type=int,
+        default=None,
+        help='Максимальная длина кода Хаффмана в битах'
+    )
+    parser.add_argument(
+        '-a', '--adaptive',
+        action='store_true',
+        help='Адаптивный код Хаффмана: сжатие за один проход без дерева'
+    )
+    parser.add_argument(
+        '-s', '--sample',
+        type=int,
+        default=None,
+        help='Строить дерево по выборке указанного размера в MiB'
+    )
+    parser.add_argument(
+        '-B', '--block-tables',
+        type=int,
+        default=None,
+        help='Кодировать файлы блоками указанного размера в KiB '
+             'со своими таблицами кодов'
+    )
+    parser.add_argument(
+        '-g', '--shared-table',
+        action='store_true',
+        help='Кодировать все блоки файла одной общей таблицей'
+    )
+    parser.add_argument(
+        '-C', '--checkpoints',
+        type=int,
+        default=None,
+        help='Записывать контрольные точки через указанное количество KiB '
+             'данных файла для чтения его фрагментов'
+    )
+    parser.add_argument(
+        '-e', '--encrypt-payload',
+        action='store_true',
+        help='Шифровать все сжатые данные защищенных файлов (AES в режиме '
+             'CTR), а не только дерево'
+    )
+    parser.add_argument(
+        '--checksum',
+        choices=['md5', 'crc32', 'blake2b'],
+        default='md5',
+        help='Алгоритм контрольной суммы файлов архива'
+    )
+    parser.add_argument(
+        '-V', '--block-checksums',
+        type=int,
+        default=None,
+        help='Записывать контрольные суммы блоков сжатых данных указанного '
+             'размера в KiB для поиска повреждений до распаковки'
+    )
+    parser.add_argument(
+        '--password-file',
+        default=None,
+        metavar='FILE',
+        help='Брать пароли защищенных файлов из файла со строками '
+             '"шаблон = пароль" без запроса в терминале'
+    )
+    parser.add_argument(
+        '--password-env',
+        default=None,
+        metavar='VAR',
+        help='Брать пароль защищенных файлов из переменной окружения '
+             'без запроса в терминале'
+    )
+    parser.add_argument(
+        '-w', '--workers',
+        type=int,
+        default=1,
+        help='Количество процессов для параллельной обработки: файлов '
+             'директории, блоков файла с -B, элементов архива при '
+             'распаковке и проверке. Один файл без -B сжимается в одном '
+             'процессе'
+    )
+    parser.add_argument(
+        '-x', '--extract',
+        action='append',
+        default=None,
+        metavar='PATTERN',
+        help='Распаковать только элементы с указанным путем или '
+             'glob-шаблоном (можно указать несколько раз)'
+    )
     parser.add_argument(
         'input_path',
         help='Путь к файлу/директории'
     )
     parser.add_argument(
         'output_path',
+        nargs='?',
         help='Путь для сохранения архива/разархивированных данных'
     )
 
     args = parser.parse_args()
 
+    try:
+        credentials = get_credentials(args)
+    except ValueError as e:
+        print(f'\n{e.args[0]}')
+        return
+
+    if args.list:
+        try:
+            entries = Decompressor().list_entries(args.input_path)
+        except ValueError as e:
+            print(f'\n{e.args[0]}')
+            return
+        for line in format_listing(args.input_path, entries):
+            print(line)
+        return
+
+    if args.test:
+        try:
+            decompressor = Decompressor(workers=args.workers,
+                                        credentials=credentials)
+            result = decompressor.test(args.input_path, args.extract)
+        except ValueError as e:
+            print(f'\n{e.args[0]}')
+            return
+        if result:
+            print('\nАрхив не поврежден')
+        else:
+            print('\nАрхив поврежден')
+        return
+
+    if args.output_path is None:
+        parser.error('не указан output_path')
+
     if args.compress:
         method = '-b' if args.bin else '-t'
-        compressor = Compressor() if method == '-b' else Compressor('utf-8')
+        codec = None if method == '-b' else 'utf-8'
+        sample_size = None
+        if args.sample is not None:
+            sample_size = args.sample * 1024 * 1024
+        table_block_size = None
+        if args.block_tables is not None:
+            table_block_size = args.block_tables * 1024
+        checkpoint_size = None
+        if args.checkpoints is not None:
+            checkpoint_size = args.checkpoints * 1024
+        block_checksum_size = None
+        if args.block_checksums is not None:
+            block_checksum_size = args.block_checksums * 1024
+        try:
+            compressor = Compressor(codec,
+                                    canonical=args.canonical,
+                                    max_code_length=args.max_code_length,
+                                    adaptive=args.adaptive,
+                                    sample_size=sample_size,
+                                    table_block_size=table_block_size,
+                                    workers=args.workers,
+                                    shared_table=args.shared_table,
+                                    checkpoint_size=checkpoint_size,
+                                    encrypt_payload=args.encrypt_payload,
+                                    checksum=args.checksum,
+                                    block_checksum_size=block_checksum_size)
+        except ValueError as e:
+            print(f'\n{e.args[0]}')
+            return
         _input = args.input_path
         output = args.output_path
         protected_files = None
-        if args.protect:
+        if args.protect and credentials is not None:
+            protected_files = collect_passwords(_input, credentials)
+        elif args.protect:
             protected_files = set_password(_input)
+        if (args.workers > 1 and table_block_size is None and
+                os.path.isfile(_input)):
+            print('\nПредупреждение: один файл без блочных таблиц (-B) '
+                  'сжимается в одном процессе, -w не ускоряет сжатие')
         time1 = time.time()
 
         try:
@@ -163,11 +417,21 @@ def main() -> None:
         print(f'\nВремя сжатия: {round(time2 - time1, 2)} сек.')
         print(f'Разница в размере: {format_size(size_path - size_arch)}')
         print(f'Процент сжатия: {round(percents, 2)} %')
+        if args.max_code_length is not None:
+            loss = compressor.get_length_limit_loss()
+            print(f'Потеря сжатия из-за ограничения длины кодов: '
+                  f'{round(loss, 2)} %')
 
     elif args.decompress:
-        decompressor = Decompressor()
+        try:
+            decompressor = Decompressor(workers=args.workers,
+                                        credentials=credentials)
+        except ValueError as e:
+            print(f'\n{e.args[0]}')
+            return
         time1 = time.time()
-        if decompressor.decompress(args.input_path, args.output_path):
+        if decompressor.decompress(args.input_path, args.output_path,
+                                   args.extract):
             time2 = time.time()
             print(f'\nВремя разжатия: {time2 - time1} сек.')
             print('Успешное завершение')
@@ -3,15 +3,21 @@ class ProgressBar:
     Представляет индикатор прогресса в командной строке.
     """
 
-    def __init__(self, total: int = 0, length: int = 50) -> None:
+    def __init__(self,
+                 total: int = 0,
+                 length: int = 50,
+                 visible: bool = True) -> None:
         """
         Инициализирует объект класса ProgressBar.
 
         :param total: Общее количество для отслеживания прогресса.
         :param length: Длина индикатора прогресса.
+        :param visible: Выводить индикатор в командную строку.
+              По умолчанию True.
         """
         self.total: int = total
         self.length: int = length
+        self.visible: bool = visible
         self.progress: int = 0
 
     def update(self, progress: int) -> None:
@@ -47,6 +53,8 @@ class ProgressBar:
 
         :param percent: Процент выполнения операции.
         """
+        if not self.visible:
+            return
         arrow = '#' * int(self.length * percent)
         spaces = ' ' * (self.length - len(arrow))
         print('\r[{}{}] {:.2f}%'.format(arrow, spaces, percent * 100),
@@ -0,0 +1,75 @@
+import os
+import random
+import unittest
+
+from huffman_method import (AdaptiveDecoder, AdaptiveEncoder,
+                            AdaptiveHuffmanModel)
+
+
+def encode(data, step=97):
+    encoder = AdaptiveEncoder()
+    encoded = b''.join(encoder.encode(data[i:i + step])
+                       for i in range(0, len(data), step))
+    return encoded + encoder.flush()
+
+
+def decode(encoded, step=31):
+    decoder = AdaptiveDecoder()
+    body, padding = encoded[:-1], encoded[-1]
+    chunks = [body[i:i + step] for i in range(0, len(body), step)]
+    parts = [decoder.decode(chunk) for chunk in chunks[:-1]]
+    parts.append(decoder.decode(chunks[-1], padding))
+    return b''.join(parts)
+
+
+class TestAdaptiveHuffmanModel(unittest.TestCase):
+    def test_sibling_property(self):
+        random.seed(4)
+        model = AdaptiveHuffmanModel()
+        data = random.choices(range(40), weights=range(1, 41), k=3000)
+        for char in data:
+            model.update(char)
+        for node in range(model.nyt, model.root):
+            self.assertLessEqual(model.weight[node], model.weight[node + 1])
+            if model.left[node] >= 0:
+                self.assertEqual(model.weight[node],
+                                 model.weight[model.left[node]] +
+                                 model.weight[model.right[node]])
+        self.assertEqual(model.weight[model.root], len(data))
+
+    def test_new_symbol_code(self):
+        model = AdaptiveHuffmanModel()
+        self.assertEqual(model.code(65), (65, 8))
+        model.update(65)
+        self.assertEqual(model.code(65), (1, 1))
+        self.assertEqual(model.code(66), (66, 9))
+
+
+class TestAdaptiveCoding(unittest.TestCase):
+    def test_round_trip(self):
+        random.seed(5)
+        for count in (1, 2, 7, 256):
+            weights = [random.random() ** 4 + 0.001 for _ in range(count)]
+            data = bytes(random.choices(range(count), weights, k=2000))
+            self.assertEqual(decode(encode(data)), data)
+
+    def test_all_bytes(self):
+        data = bytes(range(256)) + os.urandom(1000)
+        self.assertEqual(decode(encode(data)), data)
+
+    def test_single_byte(self):
+        self.assertEqual(decode(encode(b'x')), b'x')
+
+    def test_compresses_skewed_data(self):
+        data = b'abracadabra' * 200
+        self.assertLess(len(encode(data)), len(data) // 3)
+
+    def test_truncated_stream(self):
+        encoded = encode(b'hello, world')
+        decoder = AdaptiveDecoder()
+        with self.assertRaises(ValueError):
+            decoder.decode(encoded[:3], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,33 @@
+import os
 import unittest
-from encryption.coding import aes_encrypt, aes_decrypt
+from encryption import coding
+from encryption.coding import (AES, AESCTR, Nr, add_round_key, aes_decrypt,
+                               aes_encrypt, bytes_to_matrix, expand_key,
+                               get_cipher, matrix_to_bytes, mix_columns,
+                               mix_columns_inv, shift_rows, shift_rows_inv,
+                               sub_bytes, sub_bytes_inv)
+
+
+def reference_encrypt(message, key):
+    state = bytes_to_matrix(message)
+    round_keys = expand_key(key)
+    state = add_round_key(state, round_keys[0])
+    for i in range(1, Nr):
+        state = mix_columns(shift_rows(sub_bytes(state)))
+        state = add_round_key(state, round_keys[i])
+    state = shift_rows(sub_bytes(state))
+    return matrix_to_bytes(add_round_key(state, round_keys[Nr]))
+
+
+def reference_decrypt(ciphertext, key):
+    state = bytes_to_matrix(ciphertext)
+    round_keys = expand_key(key)
+    state = add_round_key(state, round_keys[Nr])
+    for i in range(Nr - 1, 0, -1):
+        state = sub_bytes_inv(shift_rows_inv(state))
+        state = mix_columns_inv(add_round_key(state, round_keys[i]))
+    state = sub_bytes_inv(shift_rows_inv(state))
+    return matrix_to_bytes(add_round_key(state, round_keys[0]))
 
 
 class TestAES(unittest.TestCase):
@@ -27,6 +55,76 @@ class TestAES(unittest.TestCase):
 
         self.assertEqual(plaintext, decrypted)
 
+    def test_known_ciphertext(self):
+        encrypted = aes_encrypt(b'qwertyuiopasdfgh', b'l1ksh7cgqp,sjhd9')
+        self.assertEqual(encrypted.hex(), '1bb7e4c553ab9dce7d0a1489f11fad9e')
+
+    def test_matches_reference(self):
+        for _ in range(50):
+            key = os.urandom(16)
+            block = os.urandom(16)
+            cipher = AES(key)
+            self.assertEqual(cipher.encrypt_block(block),
+                             reference_encrypt(block, key))
+            self.assertEqual(cipher.decrypt_block(block),
+                             reference_decrypt(block, key))
+
+    def test_bulk_encrypt_decrypt(self):
+        key = os.urandom(16)
+        data = os.urandom(16 * 37)
+        cipher = get_cipher(key)
+        encrypted = cipher.encrypt(data)
+        self.assertEqual(encrypted,
+                         b''.join(aes_encrypt(data[i:i + 16], key)
+                                  for i in range(0, len(data), 16)))
+        self.assertEqual(cipher.decrypt(encrypted), data)
+        self.assertEqual(cipher.encrypt(b''), b'')
+
+    def test_cipher_cache(self):
+        key = os.urandom(16)
+        self.assertIs(get_cipher(key), get_cipher(key))
+        self.assertIsNot(get_cipher(key), get_cipher(os.urandom(16)))
+
+    def test_invalid_length(self):
+        cipher = get_cipher(b'AnotherSecretKey')
+        with self.assertRaises(ValueError):
+            cipher.encrypt(b'\x00' * 17)
+        with self.assertRaises(ValueError):
+            cipher.decrypt(b'\x00' * 15)
+        with self.assertRaises(ValueError):
+            AES(b'short')
+
+    def test_ctr_offsets(self):
+        key = os.urandom(16)
+        nonce = os.urandom(8)
+        data = os.urandom(10000)
+        encrypted = AESCTR(key, nonce).crypt(data)
+        self.assertNotEqual(encrypted, data)
+        counter = nonce + (3).to_bytes(8, byteorder='big')
+        self.assertEqual(bytes(a ^ b for a, b in zip(encrypted[48:64],
+                                                     aes_encrypt(counter,
+                                                                 key))),
+                         data[48:64])
+
+        cipher = AESCTR(key, nonce)
+        for offset, size in ((9000, 1000), (0, 1), (1, 15), (17, 4200),
+                             (5000, 3)):
+            self.assertEqual(cipher.crypt(encrypted[offset:offset + size],
+                                          offset),
+                             data[offset:offset + size])
+        self.assertEqual(cipher.crypt(b'', 5), b'')
+        with self.assertRaises(ValueError):
+            AESCTR(key, b'short')
+
+    @unittest.skipUnless(coding.np is not None, 'NumPy не установлен')
+    def test_vector_encrypt(self):
+        key = os.urandom(16)
+        data = os.urandom(coding.VECTOR_MIN_SIZE * 2)
+        cipher = AES(key)
+        self.assertEqual(cipher.encrypt(data),
+                         b''.join(cipher.encrypt_block(data[i:i + 16])
+                                  for i in range(0, len(data), 16)))
+
 
 if __name__ == '__main__':
     unittest.main()
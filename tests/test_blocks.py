@@ -0,0 +1,78 @@
+import pickle
+import unittest
+
+from huffman_method import (HuffmanTree, TableDecoder, build_block_tree,
+                            decode_block, decode_block_with_table,
+                            encode_block, encode_block_with_table,
+                            reuse_saves_bits)
+
+
+def make_tree(block, codec=None):
+    tree = HuffmanTree(codec)
+    tree.add_block(block)
+    tree.build_tree()
+    tree.canonize()
+    return tree
+
+
+class TestBlocks(unittest.TestCase):
+    def test_reuse_without_previous(self):
+        tree = make_tree(b'abcabc')
+        self.assertFalse(reuse_saves_bits(tree, 10, None))
+
+    def test_reuse_similar_block(self):
+        previous = make_tree(b'aaaabbc' * 100)
+        tree = make_tree(b'aaabbbc' * 100)
+        self.assertTrue(reuse_saves_bits(tree, 10, previous))
+
+    def test_no_reuse_for_missing_symbol(self):
+        previous = make_tree(b'aaaabbc' * 100)
+        tree = make_tree(b'aaaabbcd' * 100)
+        self.assertFalse(reuse_saves_bits(tree, 10, previous))
+
+    def test_no_reuse_for_different_distribution(self):
+        previous = make_tree(b'a' * 1000 + b'bcdefgh')
+        tree = make_tree(b'h' * 1000 + b'abcdefg')
+        self.assertFalse(reuse_saves_bits(tree, 10, previous))
+
+    def test_block_round_trip(self):
+        for block, codec in ((b'abracadabra' * 30, None),
+                             ('абракадабра' * 30, 'utf-8'),
+                             (b'zzz', None)):
+            tree = make_tree(block, codec)
+            decoder = TableDecoder(tree.get_codes(), codec)
+            encoded = encode_block(tree, block)
+            self.assertEqual(decode_block(decoder, encoded), block)
+            self.assertEqual(decode_block(decoder, encoded), block)
+
+    def test_block_round_trip_with_table(self):
+        block = 'абракадабра' * 30
+        table = make_tree(block, 'utf-8').serialize_code_lengths()
+        encoded = encode_block_with_table(table, 'utf-8', block)
+        self.assertEqual(encoded,
+                         encode_block(make_tree(block, 'utf-8'), block))
+        self.assertEqual(decode_block_with_table(table, 'utf-8', encoded),
+                         block)
+
+    def test_build_block_tree(self):
+        block = bytes(range(20)) + b'a' * 5000
+        tree, table, optimal = pickle.loads(pickle.dumps(
+            build_block_tree(None, None, block)))
+        expected = make_tree(block)
+        self.assertEqual(table, expected.serialize_code_lengths())
+        self.assertEqual(tree.frequency, expected.frequency)
+        self.assertEqual(optimal, 0)
+
+        tree, table, optimal = build_block_tree(None, 5, block)
+        self.assertEqual(optimal, expected.get_cost())
+        self.assertLessEqual(max(tree.get_code_lengths().values()), 5)
+        self.assertEqual(table, tree.serialize_code_lengths())
+
+    def test_decode_empty_block(self):
+        decoder = TableDecoder({97: '0'})
+        with self.assertRaises(ValueError):
+            decode_block(decoder, b'')
+
+
+if __name__ == '__main__':
+    unittest.main()
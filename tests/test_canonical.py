@@ -0,0 +1,40 @@
+import unittest
+
+from huffman_method.canonical import (canonical_codes, pack_code_lengths,
+                                      unpack_code_lengths, encode_varint,
+                                      decode_varint)
+
+
+class TestCanonical(unittest.TestCase):
+    def test_canonical_codes(self):
+        lengths = {ord('a'): 1, ord('b'): 2, ord('c'): 3, ord('d'): 3}
+        codes = canonical_codes(lengths)
+        self.assertEqual(codes, {ord('a'): '0', ord('b'): '10',
+                                 ord('c'): '110', ord('d'): '111'})
+
+    def test_canonical_codes_single_symbol(self):
+        self.assertEqual(canonical_codes({65: 1}), {65: '0'})
+
+    def test_pack_unpack_bytes(self):
+        lengths = {0: 2, 255: 2, 10: 3, 11: 3, 12: 2}
+        packed = pack_code_lengths(lengths)
+        self.assertEqual(unpack_code_lengths(packed), lengths)
+
+    def test_pack_unpack_text(self):
+        lengths = {'ж': 1, 'a': 2, '€': 3, '\n': 3}
+        packed = pack_code_lengths(lengths, 'utf-8')
+        self.assertEqual(unpack_code_lengths(packed, 'utf-8'), lengths)
+
+    def test_unpack_corrupted(self):
+        packed = pack_code_lengths({1: 1, 2: 1})
+        with self.assertRaises(ValueError):
+            unpack_code_lengths(packed[:-1])
+
+    def test_varint(self):
+        for value in (0, 1, 127, 128, 300, 2 ** 40):
+            encoded = encode_varint(value)
+            self.assertEqual(decode_varint(encoded), (value, len(encoded)))
+
+
+if __name__ == '__main__':
+    unittest.main()
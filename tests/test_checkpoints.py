@@ -0,0 +1,59 @@
+import unittest
+from io import BytesIO
+
+from huffman_method import (BitEncoder, CheckpointReader, HuffmanTree,
+                            TableDecoder, find_checkpoint, pack_checkpoints,
+                            unpack_checkpoints)
+
+
+class TestCheckpoints(unittest.TestCase):
+    def test_pack_round_trip(self):
+        for checkpoints in ([], [(1024, 3001)],
+                            [(1024, 3001), (2048, 6000), (1 << 40, 1 << 43)]):
+            with self.subTest(checkpoints=checkpoints):
+                data = pack_checkpoints(checkpoints)
+                self.assertEqual(unpack_checkpoints(data), checkpoints)
+
+    def test_unpack_corrupted(self):
+        data = pack_checkpoints([(1024, 3001), (2048, 6000)])
+        for broken in (data[:-1], data + b'\x00', b''):
+            with self.subTest(broken=broken), self.assertRaises(ValueError):
+                unpack_checkpoints(broken)
+
+    def test_find_checkpoint(self):
+        checkpoints = [(100, 250), (200, 470), (300, 701)]
+        self.assertEqual(find_checkpoint(checkpoints, 0), (0, 0))
+        self.assertEqual(find_checkpoint(checkpoints, 99), (0, 0))
+        self.assertEqual(find_checkpoint(checkpoints, 100), (100, 250))
+        self.assertEqual(find_checkpoint(checkpoints, 299), (200, 470))
+        self.assertEqual(find_checkpoint(checkpoints, 10 ** 9), (300, 701))
+        self.assertEqual(find_checkpoint([], 5), (0, 0))
+
+    def test_reader(self):
+        data = bytes(range(50)) * 40 + b'tail' * 100
+        tree = HuffmanTree()
+        tree.add_block(data)
+        tree.build_tree()
+        encoder = BitEncoder.from_tree(tree)
+        encoded = b''
+        checkpoints = []
+        for start in range(0, len(data), 300):
+            encoded += encoder.encode(data[start:start + 300])
+            checkpoints.append((start + 300, encoder.bit_position))
+        encoded += encoder.flush()
+
+        file = BytesIO(b'head' + encoded + b'rest')
+        for points in (checkpoints, []):
+            reader = CheckpointReader(file, TableDecoder.from_tree(tree), 4,
+                                      len(encoded), points)
+            for offset, length in ((0, 1), (299, 2), (1000, 2000),
+                                   (len(data) - 3, 10), (len(data), 1)):
+                with self.subTest(offset=offset, points=bool(points)):
+                    self.assertEqual(reader.read(offset, length),
+                                     data[offset:offset + length])
+        with self.assertRaises(ValueError):
+            reader.read(-1, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
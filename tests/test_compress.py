@@ -5,7 +5,10 @@ from io import BytesIO
 from unittest.mock import patch
 
 from huffman_method import (Compressor, HuffmanTree,
-                            END_PATH, END_DATA, MD5, MAGIC_BYTES)
+                            END_PATH, END_DATA, MD5, MAGIC_BYTES,
+                            CODING_ADAPTIVE, CODING_BLOCKS, DATA_LENGTH_SIZE,
+                            CHECKSUM_BLAKE2, ENCRYPTION_CTR,
+                            BLOCK_CHECKSUMS_INDEX, decode_varint)
 
 
 class TestCompressorMethods(unittest.TestCase):
@@ -19,20 +22,6 @@ class TestCompressorMethods(unittest.TestCase):
     def tearDown(self):
         self.test_dir.cleanup()
 
-    def test_bits_to_bytes(self):
-        bits = "0100100001100101011011000110110001101111"
-        remaining_bits, byte = self.compressor._bits_to_bytes(bits)
-
-        self.assertEqual(remaining_bits, "")
-        self.assertEqual(byte, b"Hello")
-
-    def test_adder_zero(self):
-        bits = "1101"
-        byte, count_bits = self.compressor._adder_zero(bits)
-
-        self.assertEqual(byte, b"\xd0")
-        self.assertEqual(count_bits, b"\x04")
-
     def test_get_directory_info(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
             file1_path = os.path.join(tmp_dir, "file1.txt")
@@ -55,7 +44,8 @@ class TestCompressorMethods(unittest.TestCase):
             outfile = BytesIO()
             file_path = os.path.join(tmp_dir, "empty_dir")
 
-            self.compressor.compress_empty_dir(outfile, file_path, file_path)
+            compressor = Compressor(version=2)
+            compressor.compress_empty_dir(outfile, file_path, file_path)
 
             hasher = MD5()
             hasher.hash('.'.encode('utf-8'))
@@ -66,6 +56,18 @@ class TestCompressorMethods(unittest.TestCase):
             data_in_file = outfile.read()
             self.assertEqual(data_in_file, expected_result)
 
+    def test_compress_empty_dir_v3(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            outfile = BytesIO()
+            file_path = os.path.join(tmp_dir, "empty_dir")
+
+            self.compressor.compress_empty_dir(outfile, file_path, file_path)
+
+            hasher = MD5()
+            hasher.hash('.'.encode('utf-8'))
+            expected_result = b'\x00\x00\x00\x01.' + hasher.get_hash()
+            self.assertEqual(outfile.getvalue(), expected_result)
+
     def test_generate_huffman_tree(self):
         with tempfile.NamedTemporaryFile() as tmp_file:
             file_path = tmp_file.name
@@ -74,7 +76,7 @@ class TestCompressorMethods(unittest.TestCase):
 
             tree1 = self.compressor._generate_huffman_tree(file_path)
 
-            with open(file_path, "r") as file:
+            with open(file_path, "rb") as file:
                 data = file.read()
             tree2 = HuffmanTree()
             tree2.add_block(data)
@@ -96,7 +98,8 @@ class TestCompressorMethods(unittest.TestCase):
 
             outfile = BytesIO()
 
-            self.compressor.write_data(outfile, file_path, MD5(), tree)
+            Compressor(version=2).write_data(outfile, file_path, MD5(),
+                                             tree)
 
             outfile.seek(0)
             data_in_file = outfile.read()
@@ -106,6 +109,38 @@ class TestCompressorMethods(unittest.TestCase):
             self.assertEqual(data_in_file, b'\x70\x02' +
                              END_DATA + hasher.get_hash())
 
+            outfile = BytesIO()
+            self.compressor.write_data(outfile, file_path, MD5(), tree)
+            self.assertEqual(outfile.getvalue(),
+                             (2).to_bytes(DATA_LENGTH_SIZE, 'big') +
+                             b'\x70\x02' + hasher.get_hash())
+
+    def test_generate_huffman_tree_sampled(self):
+        data = b'a' * 10000 + b'b' * 10000
+        with open(self.test_file, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(sample_size=2000)
+
+        self.assertEqual(compressor._sample_ranges(len(data))[:3],
+                         [(0, 1000), (1562, 62), (2749, 62)])
+        tree = compressor._generate_huffman_tree(self.test_file)
+
+        self.assertEqual(len(tree.get_codes()), 256)
+        self.assertEqual(tree.frequency[ord('a')], 1000 + 8 * 62)
+        self.assertEqual(tree.frequency[ord('b')], 8 * 62)
+        self.assertEqual(tree.frequency[0], 1)
+
+    def test_sample_size_validation(self):
+        for kwargs in ({'sample_size': 0},
+                       {'sample_size': 10, 'codec': 'utf-8'},
+                       {'sample_size': 10, 'adaptive': True},
+                       {'table_block_size': 0},
+                       {'table_block_size': 10, 'adaptive': True},
+                       {'table_block_size': 10, 'sample_size': 10},
+                       {'shared_table': True}):
+            with self.assertRaises(ValueError):
+                Compressor(**kwargs)
+
     def test_make_header(self):
         outfile = BytesIO()
 
@@ -116,6 +151,42 @@ class TestCompressorMethods(unittest.TestCase):
         data_in_file = outfile.read()
         self.assertEqual(data_in_file, expected_header)
 
+    def test_make_header_encryption(self):
+        outfile = BytesIO()
+        Compressor(encrypt_payload=True)._make_header(outfile)
+        self.assertEqual(outfile.getvalue()[5], ENCRYPTION_CTR)
+        with self.assertRaises(ValueError):
+            Compressor(encrypt_payload=True, version=2)
+
+    def test_make_header_checksum(self):
+        outfile = BytesIO()
+        Compressor(checksum='blake2b')._make_header(outfile)
+        self.assertEqual(outfile.getvalue()[6], CHECKSUM_BLAKE2)
+        for kwargs in ({'checksum': 'sha1'},
+                       {'checksum': 'crc32', 'version': 2}):
+            with self.assertRaises(ValueError):
+                Compressor(**kwargs)
+
+    def test_make_header_block_checksums(self):
+        outfile = BytesIO()
+        Compressor(block_checksum_size=4096)._make_header(outfile)
+        self.assertEqual(outfile.getvalue()[7], BLOCK_CHECKSUMS_INDEX)
+        for kwargs in ({'block_checksum_size': 0},
+                       {'block_checksum_size': 4096, 'version': 2}):
+            with self.assertRaises(ValueError):
+                Compressor(**kwargs)
+
+    def test_make_header_adaptive(self):
+        outfile = BytesIO()
+
+        Compressor(adaptive=True)._make_header(outfile)
+
+        self.assertEqual(outfile.getvalue()[3], CODING_ADAPTIVE)
+
+        outfile = BytesIO()
+        Compressor(table_block_size=10)._make_header(outfile)
+        self.assertEqual(outfile.getvalue()[3], CODING_BLOCKS)
+
     @patch('os.path.getsize')
     def test_compress_file(self, mock_getsize):
         with (tempfile.TemporaryDirectory() as tmp_dir):
@@ -138,7 +209,8 @@ class TestCompressorMethods(unittest.TestCase):
                               relative_path.encode('utf-8') + \
                               END_PATH
 
-            self.compressor.compress_file(outfile, file_path, path_in, None)
+            compressor = Compressor(version=2)
+            compressor.compress_file(outfile, file_path, path_in, None)
 
             outfile.seek(0)
             header = outfile.read(len(expected_header))
@@ -147,6 +219,36 @@ class TestCompressorMethods(unittest.TestCase):
             self.assertEqual(header, expected_header)
             self.assertEqual(ser_tree_in_file, ser_tree)
 
+    def test_compress_file_v3(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            file_path = os.path.join(tmp_dir, "file.txt")
+            with open(file_path, "wb") as file:
+                file.write(b'test')
+
+            outfile = BytesIO()
+            self.compressor.compress_file(outfile, file_path, tmp_dir, None)
+            data = outfile.getvalue()
+
+            self.assertEqual(data[:12], b'\x01\x01\x00\x08file.txt')
+            tree_size, pos = decode_varint(data, 12)
+            data = data[pos + tree_size:]
+            data_size = int.from_bytes(data[:DATA_LENGTH_SIZE], 'big')
+            self.assertEqual(len(data), DATA_LENGTH_SIZE + data_size + 16)
+            self.assertNotIn(END_PATH, outfile.getvalue())
+            self.assertNotIn(END_DATA, outfile.getvalue())
+
+    def test_version_validation(self):
+        with self.assertRaises(ValueError):
+            Compressor(version=1)
+
+    def test_checkpoint_validation(self):
+        for kwargs in ({'checkpoint_size': 0},
+                       {'checkpoint_size': 1024, 'version': 2},
+                       {'checkpoint_size': 1024, 'adaptive': True},
+                       {'checkpoint_size': 1024, 'table_block_size': 64}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                Compressor(**kwargs)
+
     def test_compress_directory_with_files(self):
         with tempfile.TemporaryDirectory() as tmp_dir:
             file1_path = os.path.join(tmp_dir, "file1.txt")
@@ -163,6 +265,58 @@ class TestCompressorMethods(unittest.TestCase):
             self.assertGreater(original_size, 0)
             self.assertGreater(compressed_size, 0)
 
+    def test_compress_parallel_identical(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, 'source')
+            os.makedirs(os.path.join(source, 'empty'))
+            os.makedirs(os.path.join(source, 'sub'))
+            for index in range(4):
+                path = os.path.join(source, 'sub', f'file{index}.bin')
+                with open(path, 'wb') as file:
+                    file.write(b''.join(bytes([char]) * (1 << (char // 2))
+                                        for char in range(index + 20)))
+            protected = {os.path.join(source, 'sub', 'file1.bin'):
+                         b'\x01' * 16}
+
+            archives = []
+            for workers in (1, 2):
+                out = os.path.join(tmp_dir, f'out{workers}')
+                compressor = Compressor(max_code_length=7, workers=workers)
+                compressor.compress(source, out, protected)
+                with open(os.path.join(out, 'source.huff'), 'rb') as file:
+                    archives.append(file.read())
+                self.assertEqual(os.listdir(out), ['source.huff'])
+                archives.append(compressor.get_length_limit_loss())
+
+            self.assertEqual(archives[0], archives[2])
+            self.assertEqual(archives[1], archives[3])
+            self.assertGreater(archives[1], 0)
+
+    def test_compress_block_tables_parallel_identical(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            source = os.path.join(tmp_dir, 'data.bin')
+            with open(source, 'wb') as file:
+                file.write(b''.join(bytes([char % 30 + index]) * (char + 1)
+                                    for index in range(0, 200, 25)
+                                    for char in range(120)))
+
+            results = []
+            for workers in (1, 4):
+                out = os.path.join(tmp_dir, f'out{workers}')
+                compressor = Compressor(table_block_size=3000,
+                                        max_code_length=6, workers=workers)
+                compressor.compress(source, out)
+                with open(os.path.join(out, 'data.bin.huff'), 'rb') as file:
+                    results.append((file.read(),
+                                    compressor.get_length_limit_loss()))
+
+            self.assertEqual(results[0], results[1])
+            self.assertGreater(results[0][1], 0)
+
+    def test_workers_validation(self):
+        with self.assertRaises(ValueError):
+            Compressor(workers=0)
+
     def test_compress(self):
         compressor = Compressor()
         output_dir = self.test_dir.name
@@ -0,0 +1,95 @@
+import os
+import unittest
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from huffman_method import (MD5, CallbackProvider, CredentialProvider,
+                            Decompressor, EnvironmentProvider,
+                            PasswordFileProvider, PromptProvider, derive_key)
+
+
+class TestCredentials(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = TemporaryDirectory()
+        self.password_file = os.path.join(self.test_dir.name, 'passwords')
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def write_passwords(self, text):
+        with open(self.password_file, 'w', encoding='utf-8') as file:
+            file.write(text)
+
+    def test_derive_key(self):
+        hasher = MD5()
+        hasher.hash('пароль'.encode())
+        self.assertEqual(derive_key('пароль'), hasher.get_hash())
+        derive_key.cache_clear()
+        derive_key('secret')
+        derive_key('secret')
+        self.assertEqual(derive_key.cache_info().hits, 1)
+
+    def test_password_file(self):
+        self.write_passwords('# comment\n\n'
+                             'docs/secret.txt = first\n'
+                             'docs = a=b\n'
+                             '*.bin=third\n')
+        provider = PasswordFileProvider(self.password_file)
+        self.assertEqual(provider.get_password('docs/secret.txt'), 'first')
+        self.assertEqual(provider.get_password('docs/other.txt'), 'a=b')
+        self.assertEqual(provider.get_password('data/x.bin'), 'third')
+        self.assertIsNone(provider.get_password('data/x.txt'))
+        self.assertIsNone(provider.get_key('data/x.txt'))
+        self.assertEqual(provider.get_key('x.bin'), derive_key('third'))
+
+    def test_password_file_matches_like_extraction(self):
+        patterns = ['docs', '*.bin', 'data/?.txt', 'Docs/a.txt']
+        self.write_passwords(''.join(f'{pattern} = {pattern}\n'
+                                     for pattern in patterns))
+        provider = PasswordFileProvider(self.password_file)
+        for path in ('docs/a.txt', 'docsa/b.txt', 'x.bin', 'dir/x.bin',
+                     'data/1.txt', 'data/12.txt', 'docs/a.txt'.upper()):
+            with self.subTest(path=path):
+                selected = [pattern for pattern in patterns
+                            if Decompressor.match_path(path, [pattern])]
+                self.assertEqual(provider.get_password(path),
+                                 selected[0] if selected else None)
+
+    def test_provider_is_abstract(self):
+        with self.assertRaises(TypeError):
+            CredentialProvider()
+
+    def test_password_file_errors(self):
+        with self.assertRaises(ValueError):
+            PasswordFileProvider(os.path.join(self.test_dir.name, 'none'))
+        for text in ('*.bin\n', '= secret\n', '*.bin =\n'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                self.write_passwords(text)
+                PasswordFileProvider(self.password_file)
+
+    def test_environment(self):
+        provider = EnvironmentProvider('HUFFMAN_TEST_PASSWORD')
+        with patch.dict(os.environ, {'HUFFMAN_TEST_PASSWORD': 'secret'}):
+            self.assertEqual(provider.get_key('a.bin'), derive_key('secret'))
+        with patch.dict(os.environ, {'HUFFMAN_TEST_PASSWORD': ''}):
+            self.assertIsNone(provider.get_password('a.bin'))
+
+    def test_callback(self):
+        provider = CallbackProvider(lambda path: path.upper() or None)
+        self.assertEqual(provider.get_password('a.bin'), 'A.BIN')
+        self.assertIsNone(provider.get_key(''))
+        self.assertEqual(provider.attempts, 1)
+
+    @patch('getpass.getpass', side_effect=['first', 'second'])
+    def test_prompt(self, get_pass):
+        provider = PromptProvider()
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            self.assertEqual(provider.get_password('a.bin'), 'first')
+            self.assertEqual(provider.get_password('a.bin', 1), 'second')
+        self.assertEqual(stdout.getvalue().count('a.bin'), 1)
+        self.assertEqual(provider.attempts, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
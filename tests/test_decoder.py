@@ -0,0 +1,100 @@
+import random
+import unittest
+
+from huffman_method import HuffmanTree, TableDecoder
+
+
+def encode(tree, data):
+    codes = tree.get_codes()
+    bits = ''.join(codes[char] for char in data)
+    padding = -len(bits) % 8
+    bits += '0' * padding
+    return int(bits or '0', 2).to_bytes(len(bits) // 8, 'big'), padding
+
+
+class TestTableDecoder(unittest.TestCase):
+    def test_decode(self):
+        tree = HuffmanTree()
+        tree.add_block(b'hello')
+        tree.build_tree()
+        decoder = TableDecoder.from_tree(tree)
+        self.assertEqual(decoder.decode(b'\x9f\x00', 6), b'hello')
+
+    def test_decode_by_chunks(self):
+        random.seed(7)
+        data = bytes(random.choices(range(40),
+                                    weights=[2 ** -i for i in range(40)],
+                                    k=5000))
+        tree = HuffmanTree()
+        tree.add_block(data)
+        tree.build_tree()
+        encoded, padding = encode(tree, data)
+
+        for table_bits in (1, 6, 12):
+            decoder = TableDecoder.from_tree(tree, table_bits)
+            decoded = b''
+            for i in range(0, len(encoded), 13):
+                last = i + 13 >= len(encoded)
+                decoded += decoder.decode(encoded[i:i + 13],
+                                          padding if last else -1)
+            self.assertEqual(decoded, data)
+
+    def test_reset_skip(self):
+        random.seed(11)
+        data = bytes(random.choices(range(20), k=3000))
+        tree = HuffmanTree()
+        tree.add_block(data)
+        tree.build_tree()
+        codes = tree.get_codes()
+        encoded, padding = encode(tree, data)
+
+        decoder = TableDecoder.from_tree(tree, 6)
+        for start in (1, 5, 333, 2999):
+            bit = sum(len(codes[char]) for char in data[:start])
+            decoder.reset(bit & 7)
+            first = (bit >> 3) + 1
+            decoded = decoder.decode(encoded[first - 1:first], -1)
+            decoded += decoder.decode(encoded[first:], padding)
+            self.assertEqual(decoded, data[start:])
+
+    def test_decode_text(self):
+        text = 'съешь же ещё этих мягких французских булок'
+        tree = HuffmanTree('utf-8')
+        tree.add_block(text)
+        tree.build_tree()
+        encoded, padding = encode(tree, text)
+        decoder = TableDecoder.from_tree(tree)
+        self.assertEqual(decoder.decode(encoded, padding), text)
+
+    def test_from_code_lengths(self):
+        tree = HuffmanTree()
+        tree.add_block(b'abracadabra')
+        tree.build_tree()
+        tree.canonize()
+        encoded, padding = encode(tree, b'abracadabra')
+        decoder = TableDecoder.from_code_lengths(tree.get_code_lengths())
+        self.assertEqual(decoder.decode(encoded, padding), b'abracadabra')
+
+    def test_single_symbol(self):
+        tree = HuffmanTree()
+        tree.add_block(b'aaaa')
+        tree.build_tree()
+        encoded, padding = encode(tree, b'aaaa')
+        decoder = TableDecoder.from_tree(tree)
+        self.assertEqual(decoder.decode(encoded, padding), b'aaaa')
+
+    def test_invalid_code(self):
+        tree = HuffmanTree()
+        tree.add_block(b'aaaa')
+        tree.build_tree()
+        decoder = TableDecoder.from_tree(tree)
+        with self.assertRaises(ValueError):
+            decoder.decode(b'\x00', 0)
+
+    def test_empty_codes(self):
+        with self.assertRaises(ValueError):
+            TableDecoder({})
+
+
+if __name__ == '__main__':
+    unittest.main()
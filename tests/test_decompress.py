@@ -1,6 +1,6 @@
 import os.path
 import unittest
-from io import BytesIO
+from io import BytesIO, StringIO
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
@@ -131,6 +131,861 @@ class TestDecompressor(unittest.TestCase):
 
         self.assertFalse(os.path.isfile(out_file))
 
+    def test_decompress_single_symbol(self):
+        with open(self.test_file2, 'wb') as file:
+            file.write(b'a' * 100)
+        compressor = Compressor()
+        compressor.compress(self.test_file2, self.test_dir.name)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), b'a' * 100)
+
+    def test_decompress_canonical(self):
+        compressor = Compressor(canonical=True)
+        compressor.compress(self.test_file2, self.test_dir.name)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        self.assertTrue(decompressor.canonical)
+
+        with open(self.test_file2, 'rb') as file:
+            data_before = file.read()
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            data_after = file.read()
+        self.assertEqual(data_before, data_after)
+
+    def test_decompress_length_limited(self):
+        data = b''.join(bytes([i]) * (1 << (i // 2)) for i in range(30))
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(max_code_length=8)
+        compressor.compress(self.test_file2, self.test_dir.name)
+        self.assertGreater(compressor.get_length_limit_loss(), 0)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_decompress_sampled(self):
+        data = b'abcd' * 5000 + bytes(range(256)) + b'dcba' * 5000
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(sample_size=1024)
+        compressor.compress(self.test_file2, self.test_dir.name)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_decompress_block_tables(self):
+        data = (b'abcd' * 3000 + bytes(range(256)) * 20 +
+                b'abcd' * 3000 + b'dcba' * 3000)
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(table_block_size=4096)
+        compressor.compress(self.test_file2, self.test_dir.name)
+        with open(self.archive_file2, 'rb') as file:
+            archive = file.read()
+        self.assertIn(bytes([BLOCK_REUSE_TABLE]) + b'\x80\x20', archive)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        self.assertTrue(decompressor.block_tables)
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_decompress_block_tables_parallel(self):
+        data = b''.join(bytes([char % 7 + index]) * (char + 1)
+                        for index in range(0, 200, 40)
+                        for char in range(100))
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+
+        archives = []
+        for workers in (1, 3):
+            out = os.path.join(self.test_dir.name, f'archive{workers}')
+            compressor = Compressor(table_block_size=2000, workers=workers)
+            compressor.compress(self.test_file2, out)
+            with open(os.path.join(out, 'test2.bin.huff'), 'rb') as file:
+                archives.append(file.read())
+        self.assertEqual(archives[0], archives[1])
+
+        decompressor = Decompressor(workers=3)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        archive = os.path.join(self.test_dir.name, 'archive3',
+                               'test2.bin.huff')
+        self.assertTrue(decompressor.decompress(archive, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def test_decompress_shared_table(self):
+        data = b'abcd' * 3000 + bytes(range(256)) + b'dcba' * 3000
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(table_block_size=1000, shared_table=True,
+                                sample_size=4000, workers=2)
+        compressor.compress(self.test_file2, self.test_dir.name)
+        with open(self.archive_file2, 'rb') as file:
+            archive = file.read()
+        self.assertEqual(archive.count(bytes([BLOCK_REUSE_TABLE]) +
+                                       b'\xe8\x07'), 23)
+
+        decompressor = Decompressor(workers=2)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    @patch('getpass.getpass', side_effect=['pasdwdasd'])
+    def test_decompress_block_tables_text_protected(self, get_pass):
+        compressor = Compressor('utf-8', table_block_size=100)
+        hasher = MD5()
+        hasher.hash(b'pasdwdasd')
+        protected = {self.test_file2: hasher.get_hash()}
+        compressor.compress(self.test_file2, self.test_dir.name, protected)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+
+        with open(self.test_file2, 'r') as file:
+            data_before = file.read()
+        with open(os.path.join(out_dir, 'test2.bin'), 'r') as file:
+            data_after = file.read()
+        self.assertEqual(data_before, data_after)
+
+    def make_tree_archive(self, directory, count, **kwargs):
+        source = os.path.join(directory, 'many')
+        for index in range(count):
+            path = os.path.join(source, f'dir{index % 3}', f'{index}.bin')
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'wb') as file:
+                file.write(bytes([index]) * index + b'abc' * 50)
+        open(os.path.join(source, 'zero.bin'), 'wb').close()
+        Compressor(**kwargs).compress(source, directory)
+        return source, os.path.join(directory, 'many.huff')
+
+    def assert_same_tree(self, source, extracted):
+        for root, dirs, files in os.walk(source):
+            relative = os.path.relpath(root, source)
+            self.assertEqual(
+                sorted(dirs + files),
+                sorted(os.listdir(os.path.join(extracted, relative))))
+            for name in files:
+                with open(os.path.join(root, name), 'rb') as file:
+                    data = file.read()
+                with open(os.path.join(extracted, relative, name), 'rb') as f:
+                    self.assertEqual(f.read(), data)
+
+    def test_decompress_parallel_entries(self):
+        for kwargs in ({}, {'table_block_size': 64}, {'adaptive': True}):
+            with self.subTest(**kwargs), TemporaryDirectory() as directory:
+                source, archive = self.make_tree_archive(directory, 7,
+                                                         **kwargs)
+                out_dir = os.path.join(directory, 'out')
+                decompressor = Decompressor(workers=3)
+                self.assertTrue(decompressor.decompress(archive, out_dir))
+                self.assert_same_tree(source, os.path.join(out_dir, 'many'))
+
+    def test_decompress_parallel_reports_each_entry(self):
+        source, archive = self.make_tree_archive(self.test_dir.name, 5)
+        with open(archive, 'rb') as file:
+            decompressor = Decompressor()
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            decompressor.load_directory(file)
+            entries = decompressor.locate_entries(
+                file, decompressor.entries_end)
+        self.assertEqual(len(entries), 6)
+        broken = [entry.path for entry in entries[1:3]]
+        with open(archive, 'r+b') as file:
+            for entry in entries[2:4]:
+                file.seek(entry.offset - 1)
+                byte = file.read(1)
+                file.seek(entry.offset - 1)
+                file.write(bytes([byte[0] ^ 1]))
+
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            result = Decompressor(workers=2).decompress(archive, out_dir)
+        self.assertFalse(result)
+        for path in broken:
+            self.assertIn(f'[{path}]', stdout.getvalue())
+        extracted = os.path.join(out_dir, 'many')
+        for entry in entries[3:]:
+            self.assertTrue(os.path.exists(os.path.join(extracted,
+                                                        entry.path)))
+
+    def corrupt_tree(self, archive, entry, position, value=0xFF):
+        with open(archive, 'r+b') as file:
+            file.seek(entry.offset + 3)
+            data = file.read(entry.compressed_size - 3)
+            size, pos = decode_varint(data)
+            size, pos = decode_varint(data, pos + size)
+            file.seek(entry.offset + 3 + pos + position % size)
+            file.write(bytes([value]))
+
+    def test_test_mode_corrupted_tree(self):
+        for position in (0, 1, 40, -2):
+            with self.subTest(position=position), \
+                    TemporaryDirectory() as directory:
+                source, archive = self.make_tree_archive(directory, 3)
+                entries = sorted(Decompressor().list_entries(archive),
+                                 key=lambda entry: entry.path)
+                self.corrupt_tree(archive, entries[0], position)
+                with open(archive, 'r+b') as file:
+                    file.seek(entries[-2].end - 1)
+                    byte = file.read(1)
+                    file.seek(entries[-2].end - 1)
+                    file.write(bytes([byte[0] ^ 1]))
+
+                with patch('sys.stdout', new_callable=StringIO) as stdout:
+                    self.assertFalse(Decompressor().test(archive))
+                output = stdout.getvalue()
+                self.assertIn(f'[{entries[0].path}]', output)
+                self.assertIn(f'[{entries[-2].path}]', output)
+                self.assertNotIn(f'[{entries[1].path}]', output)
+
+    def test_decompress_parallel_collects_any_error(self):
+        source, archive = self.make_tree_archive(self.test_dir.name, 5)
+        entries = sorted(Decompressor().list_entries(archive),
+                         key=lambda entry: entry.path)
+        self.corrupt_tree(archive, entries[0], 0)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        extracted = os.path.join(out_dir, 'many')
+        os.makedirs(os.path.join(extracted, entries[1].path))
+
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            result = Decompressor(workers=2).decompress(archive, out_dir)
+        self.assertFalse(result)
+        self.assertIn(f'[{entries[0].path}] Файл поврежден [Дерево]',
+                      stdout.getvalue())
+        self.assertIn(f'[{entries[1].path}] Ошибка распаковки',
+                      stdout.getvalue())
+        for entry in entries[2:]:
+            self.assertTrue(os.path.isfile(os.path.join(extracted,
+                                                        entry.path)))
+
+    def test_decompress_selected(self):
+        for kwargs in ({}, {'version': 2}):
+            for workers in (1, 2):
+                with self.subTest(workers=workers, **kwargs), \
+                        TemporaryDirectory() as directory:
+                    source, archive = self.make_tree_archive(directory, 7,
+                                                             **kwargs)
+                    out_dir = os.path.join(directory, 'out')
+                    decompressor = Decompressor(workers=workers)
+                    self.assertTrue(decompressor.decompress(
+                        archive, out_dir, ['dir1', '*/0.bin']))
+
+                    extracted = os.path.join(out_dir, 'many')
+                    self.assertEqual(sorted(os.listdir(extracted)),
+                                     ['dir0', 'dir1'])
+                    self.assertEqual(
+                        os.listdir(os.path.join(extracted, 'dir0')),
+                        ['0.bin'])
+                    self.assertEqual(
+                        sorted(os.listdir(os.path.join(extracted, 'dir1'))),
+                        ['1.bin', '4.bin'])
+                    with open(os.path.join(source, 'dir1', '4.bin'),
+                              'rb') as file:
+                        data = file.read()
+                    with open(os.path.join(extracted, 'dir1', '4.bin'),
+                              'rb') as file:
+                        self.assertEqual(file.read(), data)
+
+    def test_decompress_selected_skips_other_entries(self):
+        source, archive = self.make_tree_archive(self.test_dir.name, 5)
+        decompressor = Decompressor()
+        with open(archive, 'rb') as file:
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            entries = decompressor.load_directory(file)
+        with open(archive, 'r+b') as file:
+            for entry in entries:
+                if entry.path != os.path.join('dir2', '2.bin'):
+                    file.seek(entry.offset)
+                    file.write(b'\xff' * (entry.compressed_size - 16))
+
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        with patch('sys.stdout', new_callable=StringIO):
+            self.assertTrue(Decompressor().decompress(archive, out_dir,
+                                                      ['dir2/2.bin']))
+        self.assertEqual(os.listdir(os.path.join(out_dir, 'many', 'dir2')),
+                         ['2.bin'])
+
+    def test_decompress_selected_missing(self):
+        source, archive = self.make_tree_archive(self.test_dir.name, 3)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            self.assertFalse(Decompressor().decompress(
+                archive, out_dir, ['dir0', 'nothing*']))
+        self.assertIn('nothing*', stdout.getvalue())
+        self.assertFalse(os.path.exists(out_dir))
+
+    def test_test_mode(self):
+        for kwargs in ({}, {'table_block_size': 64}, {'version': 2}):
+            for workers in (1, 2):
+                with self.subTest(workers=workers, **kwargs), \
+                        TemporaryDirectory() as directory:
+                    source, archive = self.make_tree_archive(directory, 5,
+                                                             **kwargs)
+                    listing = sorted(os.listdir(directory))
+                    decompressor = Decompressor(workers=workers)
+                    self.assertTrue(decompressor.test(archive))
+                    self.assertEqual(sorted(os.listdir(directory)), listing)
+                    self.assertFalse(os.path.exists('many'))
+
+                    entries = decompressor.list_entries(archive)
+                    with open(archive, 'r+b') as file:
+                        for entry in entries[1:3]:
+                            file.seek(entry.end - 1)
+                            byte = file.read(1)
+                            file.seek(entry.end - 1)
+                            file.write(bytes([byte[0] ^ 1]))
+
+                    with patch('sys.stdout', new_callable=StringIO) as out:
+                        self.assertFalse(decompressor.test(archive))
+                    for entry in entries[1:3]:
+                        self.assertIn(f'[{entry.path}]', out.getvalue())
+                    self.assertEqual(out.getvalue().count('поврежден'), 2)
+                    self.assertEqual(sorted(os.listdir(directory)), listing)
+
+    def test_list_entries(self):
+        for version in (3, 2):
+            with self.subTest(version=version), \
+                    TemporaryDirectory() as directory, \
+                    patch.object(Decompressor, 'read_data',
+                                 side_effect=AssertionError), \
+                    patch('sys.stdout', new_callable=StringIO) as stdout:
+                source, archive = self.make_tree_archive(directory, 4,
+                                                         version=version)
+                stdout.truncate(0)
+                decompressor = Decompressor()
+                if version == 3:
+                    with patch.object(Decompressor, 'locate_entries',
+                                      side_effect=AssertionError):
+                        entries = decompressor.list_entries(archive)
+                else:
+                    entries = decompressor.list_entries(archive)
+
+                self.assertEqual(stdout.getvalue(), '')
+                self.assertEqual(
+                    sorted(entry.path for entry in entries),
+                    sorted([os.path.join(f'dir{index % 3}', f'{index}.bin')
+                            for index in range(4)] + ['zero.bin']))
+                for entry in entries:
+                    path = os.path.join(source, entry.path)
+                    self.assertTrue(entry.is_file)
+                    self.assertFalse(entry.protected)
+                    self.assertEqual(entry.not_empty,
+                                     os.path.getsize(path) > 0)
+                    if version == 3:
+                        self.assertEqual(entry.original_size,
+                                         os.path.getsize(path))
+                    else:
+                        self.assertIsNone(entry.original_size)
+                self.assertEqual(entries[-1].end, decompressor.entries_end)
+
+    def test_decompress_version2(self):
+        for kwargs in ({}, {'canonical': True}, {'table_block_size': 64},
+                       {'adaptive': True}, {'codec': 'utf-8'}):
+            for workers in (1, 2):
+                with self.subTest(workers=workers, **kwargs), \
+                        TemporaryDirectory() as directory:
+                    source, archive = self.make_tree_archive(
+                        directory, 5, version=2, **kwargs)
+                    with open(archive, 'rb') as file:
+                        file.seek(len(MAGIC_BYTES))
+                        self.assertEqual(file.read(1), b'\x02')
+                    out_dir = os.path.join(directory, 'out')
+                    decompressor = Decompressor(workers=workers)
+                    self.assertTrue(decompressor.decompress(archive, out_dir))
+                    self.assertEqual(decompressor.version, 2)
+                    self.assert_same_tree(source,
+                                          os.path.join(out_dir, 'many'))
+
+    def test_decompress_sized_sections(self):
+        data = bytes((index * 7919) % 251 for index in range(300000))
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        Compressor().compress(self.test_file2, self.test_dir.name)
+
+        with open(self.archive_file2, 'rb') as file:
+            decompressor = Decompressor()
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            self.assertEqual(decompressor.version, 3)
+            decompressor.load_directory(file)
+            end = decompressor.entries_end
+            entries = decompressor.locate_entries(file, end)
+            self.assertEqual(file.tell(), end)
+        self.assertEqual([(entry.offset, entry.path, entry.end)
+                          for entry in entries], [(36, '.', end)])
+
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(Decompressor().decompress(self.archive_file2,
+                                                  out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+
+    def make_range_source(self, codec=None):
+        path = os.path.join(self.test_dir.name, 'range.bin')
+        words = ['alpha', 'beta', 'gamma', 'дельта', 'epsilon', 'zeta']
+        text = ' '.join(words[(i * i + 3 * i) % 6] + str(i % 97)
+                        for i in range(4000))
+        if codec is None:
+            data = text.encode() + bytes(range(256)) * 4
+            with open(path, 'wb') as file:
+                file.write(data)
+        else:
+            data = text
+            with open(path, 'w', encoding=codec) as file:
+                file.write(data)
+        return path, data
+
+    def test_read_range(self):
+        ranges = ((0, 10), (5000, 300), (12345, 1), (4096, 4096),
+                  (30000, 10 ** 6), (10 ** 6, 5), (7, 0))
+        for kwargs in ({'checkpoint_size': 4096},
+                       {'checkpoint_size': 1000, 'canonical': True},
+                       {'checkpoint_size': 3000, 'codec': 'utf-8'},
+                       {'codec': 'utf-8'}, {}, {'adaptive': True}):
+            with self.subTest(**kwargs):
+                path, data = self.make_range_source(kwargs.get('codec'))
+                archive = os.path.join(self.test_dir.name, 'range.bin.huff')
+                if os.path.exists(archive):
+                    os.remove(archive)
+                Compressor(**kwargs).compress(path, self.test_dir.name)
+
+                decompressor = Decompressor()
+                for offset, length in ranges:
+                    self.assertEqual(
+                        decompressor.read(archive, '.', offset, length),
+                        data[offset:offset + length])
+
+                self.assertTrue(decompressor.test(archive))
+                out_dir = os.path.join(self.test_dir.name, 'out')
+                self.assertTrue(decompressor.decompress(archive, out_dir))
+                with open(os.path.join(out_dir, 'range.bin'), 'rb') as file:
+                    extracted = file.read()
+                if kwargs.get('codec'):
+                    extracted = extracted.decode('utf-8')
+                self.assertEqual(extracted, data)
+                os.remove(os.path.join(out_dir, 'range.bin'))
+
+    def test_read_range_starts_at_checkpoint(self):
+        path, data = self.make_range_source()
+        Compressor(checkpoint_size=2048).compress(path, self.test_dir.name)
+        archive = os.path.join(self.test_dir.name, 'range.bin.huff')
+
+        decompressor = Decompressor()
+        decompressor.archive_path = archive
+        with open(archive, 'rb') as file:
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            decompressor.load_directory(file)
+            reader = decompressor.open_range(
+                file, decompressor.find_file(file, '.'))
+            start = reader.start
+            self.assertGreater(len(reader.checkpoints), 10)
+        with open(archive, 'r+b') as file:
+            file.seek(start)
+            file.write(b'\xff' * 64)
+
+        offset = len(data) - 5000
+        self.assertEqual(decompressor.read(archive, '.', offset, 100),
+                         data[offset:offset + 100])
+        self.assertNotEqual(decompressor.read(archive, '.', 0, 100),
+                            data[:100])
+        with patch('sys.stdout', new_callable=StringIO):
+            self.assertFalse(decompressor.test(archive))
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, 'NumPy не установлен')
+    def test_read_range_reads_only_span(self):
+        path, data = self.make_range_source()
+        with open(path, 'wb') as file:
+            file.write(data * 8)
+        Compressor(checkpoint_size=2048).compress(path, self.test_dir.name)
+        archive = os.path.join(self.test_dir.name, 'range.bin.huff')
+
+        decompressor = Decompressor()
+        decompressor.archive_path = archive
+        with open(archive, 'rb') as file:
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            decompressor.load_directory(file)
+            reader = decompressor.open_range(
+                file, decompressor.find_file(file, '.'))
+            offset = len(data) * 4
+            with patch.object(reader.file, 'read',
+                              wraps=reader.file.read) as read:
+                self.assertEqual(reader.read(offset, 100), data[:100])
+        consumed = sum(call.args[0] for call in read.call_args_list)
+        self.assertLessEqual(consumed, 2 * (RANGE_CHUNK_SIZE + 1))
+
+    @patch('getpass.getpass', side_effect=['pasdwdasd'])
+    def test_read_range_protected(self, get_pass):
+        path, data = self.make_range_source()
+        hasher = MD5()
+        hasher.hash(b'pasdwdasd')
+        Compressor(checkpoint_size=4096).compress(
+            path, self.test_dir.name, {path: hasher.get_hash()})
+        archive = os.path.join(self.test_dir.name, 'range.bin.huff')
+        with patch('sys.stdout', new_callable=StringIO):
+            fragment = Decompressor().read(archive, '.', 9000, 50)
+        self.assertEqual(fragment, data[9000:9050])
+
+    @patch('getpass.getpass', return_value='pasdwdasd')
+    def test_decompress_encrypted_payload(self, get_pass):
+        hasher = MD5()
+        hasher.hash(b'pasdwdasd')
+        for kwargs in ({}, {'adaptive': True},
+                       {'codec': 'utf-8', 'canonical': True},
+                       {'table_block_size': 1000},
+                       {'checkpoint_size': 2048}):
+            with self.subTest(**kwargs):
+                path, data = self.make_range_source(kwargs.get('codec'))
+                plain_dir = os.path.join(self.test_dir.name, 'plain')
+                secret_dir = os.path.join(self.test_dir.name, 'secret')
+                for directory in (plain_dir, secret_dir):
+                    archive = os.path.join(directory, 'range.bin.huff')
+                    if os.path.exists(archive):
+                        os.remove(archive)
+                Compressor(**kwargs).compress(path, plain_dir)
+                Compressor(encrypt_payload=True, **kwargs).compress(
+                    path, secret_dir, {path: hasher.get_hash()})
+
+                with open(os.path.join(plain_dir, 'range.bin.huff'),
+                          'rb') as file:
+                    plain = file.read()
+                with open(archive, 'rb') as file:
+                    secret = file.read()
+                self.assertEqual(secret[len(MAGIC_BYTES) + 5],
+                                 ENCRYPTION_CTR)
+                middle = len(plain) // 2
+                self.assertNotIn(plain[middle:middle + 32], secret)
+
+                decompressor = Decompressor()
+                out_dir = os.path.join(self.test_dir.name, 'out')
+                with patch('sys.stdout', new_callable=StringIO):
+                    self.assertTrue(decompressor.test(archive))
+                    self.assertTrue(decompressor.decompress(archive,
+                                                            out_dir))
+                    if not kwargs.get('table_block_size'):
+                        self.assertEqual(
+                            decompressor.read(archive, '.', 9000, 50),
+                            data[9000:9050])
+                with open(os.path.join(out_dir, 'range.bin'), 'rb') as file:
+                    extracted = file.read()
+                if kwargs.get('codec'):
+                    extracted = extracted.decode('utf-8')
+                self.assertEqual(extracted, data)
+                os.remove(os.path.join(out_dir, 'range.bin'))
+
+    def test_decompress_checksums(self):
+        for checksum in CHECKSUMS:
+            for kwargs in ({}, {'adaptive': True}, {'table_block_size': 500},
+                           {'codec': 'utf-8'}):
+                with self.subTest(checksum=checksum, **kwargs), \
+                        TemporaryDirectory() as directory:
+                    source, archive = self.make_tree_archive(
+                        directory, 5, checksum=checksum, **kwargs)
+                    with open(archive, 'rb') as file:
+                        header = file.read(len(MAGIC_BYTES) + 32)
+                    self.assertEqual(header[len(MAGIC_BYTES) + 6],
+                                     CHECKSUMS[checksum])
+
+                    out_dir = os.path.join(directory, 'out')
+                    decompressor = Decompressor()
+                    self.assertTrue(decompressor.decompress(archive, out_dir))
+                    self.assert_same_tree(source, os.path.join(out_dir,
+                                                               'many'))
+
+                    entry = decompressor.list_entries(archive)[-1]
+                    with open(archive, 'r+b') as file:
+                        file.seek(entry.end - 20)
+                        byte = file.read(1)
+                        file.seek(entry.end - 20)
+                        file.write(bytes([byte[0] ^ 1]))
+                    with patch('sys.stdout', new_callable=StringIO):
+                        self.assertFalse(decompressor.test(archive))
+
+    def test_decompress_block_checksums(self):
+        path = os.path.join(self.test_dir.name, 'range.bin')
+        data = bytes(range(256)) * 20 + b'abcabd' * 2000
+        with open(path, 'wb') as file:
+            file.write(data)
+        archive = path + '.huff'
+        for kwargs in ({}, {'adaptive': True}, {'table_block_size': 3000},
+                       {'checkpoint_size': 1000, 'checksum': 'crc32'},
+                       {'checksum': 'blake2b', 'encrypt_payload': True}):
+            with self.subTest(**kwargs):
+                protected = None
+                if kwargs.get('encrypt_payload'):
+                    protected = {path: b'\x05' * 16}
+                Compressor(canonical=True, block_checksum_size=256,
+                           **kwargs).compress(path, self.test_dir.name,
+                                              protected)
+                with open(archive, 'rb') as file:
+                    header = file.read(len(MAGIC_BYTES) + 32)
+                self.assertEqual(header[len(MAGIC_BYTES) + 7],
+                                 BLOCK_CHECKSUMS_INDEX)
+
+                decompressor = Decompressor()
+                decompressor.authentication = \
+                    lambda *args: (True, b'\x05' * 16)
+                out_dir = os.path.join(self.test_dir.name, 'out')
+                with patch('huffman_method.decompress.find_damaged_block',
+                           side_effect=AssertionError):
+                    self.assertTrue(decompressor.decompress(archive, out_dir))
+                with open(os.path.join(out_dir, 'range.bin'), 'rb') as file:
+                    self.assertEqual(file.read(), data)
+                os.remove(os.path.join(out_dir, 'range.bin'))
+                if kwargs.get('checkpoint_size'):
+                    self.assertEqual(decompressor.read(archive, '.', 7000, 9),
+                                     data[7000:7009])
+                reader = ArchiveReader(archive)
+                reader.decompressor.authentication = \
+                    decompressor.authentication
+                with reader.open('.') as stream:
+                    self.assertEqual(stream.read(), data)
+                entry = decompressor.list_entries(archive)[0]
+                with open(archive, 'rb') as file:
+                    decompressor.check_magic_bytes(file)
+                    decompressor.check_header(file)
+                    located = decompressor.locate_entries(file, entry.end)
+                self.assertEqual(located[0].end, entry.end)
+
+                position = entry.offset + entry.compressed_size // 2
+                with open(archive, 'r+b') as file:
+                    file.seek(position)
+                    byte = file.read(1)
+                    file.seek(position)
+                    file.write(bytes([byte[0] ^ 1]))
+                with patch('sys.stdout', new_callable=StringIO) as stdout:
+                    self.assertFalse(decompressor.test(archive))
+                message = stdout.getvalue()
+                self.assertIn('Блок данных', message)
+                start, end = map(int, message.split('Блок данных ')[1]
+                                 .split(' ')[0].split('-'))
+                self.assertTrue(start <= position < end)
+                self.assertLessEqual(end - start, 256)
+                with self.assertRaises(ValueError):
+                    with reader.open('.') as stream:
+                        stream.read()
+
+                with patch('sys.stdout', new_callable=StringIO) as stdout:
+                    self.assertFalse(decompressor.decompress(archive,
+                                                             out_dir))
+                message = stdout.getvalue()
+                self.assertIn(f'Блок данных {start}-{end} архива', message)
+                lost = int(message.split('с позиции ')[1].split(']')[0])
+                with open(os.path.join(out_dir, 'range.bin'), 'rb') as file:
+                    extracted = file.read()
+                self.assertLessEqual(len(extracted), lost)
+                self.assertLess(lost, len(data))
+                self.assertEqual(extracted, data[:len(extracted)])
+                if kwargs.get('table_block_size'):
+                    self.assertEqual(lost % 3000, 0)
+                os.remove(os.path.join(out_dir, 'range.bin'))
+                os.remove(archive)
+
+    @patch('getpass.getpass', side_effect=AssertionError)
+    def test_decompress_with_credentials(self, get_pass):
+        source, archive = self.make_tree_archive(self.test_dir.name, 6)
+        os.remove(archive)
+        passwords = {os.path.join('dir1', '1.bin'): 'one',
+                     os.path.join('dir1', '4.bin'): 'four',
+                     os.path.join('dir2', '2.bin'): 'two'}
+        protected = {os.path.join(source, path): derive_key(password)
+                     for path, password in passwords.items()}
+        Compressor(encrypt_payload=True).compress(source, self.test_dir.name,
+                                                  protected)
+
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                calls = []
+
+                def callback(path):
+                    calls.append(path)
+                    return passwords.get(path)
+
+                out_dir = os.path.join(self.test_dir.name, f'out{workers}')
+                decompressor = Decompressor(
+                    workers=workers, credentials=CallbackProvider(callback))
+                self.assertTrue(decompressor.decompress(archive, out_dir))
+                self.assert_same_tree(source, os.path.join(out_dir, 'many'))
+                self.assertEqual(sorted(calls), sorted(passwords))
+
+        passwords[os.path.join('dir2', '2.bin')] = 'wrong'
+        out_dir = os.path.join(self.test_dir.name, 'wrong')
+        decompressor = Decompressor(
+            credentials=CallbackProvider(passwords.get))
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            self.assertTrue(decompressor.decompress(archive, out_dir))
+        self.assertIn('Не верный пароль', stdout.getvalue())
+        self.assertFalse(os.path.exists(
+            os.path.join(out_dir, 'many', 'dir2', '2.bin')))
+        self.assertTrue(os.path.exists(
+            os.path.join(out_dir, 'many', 'dir1', '4.bin')))
+
+        calls = []
+        reader = ArchiveReader(archive, CallbackProvider(
+            lambda path: calls.append(path) or 'one'))
+        for _ in range(2):
+            with reader.open(os.path.join('dir1', '1.bin')) as stream:
+                self.assertEqual(stream.read(), b'\x01' + b'abc' * 50)
+        self.assertEqual(calls, [os.path.join('dir1', '1.bin')])
+
+    @patch('getpass.getpass', side_effect=AssertionError)
+    def test_credentials_resolved_before_output_v2(self, get_pass):
+        source, archive = self.make_tree_archive(self.test_dir.name, 4)
+        os.remove(archive)
+        passwords = {os.path.join('dir1', '1.bin'): 'one',
+                     os.path.join('dir2', '2.bin'): 'two'}
+        protected = {os.path.join(source, path): derive_key(password)
+                     for path, password in passwords.items()}
+        Compressor(version=2).compress(source, self.test_dir.name,
+                                       protected)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        written = []
+
+        def callback(path):
+            written.append(os.path.exists(out_dir))
+            return passwords[path]
+
+        decompressor = Decompressor(credentials=CallbackProvider(callback))
+        self.assertTrue(decompressor.decompress(archive, out_dir))
+        self.assertEqual(written, [False, False])
+        self.assert_same_tree(source, os.path.join(out_dir, 'many'))
+
+    @patch('getpass.getpass', return_value='wrong')
+    def test_encrypted_payload_wrong_password(self, get_pass):
+        source, archive = self.make_tree_archive(self.test_dir.name, 4)
+        os.remove(archive)
+        protected = {os.path.join(source, 'dir1', '1.bin'): b'\x01' * 16}
+        Compressor(encrypt_payload=True).compress(source, self.test_dir.name,
+                                                  protected)
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        with patch('sys.stdout', new_callable=StringIO):
+            entries = Decompressor().list_entries(archive)
+            self.assertTrue(Decompressor().decompress(archive, out_dir))
+        self.assertEqual(sum(entry.protected for entry in entries), 1)
+        self.assertFalse(os.path.exists(
+            os.path.join(out_dir, 'many', 'dir1', '1.bin')))
+        self.assertTrue(os.path.exists(
+            os.path.join(out_dir, 'many', 'dir2', '2.bin')))
+
+        decompressor = Decompressor()
+        with open(archive, 'rb') as file:
+            decompressor.check_magic_bytes(file)
+            decompressor.check_header(file)
+            decompressor.load_directory(file)
+            located = decompressor.locate_entries(file,
+                                                  decompressor.entries_end)
+        self.assertEqual([entry.end for entry in located],
+                         [entry.end for entry in entries])
+
+    def test_read_range_errors(self):
+        source, archive = self.make_tree_archive(self.test_dir.name, 3)
+        decompressor = Decompressor()
+        self.assertEqual(decompressor.read(archive, 'zero.bin', 0, 10), b'')
+        self.assertEqual(
+            decompressor.read(archive, os.path.join('dir1', '1.bin'), 0, 4),
+            b'\x01abc')
+        with self.assertRaises(ValueError):
+            decompressor.read(archive, 'missing.bin', 0, 1)
+        with self.assertRaises(ValueError):
+            decompressor.read(archive, 'zero.bin', -1, 1)
+
+        directory = os.path.join(self.test_dir.name, 'blocks')
+        source, archive = self.make_tree_archive(directory, 3,
+                                                 table_block_size=64)
+        with self.assertRaises(ValueError):
+            decompressor.read(archive, os.path.join('dir1', '1.bin'), 0, 4)
+
+    def test_path_outside_archive_directory(self):
+        archive = os.path.join(self.test_dir.name, 'evil.huff')
+        hasher = MD5()
+        hasher.hash(b'../evil.bin')
+        with open(archive, 'wb') as file:
+            file.write(MAGIC_BYTES + bytes([2]) + b'\x00' * 31)
+            file.write(b'\x01\x00\x00../evil.bin' + END_PATH + END_DATA)
+            file.write(hasher.get_hash())
+
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        with patch('sys.stdout', new_callable=StringIO):
+            self.assertFalse(Decompressor().decompress(archive, out_dir))
+        self.assertFalse(os.path.exists(
+            os.path.join(self.test_dir.name, 'out', 'evil.bin')))
+
+    def test_decompress_adaptive(self):
+        data = bytes(range(256)) + b'abracadabra' * 300
+        with open(self.test_file2, 'wb') as file:
+            file.write(data)
+        compressor = Compressor(adaptive=True)
+        compressor.compress(self.test_dir.name, self.empty_dir.name)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        archive = os.path.join(
+            self.empty_dir.name,
+            os.path.basename(self.test_dir.name) + '.huff')
+        self.assertTrue(decompressor.decompress(archive, out_dir))
+        self.assertTrue(decompressor.adaptive)
+
+        out_root = os.path.join(out_dir, os.path.basename(self.test_dir.name))
+        with open(os.path.join(out_root, 'test2.bin'), 'rb') as file:
+            self.assertEqual(file.read(), data)
+        with open(os.path.join(out_root, 'test3.bin'), 'rb') as file:
+            self.assertEqual(file.read(), b'')
+
+    def test_decompress_adaptive_text(self):
+        compressor = Compressor('utf-8', adaptive=True)
+        with open(self.test_file2, 'w', encoding='utf-8') as file:
+            file.write('адаптивный код Хаффмана ' * 50)
+        compressor.compress(self.test_file2, self.test_dir.name)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+        with open(os.path.join(out_dir, 'test2.bin'), encoding='utf-8') as f:
+            self.assertEqual(f.read(), 'адаптивный код Хаффмана ' * 50)
+
+    def test_adaptive_rejects_protection(self):
+        compressor = Compressor(adaptive=True)
+        with self.assertRaises(ValueError):
+            compressor.compress(self.test_file2, self.test_dir.name,
+                                {self.test_file2: b'\x00' * 16})
+
+    @patch('getpass.getpass', side_effect=['pasdwdasd'])
+    def test_decompress_canonical_text_protected(self, get_pass):
+        compressor = Compressor('utf-8', canonical=True)
+        hasher = MD5()
+        hasher.hash(b'pasdwdasd')
+        protected = {self.test_file2: hasher.get_hash()}
+        compressor.compress(self.test_file2, self.test_dir.name, protected)
+
+        decompressor = Decompressor()
+        out_dir = os.path.join(self.test_dir.name, 'out')
+        self.assertTrue(decompressor.decompress(self.archive_file2, out_dir))
+
+        with open(self.test_file2, 'r') as file:
+            data_before = file.read()
+        with open(os.path.join(out_dir, 'test2.bin'), 'r') as file:
+            data_after = file.read()
+        self.assertEqual(data_before, data_after)
+
     def test_bytes_to_bits_empty(self):
         data = b''
         expected = ''
@@ -0,0 +1,127 @@
+import hashlib
+import os
+import unittest
+from io import BytesIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from huffman_method import (Compressor, Decompressor, DirectoryEntry,
+                            DIRECTORY_MAGIC, MAGIC_BYTES, TRAILER_SIZE,
+                            pack_directory, read_directory, unpack_directory)
+
+
+def make_entries():
+    return [DirectoryEntry('a/b.bin', True, True, False, 36, 120, 1000,
+                           b'\x01' * 16),
+            DirectoryEntry('empty', False, False, False, 156, 25, 0,
+                           b'\x02' * 16),
+            DirectoryEntry('тайна.txt', True, True, True, 181, 70000, 1 << 40,
+                           b'\x03' * 16)]
+
+
+class TestDirectory(unittest.TestCase):
+    def assert_same_entries(self, first, second):
+        self.assertEqual([vars(entry) for entry in first],
+                         [vars(entry) for entry in second])
+
+    def test_pack_round_trip(self):
+        entries = make_entries()
+        data = pack_directory(entries, 100)
+        self.assertEqual(data[-TRAILER_SIZE:][:len(DIRECTORY_MAGIC)],
+                         DIRECTORY_MAGIC)
+        self.assert_same_entries(
+            unpack_directory(data[:-TRAILER_SIZE]), entries)
+        self.assertEqual(entries[0].end, 156)
+        digest = hashlib.blake2b(data[:-TRAILER_SIZE], digest_size=16)
+        self.assertEqual(data[-16:], digest.digest())
+
+    def test_read_directory(self):
+        entries = make_entries()
+        data = b'\x00' * 100
+        data += pack_directory(entries, len(data))
+        for read_size in (1 << 16, 0):
+            with self.subTest(read_size=read_size), \
+                    patch('huffman_method.directory.DIRECTORY_READ_SIZE',
+                          read_size):
+                loaded, offset = read_directory(BytesIO(data), 10)
+                self.assert_same_entries(loaded, entries)
+                self.assertEqual(offset, 100)
+
+    def test_read_directory_corrupted(self):
+        data = b'\x00' * 100
+        data += pack_directory(make_entries(), len(data))
+        for position in (100, len(data) - TRAILER_SIZE,
+                         len(data) - 20, len(data) - 1):
+            with self.subTest(position=position):
+                broken = bytearray(data)
+                broken[position] ^= 1
+                with self.assertRaises(ValueError):
+                    read_directory(BytesIO(bytes(broken)), 10)
+        with self.assertRaises(ValueError):
+            read_directory(BytesIO(data[:20]), 10)
+
+    def test_archive_directory(self):
+        with TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'source')
+            os.makedirs(os.path.join(source, 'sub'))
+            for name, data in (('sub/a.bin', b'abc' * 100),
+                               ('sub/zero.bin', b''),
+                               ('b.txt', b'text' * 10)):
+                with open(os.path.join(source, name), 'wb') as file:
+                    file.write(data)
+            protected = {os.path.join(source, 'b.txt'): b'\x01' * 16}
+
+            for workers in (1, 2):
+                out = os.path.join(directory, f'out{workers}')
+                Compressor(workers=workers).compress(source, out, protected)
+                archive = os.path.join(out, 'source.huff')
+                with self.subTest(workers=workers), \
+                        open(archive, 'rb') as file:
+                    decompressor = Decompressor()
+                    decompressor.check_magic_bytes(file)
+                    decompressor.check_header(file)
+                    entries = decompressor.load_directory(file)
+                    self.assertEqual(file.tell(), len(MAGIC_BYTES) + 32)
+                    located = decompressor.locate_entries(
+                        file, decompressor.entries_end)
+
+                    self.assert_same_entries(
+                        located,
+                        [DirectoryEntry(entry.path, entry.is_file,
+                                        entry.not_empty, entry.protected,
+                                        entry.offset, entry.compressed_size,
+                                        None, entry.digest)
+                         for entry in entries])
+                    by_path = {entry.path: entry for entry in entries}
+                    self.assertEqual(
+                        sorted(by_path),
+                        sorted(['b.txt', os.path.join('sub', 'a.bin'),
+                                os.path.join('sub', 'zero.bin')]))
+                    self.assertFalse(
+                        by_path[os.path.join('sub', 'zero.bin')].not_empty)
+                    self.assertTrue(by_path['b.txt'].protected)
+                    self.assertEqual(
+                        by_path[os.path.join('sub', 'a.bin')].original_size,
+                        300)
+                    self.assertEqual(entries[-1].end,
+                                     decompressor.entries_end)
+                    for entry in entries:
+                        file.seek(entry.end - 16)
+                        self.assertEqual(file.read(16), entry.digest)
+
+    def test_empty_directory_archive(self):
+        with TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'empty')
+            os.makedirs(source)
+            Compressor().compress(source, directory)
+            with open(os.path.join(directory, 'empty.huff'), 'rb') as file:
+                file.seek(len(MAGIC_BYTES) + 32)
+                entries, offset = read_directory(file, file.tell())
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0].path, '.')
+            self.assertFalse(entries[0].is_file)
+            self.assertEqual(entries[0].end, offset)
+
+
+if __name__ == '__main__':
+    unittest.main()
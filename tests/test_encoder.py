@@ -0,0 +1,65 @@
+import random
+import unittest
+
+from huffman_method import BitEncoder, HuffmanTree
+
+
+def legacy_encode(tree, blocks):
+    codes = tree.get_codes()
+    bits = ''.join(codes[obj] for block in blocks for obj in block)
+    count = -len(bits) % 8
+    bits += '0' * count
+    result = int(bits or '0', 2).to_bytes(len(bits) // 8, 'big')
+    return result + bytes([count])
+
+
+class TestBitEncoder(unittest.TestCase):
+    def test_same_stream_as_bit_strings(self):
+        random.seed(3)
+        for size in (1, 7, 8, 1000, 5000):
+            data = bytes(random.choices(range(256),
+                                        weights=range(1, 257), k=size))
+            tree = HuffmanTree()
+            tree.add_block(data)
+            tree.build_tree()
+            blocks = [data[i:i + 300] for i in range(0, size, 300)]
+
+            encoder = BitEncoder.from_tree(tree)
+            encoded = b''.join(encoder.encode(block) for block in blocks)
+            encoded += encoder.flush()
+
+            self.assertEqual(encoded, legacy_encode(tree, blocks))
+
+    def test_text(self):
+        text = 'кодирование текста ' * 20
+        tree = HuffmanTree('utf-8')
+        tree.add_block(text)
+        tree.build_tree()
+        encoder = BitEncoder.from_tree(tree)
+        encoded = encoder.encode(text) + encoder.flush()
+        self.assertEqual(encoded, legacy_encode(tree, [text]))
+
+    def test_flush_without_remainder(self):
+        encoder = BitEncoder({0: '0', 1: '1'})
+        self.assertEqual(encoder.encode(bytes([1, 0] * 4)), b'\xaa')
+        self.assertEqual(encoder.flush(), b'\x00')
+        self.assertEqual(encoder.bits_written, 8)
+
+    def test_bit_position(self):
+        encoder = BitEncoder({0: '0', 1: '10', 2: '11'})
+        encoder.encode(bytes([0, 1, 2]))
+        self.assertEqual(encoder.bit_position, 5)
+        encoder.encode(bytes([2, 2]))
+        self.assertEqual(encoder.bit_position, 9)
+        self.assertEqual(encoder.bits_written, 8)
+        encoder.flush()
+        self.assertEqual(encoder.bit_position, 9)
+
+    def test_flush_with_remainder(self):
+        encoder = BitEncoder({0: '0', 1: '1'})
+        self.assertEqual(encoder.encode(bytes([1, 1, 0, 1])), b'')
+        self.assertEqual(encoder.flush(), b'\xd0\x04')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,7 @@
+import hashlib
 import unittest
-from encryption.hasher import MD5
+import zlib
+from encryption.hasher import MD5, CRC32, Blake2
 
 
 class TestMD5(unittest.TestCase):
@@ -18,6 +20,41 @@ class TestMD5(unittest.TestCase):
         expected_hash = b'\x01#Eg\x89\xab\xcd\xef\xfe\xdc\xba\x98vT2\x10'
         self.assertEqual(self.md5.get_hash(), expected_hash)
 
+    def test_long_hash(self):
+        data = bytes(range(256)) * 5 + b'x' * 60
+        self.md5.hash(data)
+        self.assertEqual(self.md5.get_hash(),
+                         b'\x1b\x16h\xc7e\x00\xa7\xc13/mX\xfe\xa8\x85\x1a')
+
+    def test_chunked_hash(self):
+        data = bytes(range(256)) * 3
+        self.md5.hash(data)
+        expected_hash = self.md5.get_hash()
+        for size in (1, 7, 63, 64, 65, 200):
+            with self.subTest(size=size):
+                md5 = MD5()
+                for i in range(0, len(data), size):
+                    md5.hash(data[i:i + size])
+                self.assertEqual(md5.get_hash(), expected_hash)
+
+
+class TestChecksums(unittest.TestCase):
+    def test_crc32(self):
+        crc = CRC32()
+        crc.hash(b'hello ')
+        crc.hash(b'world')
+        self.assertEqual(crc.get_hash(),
+                         bytes(12) + zlib.crc32(b'hello world').to_bytes(
+                             4, byteorder='big'))
+
+    def test_blake2(self):
+        blake = Blake2()
+        blake.hash(b'hello ')
+        blake.hash(b'world')
+        self.assertEqual(blake.get_hash(),
+                         hashlib.blake2b(b'hello world',
+                                         digest_size=16).digest())
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,7 +1,8 @@
+import random
 import unittest
 from collections import Counter
 
-from huffman_method import HuffmanNode, HuffmanTree
+from huffman_method import HuffmanNode, HuffmanTree, NUMPY_AVAILABLE
 
 
 class TestHuffmanNode(unittest.TestCase):
@@ -60,6 +61,86 @@ class TestHuffmanTree(unittest.TestCase):
         deserialized_tree.deserialize_from_string(serialized_tree)
         self.assertEqual(tree.get_codes(), deserialized_tree.get_codes())
 
+    def test_get_codes_not_shared(self):
+        tree1 = HuffmanTree()
+        tree1.add_block(b'abc')
+        tree1.build_tree()
+        tree1.get_codes()
+        tree2 = HuffmanTree()
+        tree2.add_block(b'xy')
+        tree2.build_tree()
+        self.assertEqual(set(tree2.get_codes()), {ord('x'), ord('y')})
+
+    def test_canonize(self):
+        tree = HuffmanTree()
+        tree.add_block(b'abracadabra')
+        tree.build_tree()
+        lengths = tree.get_code_lengths()
+        tree.canonize()
+        self.assertEqual(tree.get_code_lengths(), lengths)
+        decoded_data, _ = tree.decode(''.join(tree.get_codes()[char]
+                                              for char in b'abracadabra'))
+        self.assertEqual(decoded_data, b'abracadabra')
+
+    def test_serialize_and_deserialize_code_lengths(self):
+        tree = HuffmanTree('utf-8')
+        tree.add_block('канонический код')
+        tree.build_tree()
+        tree.canonize()
+        serialized = tree.serialize_code_lengths()
+        deserialized_tree = HuffmanTree('utf-8')
+        deserialized_tree.deserialize_code_lengths(serialized)
+        self.assertEqual(tree.get_codes(), deserialized_tree.get_codes())
+        self.assertLess(len(serialized), len(tree.serialize_to_string()))
+
+    def test_pickle_state_is_node_graph(self):
+        tree = HuffmanTree()
+        tree.add_block(b'abracadabra')
+        tree.build_tree()
+        root = tree.__getstate__()['root']
+        self.assertIsInstance(root, HuffmanNode)
+        self.assertEqual(root.freq, 11)
+        self.assertIsNotNone(root.left)
+        self.assertIsNotNone(root.right)
+
+    def test_clear_and_reuse(self):
+        tree = HuffmanTree()
+        for data in (b'abracadabra', b'xy', b'zzzz'):
+            tree.clear()
+            tree.add_block(data)
+            tree.build_tree()
+            codes = tree.get_codes()
+            self.assertEqual(set(codes), set(data))
+            decoded_data, _ = tree.decode(''.join(codes[char]
+                                                  for char in data))
+            self.assertEqual(decoded_data, data)
+
+    def test_decode_invalid_code(self):
+        tree = HuffmanTree()
+        tree.deserialize_code_lengths(b'\x02\x00\x02ab')
+        with self.assertRaises(ValueError):
+            tree.decode('11')
+
+    @unittest.skipUnless(NUMPY_AVAILABLE, 'NumPy не установлен')
+    def test_add_block_histogram(self):
+        random.seed(3)
+        blocks = [bytes(random.choices(range(40, 90), k=size))
+                  for size in (10000, 50, 20000)]
+        blocks.append(bytes(range(256)) * 20)
+        tree = HuffmanTree()
+        expected = Counter()
+        for block in blocks:
+            tree.add_block(block)
+            expected.update(block)
+        self.assertEqual(tree.frequency, expected)
+        self.assertEqual(list(tree.frequency), list(expected))
+
+        reference = HuffmanTree()
+        reference.frequency = expected
+        tree.build_tree()
+        reference.build_tree()
+        self.assertEqual(tree.get_codes(), reference.get_codes())
+
 
 if __name__ == '__main__':
     unittest.main()
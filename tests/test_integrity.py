@@ -0,0 +1,55 @@
+import os
+import unittest
+from io import BytesIO
+
+from huffman_method import (CHECKSUM_CRC32, CHECKSUM_MD5, block_digest,
+                            find_damaged_block, iter_block_digests,
+                            pack_block_checksums, unpack_block_checksums)
+
+
+class TestBlockChecksums(unittest.TestCase):
+    def setUp(self):
+        self.data = os.urandom(1000)
+        self.file = BytesIO(b'head' + self.data + b'tail')
+        self.digests = [block_digest(CHECKSUM_CRC32, self.data[i:i + 96])
+                        for i in range(0, len(self.data), 96)]
+
+    def test_pack_round_trip(self):
+        for checksum in (CHECKSUM_MD5, CHECKSUM_CRC32):
+            with self.subTest(checksum=checksum):
+                packed = pack_block_checksums(96, self.digests, checksum)
+                self.assertEqual(
+                    unpack_block_checksums(packed, len(self.data), checksum),
+                    (96, self.digests))
+
+    def test_unpack_corrupted(self):
+        packed = pack_block_checksums(96, self.digests, CHECKSUM_CRC32)
+        damaged = packed[:20] + bytes([packed[20] ^ 1]) + packed[21:]
+        for data, size in ((packed, len(self.data) + 96), (packed[:-1], 1000),
+                           (damaged, 1000), (b'\x00', 0)):
+            with self.subTest(size=size), self.assertRaises(ValueError):
+                unpack_block_checksums(data, size, CHECKSUM_CRC32)
+
+    def test_iter_block_digests(self):
+        self.assertEqual(list(iter_block_digests(self.file, 4, 1000, 96,
+                                                 CHECKSUM_CRC32)),
+                         self.digests)
+        with self.assertRaises(ValueError):
+            list(iter_block_digests(self.file, 4, 1010, 96, CHECKSUM_CRC32))
+
+    def test_find_damaged_block(self):
+        for threads in (1, 3):
+            with self.subTest(threads=threads):
+                self.assertIsNone(find_damaged_block(
+                    self.file, 4, 1000, 96, self.digests, CHECKSUM_CRC32,
+                    threads))
+                buffer = bytearray(self.file.getvalue())
+                buffer[4 + 500] ^= 1
+                buffer[4 + 990] ^= 1
+                self.assertEqual(find_damaged_block(
+                    BytesIO(bytes(buffer)), 4, 1000, 96, self.digests,
+                    CHECKSUM_CRC32, threads), (4 + 480, 4 + 576))
+
+
+if __name__ == '__main__':
+    unittest.main()
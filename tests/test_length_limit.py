@@ -0,0 +1,62 @@
+import random
+import unittest
+
+from huffman_method import HuffmanTree, code_cost, package_merge
+
+
+def fibonacci_frequency(count):
+    values = [1, 1]
+    while len(values) < count:
+        values.append(values[-1] + values[-2])
+    return {char: value for char, value in enumerate(values)}
+
+
+class TestPackageMerge(unittest.TestCase):
+    def test_limit(self):
+        frequency = fibonacci_frequency(30)
+        for max_length in (5, 8, 12, 15):
+            lengths = package_merge(frequency, max_length)
+            self.assertEqual(max(lengths.values()), max_length)
+            self.assertEqual(sum(2 ** -length
+                                 for length in lengths.values()), 1)
+
+    def test_same_cost_as_huffman_without_limit(self):
+        random.seed(2)
+        for _ in range(50):
+            frequency = {char: random.randint(1, 1000)
+                         for char in range(random.randint(2, 60))}
+            tree = HuffmanTree()
+            tree.frequency.update(frequency)
+            tree.build_tree()
+            lengths = package_merge(frequency, 64)
+            self.assertEqual(code_cost(frequency, lengths), tree.get_cost())
+
+    def test_single_symbol(self):
+        self.assertEqual(package_merge({'a': 5}, 3), {'a': 1})
+
+    def test_too_many_symbols(self):
+        with self.assertRaises(ValueError):
+            package_merge({char: 1 for char in range(9)}, 3)
+
+
+class TestLimitCodeLengths(unittest.TestCase):
+    def test_limit_code_lengths(self):
+        tree = HuffmanTree()
+        tree.frequency.update(fibonacci_frequency(30))
+        tree.build_tree()
+        cost = tree.get_cost()
+        self.assertTrue(tree.limit_code_lengths(12))
+        self.assertEqual(max(tree.get_code_lengths().values()), 12)
+        self.assertGreaterEqual(tree.get_cost(), cost)
+
+    def test_short_codes_unchanged(self):
+        tree = HuffmanTree()
+        tree.add_block(b'abracadabra')
+        tree.build_tree()
+        codes = tree.get_codes()
+        self.assertFalse(tree.limit_code_lengths(12))
+        self.assertEqual(tree.get_codes(), codes)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,7 +5,9 @@ from io import StringIO
 from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
-from huffman_method import MD5
+from huffman_method import (BLOCK_CHECKSUMS_INDEX, CHECKPOINTS_INDEX,
+                            CHECKSUM_CRC32, ENCRYPTION_CTR, MAGIC_BYTES, MD5,
+                            Decompressor)
 from main import format_size, calculate_percentage, main, set_password
 
 
@@ -123,6 +125,165 @@ class TestMain(unittest.TestCase):
             decompressed_data = f.read()
         self.assertEqual(decompressed_data, 'test data for compression')
 
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_decompress_selected(self, mock_stdout):
+        source = os.path.join(self.temp_dir.name, 'source')
+        os.makedirs(source)
+        for name in ('a.txt', 'b.txt', 'c.bin'):
+            with open(os.path.join(source, name), 'w') as f:
+                f.write(f'data of {name}')
+        args = ['-c', '-b', source, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+
+        out = os.path.join(self.temp_dir.name, 'decompressed')
+        args = ['-d', '-x', '*.bin', '-x', 'a.txt',
+                os.path.join(self.temp_dir.name, 'source.huff'), out]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+
+        self.assertEqual(sorted(os.listdir(os.path.join(out, 'source'))),
+                         ['a.txt', 'c.bin'])
+        self.assertIn('Успешное завершение', mock_stdout.getvalue())
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_compress_checkpoints(self, mock_stdout):
+        with open(self.input_path, 'w') as f:
+            f.write('checkpoint data ' * 500)
+        args = ['-c', '-b', '-C', '1', self.input_path, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        with open(self.output_path, 'rb') as f:
+            header = f.read(len(MAGIC_BYTES) + 32)[len(MAGIC_BYTES):]
+        self.assertEqual(header[4], CHECKPOINTS_INDEX)
+        fragment = Decompressor().read(self.output_path, '.', 4000, 16)
+        self.assertEqual(fragment, b'checkpoint data ')
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_compress_encrypt_payload(self, mock_stdout):
+        with open(self.input_path, 'w') as f:
+            f.write('payload ' * 100)
+        args = ['-c', '-b', '-e', self.input_path, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        with open(self.output_path, 'rb') as f:
+            header = f.read(len(MAGIC_BYTES) + 32)[len(MAGIC_BYTES):]
+        self.assertEqual(header[5], ENCRYPTION_CTR)
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_compress_checksum(self, mock_stdout):
+        with open(self.input_path, 'w') as f:
+            f.write('checksum ' * 100)
+        args = ['-c', '-b', '--checksum', 'crc32', self.input_path,
+                self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        with open(self.output_path, 'rb') as f:
+            header = f.read(len(MAGIC_BYTES) + 32)[len(MAGIC_BYTES):]
+        self.assertEqual(header[6], CHECKSUM_CRC32)
+        self.assertTrue(Decompressor().decompress(self.output_path,
+                                                  self.temp_dir.name))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_compress_block_checksums(self, mock_stdout):
+        with open(self.input_path, 'w') as f:
+            f.write('blocks ' * 1000)
+        args = ['-c', '-b', '-V', '1', self.input_path, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        with open(self.output_path, 'rb') as f:
+            header = f.read(len(MAGIC_BYTES) + 32)[len(MAGIC_BYTES):]
+        self.assertEqual(header[7], BLOCK_CHECKSUMS_INDEX)
+        self.assertTrue(Decompressor().test(self.output_path))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_workers_single_file_warning(self, mock_stdout):
+        args = ['-c', '-b', '-w', '2', self.input_path, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        self.assertIn('Предупреждение', mock_stdout.getvalue())
+        self.assertTrue(os.path.exists(self.output_path))
+
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        args = ['-c', '-b', '-w', '2', '-B', '1', self.input_path,
+                self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        self.assertNotIn('Предупреждение', mock_stdout.getvalue())
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_list(self, mock_stdout):
+        source = os.path.join(self.temp_dir.name, 'source')
+        os.makedirs(source)
+        for name in ('a.txt', 'b.bin'):
+            with open(os.path.join(source, name), 'w') as f:
+                f.write(f'data of {name}' * 10)
+        protected = {os.path.join(source, 'b.bin'): b'\x01' * 16}
+        with patch('main.set_password', return_value=protected), \
+                patch('sys.argv', ['program_name', '-c', '-b', '-p',
+                                   source, self.temp_dir.name]):
+            main()
+
+        mock_stdout.seek(0)
+        mock_stdout.truncate()
+        archive = os.path.join(self.temp_dir.name, 'source.huff')
+        with patch('sys.argv', ['program_name', '-l', archive]):
+            main()
+
+        lines = mock_stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        rows = sorted(lines[1:3], key=lambda line: line[-5:])
+        self.assertTrue(rows[0].endswith('нет    a.txt'))
+        self.assertTrue(rows[1].endswith('да     b.bin'))
+        self.assertIn('130.00 B', rows[0])
+        self.assertTrue(lines[3].endswith('Элементов: 2'))
+
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_test_mode(self, mock_stdout):
+        args = ['-c', '-b', self.input_path, self.temp_dir.name]
+        with patch('sys.argv', ['program_name'] + args):
+            main()
+        with patch('sys.argv', ['program_name', '--test',
+                                self.output_path]):
+            main()
+        self.assertTrue(mock_stdout.getvalue().endswith(
+            'Архив не поврежден\n'))
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)),
+                         ['input.txt', 'input.txt.huff'])
+
+    @patch('getpass.getpass', side_effect=AssertionError)
+    @patch('builtins.input', side_effect=AssertionError)
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_password_file(self, mock_stdout, mock_input, mock_getpass):
+        source = os.path.join(self.temp_dir.name, 'source')
+        os.makedirs(source)
+        for name in ('a.txt', 'b.bin'):
+            with open(os.path.join(source, name), 'w') as f:
+                f.write(f'data of {name}' * 10)
+        passwords = os.path.join(self.test_dir.name, 'passwords')
+        with open(passwords, 'w') as f:
+            f.write('*.bin = secret\n')
+        archive = os.path.join(self.temp_dir.name, 'source.huff')
+        out_dir = os.path.join(self.temp_dir.name, 'out')
+        for args in (['-c', '-b', '-p', source, self.temp_dir.name],
+                     ['-d', archive, out_dir]):
+            with patch('sys.argv', ['program_name', '--password-file',
+                                    passwords] + args):
+                main()
+
+        entries = Decompressor().list_entries(archive)
+        self.assertEqual([entry.path for entry in entries
+                          if entry.protected], ['b.bin'])
+        with open(os.path.join(out_dir, 'source', 'b.bin')) as f:
+            self.assertEqual(f.read(), 'data of b.bin' * 10)
+
+        with patch.dict(os.environ, {'ARCHIVE_PASSWORD': 'wrong'}), \
+                patch('sys.argv', ['program_name', '--password-env',
+                                   'ARCHIVE_PASSWORD', '--test', archive]):
+            main()
+        self.assertIn('Не верный пароль', mock_stdout.getvalue())
+
     @patch('builtins.input')
     @patch('os.path.isdir', return_value=False)
     @patch('os.path.exists', side_effect=[True, True])
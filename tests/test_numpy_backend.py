@@ -0,0 +1,102 @@
+import random
+import unittest
+from unittest import mock
+
+from huffman_method import (BitEncoder, HuffmanTree, NUMPY_AVAILABLE,
+                            TableDecoder, create_decoder, create_encoder)
+
+if NUMPY_AVAILABLE:
+    from huffman_method import NumpyDecoder, NumpyEncoder
+
+
+def make_tree(data):
+    tree = HuffmanTree()
+    tree.add_block(data)
+    tree.build_tree()
+    return tree
+
+
+@unittest.skipUnless(NUMPY_AVAILABLE, 'NumPy не установлен')
+class TestNumpyBackend(unittest.TestCase):
+    def setUp(self):
+        random.seed(5)
+        self.data = bytes(random.choices(range(64),
+                                         weights=range(64, 0, -1),
+                                         k=150000))
+        self.tree = make_tree(self.data)
+
+    def encode(self, encoder):
+        encoded = b''.join(encoder.encode(self.data[i:i + 1000])
+                           for i in range(0, len(self.data), 1000))
+        return encoded + encoder.flush()
+
+    def test_same_stream_as_bit_encoder(self):
+        expected = self.encode(BitEncoder.from_tree(self.tree))
+        encoder = NumpyEncoder(self.tree.get_codes())
+        self.assertEqual(self.encode(encoder), expected)
+
+    def decode(self, decoder):
+        encoded = self.encode(BitEncoder.from_tree(self.tree))
+        padding = encoded[-1]
+        encoded = encoded[:-1]
+        decoded = b''
+        for i in range(0, len(encoded), 777):
+            last = i + 777 >= len(encoded)
+            decoded += decoder.decode(encoded[i:i + 777],
+                                      padding if last else -1)
+        return decoded
+
+    def test_decode(self):
+        decoder = NumpyDecoder(self.tree.get_codes())
+        self.assertEqual(self.decode(decoder), self.data)
+
+    def test_decode_in_batches(self):
+        decoder = NumpyDecoder(self.tree.get_codes())
+        with mock.patch('huffman_method.numpy_backend.DECODE_BATCH_SIZE',
+                        5000):
+            self.assertEqual(self.decode(decoder), self.data)
+
+    def test_reset_skip(self):
+        encoded = self.encode(BitEncoder.from_tree(self.tree))
+        codes = self.tree.get_codes()
+        start = 1001
+        bit = sum(len(codes[char]) for char in self.data[:start])
+        decoder = NumpyDecoder(codes)
+        decoder.decode(encoded[:100], -1)
+        decoder.reset(bit & 7)
+        self.assertEqual(decoder.decode(encoded[bit >> 3:-1], encoded[-1]),
+                         self.data[start:])
+
+    def test_bit_position(self):
+        codes = self.tree.get_codes()
+        encoder = NumpyEncoder(codes)
+        size = 0
+        for i in range(0, 20000, 1000):
+            size += len(encoder.encode(self.data[i:i + 1000]))
+            expected = sum(len(codes[char]) for char in self.data[:i + 1000])
+            self.assertEqual(encoder.bit_position, expected)
+        self.assertEqual(encoder.bit_position, encoder.bit_position)
+        size += len(encoder.flush()) - 1
+        self.assertEqual(size, (expected + 7) // 8)
+
+    def test_invalid_code(self):
+        decoder = NumpyDecoder(make_tree(b'aaaa').get_codes())
+        with self.assertRaises(ValueError):
+            decoder.decode(b'\xff\x00', 0)
+
+    def test_factories(self):
+        self.assertIsInstance(create_encoder(self.tree), NumpyEncoder)
+        self.assertIsInstance(create_decoder(self.tree), NumpyDecoder)
+
+
+class TestBackendFallback(unittest.TestCase):
+    def test_text_uses_pure_python(self):
+        tree = HuffmanTree('utf-8')
+        tree.add_block('текст')
+        tree.build_tree()
+        self.assertIsInstance(create_encoder(tree), BitEncoder)
+        self.assertIsInstance(create_decoder(tree), TableDecoder)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,6 +23,13 @@ class TestProgressBar(unittest.TestCase):
         expected_output = '\r[#####     ] 50.00%'
         self.assertEqual(mock_stdout.getvalue(), expected_output)
 
+    @patch('sys.stdout', new_callable=StringIO)
+    def test_invisible(self, mock_stdout):
+        progress_bar = ProgressBar(total=100, visible=False)
+        progress_bar.update(50)
+        self.assertEqual(progress_bar.progress, 50)
+        self.assertEqual(mock_stdout.getvalue(), '')
+
     def test_reset(self):
         self.progress_bar.reset(200)
         self.assertEqual(self.progress_bar.total, 200)
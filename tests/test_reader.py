@@ -0,0 +1,130 @@
+import csv
+import io
+import os
+import unittest
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest.mock import patch
+
+from huffman_method import (MD5, ArchiveReader, Compressor, EntryStream,
+                            DATA_CHUNK_SIZE)
+
+
+class TestArchiveReader(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = TemporaryDirectory()
+        self.source = os.path.join(self.test_dir.name, 'source')
+        os.makedirs(os.path.join(self.source, 'sub'))
+        rows = ''.join(f'{i},имя{i % 7},{i * i}\n' for i in range(5000))
+        self.files = {
+            'table.csv': rows.encode(),
+            os.path.join('sub', 'data.bin'): bytes(range(13)) * 9000,
+            'zero.bin': b'',
+        }
+        for name, data in self.files.items():
+            with open(os.path.join(self.source, name), 'wb') as file:
+                file.write(data)
+        self.archive = os.path.join(self.test_dir.name, 'source.huff')
+
+    def tearDown(self):
+        self.test_dir.cleanup()
+
+    def test_read_members(self):
+        for kwargs in ({}, {'codec': 'utf-8'}, {'adaptive': True},
+                       {'table_block_size': 4096},
+                       {'checkpoint_size': 1024, 'canonical': True}):
+            with self.subTest(**kwargs):
+                if os.path.exists(self.archive):
+                    os.remove(self.archive)
+                Compressor(**kwargs).compress(self.source,
+                                              self.test_dir.name)
+                reader = ArchiveReader(self.archive)
+                self.assertEqual(sorted(reader.names()), sorted(self.files))
+                for name, data in self.files.items():
+                    with reader.open(name) as stream:
+                        self.assertIsInstance(stream, io.RawIOBase)
+                        self.assertEqual(stream.read(), data)
+
+    def test_bounded_reads(self):
+        Compressor().compress(self.source, self.test_dir.name)
+        data = self.files[os.path.join('sub', 'data.bin')]
+        with ArchiveReader(self.archive).open('sub/data.bin') as stream:
+            self.assertEqual(stream.read(10), data[:10])
+            self.assertLessEqual(len(stream._pending), 8 * DATA_CHUNK_SIZE)
+            parts = []
+            buffer = bytearray(1000)
+            while True:
+                size = stream.readinto(buffer)
+                if not size:
+                    break
+                parts.append(bytes(buffer[:size]))
+            self.assertEqual(b''.join(parts), data[10:])
+
+    def test_csv_pipeline(self):
+        Compressor('utf-8').compress(self.source, self.test_dir.name)
+        stream = ArchiveReader(self.archive).open('table.csv')
+        with io.TextIOWrapper(io.BufferedReader(stream),
+                              encoding='utf-8') as text:
+            rows = list(csv.reader(text))
+        self.assertEqual(len(rows), 5000)
+        self.assertEqual(rows[77], ['77', 'имя0', '5929'])
+
+    def test_corrupted_member(self):
+        Compressor().compress(self.source, self.test_dir.name)
+        reader = ArchiveReader(self.archive)
+        entry = next(entry for entry in reader.entries
+                     if entry.path == 'table.csv')
+        with open(self.archive, 'r+b') as file:
+            file.seek(entry.end - 1)
+            byte = file.read(1)
+            file.seek(entry.end - 1)
+            file.write(bytes([byte[0] ^ 1]))
+        with reader.open('table.csv') as stream:
+            with self.assertRaises(ValueError):
+                stream.read()
+
+    @patch('getpass.getpass', side_effect=['secret'])
+    def test_protected_member(self, get_pass):
+        hasher = MD5()
+        hasher.hash(b'secret')
+        path = os.path.join(self.source, 'table.csv')
+        Compressor().compress(self.source, self.test_dir.name,
+                              {path: hasher.get_hash()})
+        with patch('sys.stdout', new_callable=StringIO):
+            stream = ArchiveReader(self.archive).open('table.csv')
+        with stream:
+            self.assertEqual(stream.read(), self.files['table.csv'])
+
+    @patch('getpass.getpass', return_value='secret')
+    def test_encrypted_payload_member(self, get_pass):
+        hasher = MD5()
+        hasher.hash(b'secret')
+        path = os.path.join(self.source, 'table.csv')
+        Compressor(encrypt_payload=True).compress(
+            self.source, self.test_dir.name, {path: hasher.get_hash()})
+        with patch('sys.stdout', new_callable=StringIO):
+            stream = ArchiveReader(self.archive).open('table.csv')
+        with stream:
+            self.assertEqual(stream.read(), self.files['table.csv'])
+
+    def test_errors(self):
+        Compressor().compress(self.source, self.test_dir.name)
+        reader = ArchiveReader(self.archive)
+        with self.assertRaises(ValueError):
+            reader.open('missing.csv')
+        stream = reader.open('zero.bin')
+        self.assertIsInstance(stream, EntryStream)
+        stream.close()
+        with self.assertRaises(ValueError):
+            stream.read()
+
+        os.remove(self.archive)
+        Compressor(version=2).compress(self.source, self.test_dir.name)
+        with self.assertRaises(ValueError):
+            ArchiveReader(self.archive)
+        with self.assertRaises(ValueError):
+            ArchiveReader(os.path.join(self.test_dir.name, 'missing.huff'))
+
+
+if __name__ == '__main__':
+    unittest.main()